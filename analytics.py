@@ -0,0 +1,325 @@
+from postprocess import normalize_frame, canonicalize_urls
+from store import STORE_PATH
+from datetime import date, timedelta
+import pandas as pd
+import numpy as np
+import threading
+import argparse
+import bisect
+import sqlite3
+import shutil
+import json
+import time
+import os
+
+try: # pyarrow se necesita para el almacén columnar (archivos Arrow mapeados en memoria).
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Constantes.
+ANALYTICS_DIR = "analitica" # Carpeta del almacén: una versión por ingesta (noticias en Arrow e índice invertido de los títulos) y current.json con la versión vigente.
+ANALYTICS_FORMATS = (".csv", ".jsonl", ".parquet", ".db") # Archivos que se pueden ingerir: salidas del scraper, datasets de batch.py y la base de datos de store.py.
+TOKEN_PATTERN = r"[a-z0-9]+" # Términos del índice, después de pasar el título a minúsculas y sin tildes.
+MIN_TERM_LENGTH = 3 # Largo mínimo de un término para indexarlo.
+STOPWORDS = frozenset("""
+ante antes algo algun alguna algunas alguno algunos aqui asi aun cada como con contra cual cuales cuando desde donde durante ella ellas ello ellos entre era eran esa esas ese eso esos esta estan estas este esto estos fue fueron han hasta hay las les los mas mediante mismo mucho muchos muy nada nos otra otras otro otros para pero poco por porque que quien quienes segun ser sera sido sin sobre son sus tambien tan tanto tiene tienen todo todos tras una uno unos vez the and
+""".split()) # Palabras sin significado propio que no se indexan (sin tildes, igual que los términos).
+SEARCH_LIMIT = 50 # Cantidad máxima de noticias que retorna una búsqueda.
+TRENDS_DAYS = 7 # Días de la ventana de tendencias.
+TRENDS_TOP = 20 # Cantidad de términos que retorna el informe de tendencias.
+MISSING_DAY = np.iinfo(np.int32).min # Día que se usa para las noticias sin fecha (queda fuera de cualquier rango de fechas).
+EPOCH = date(1970, 1, 1)
+
+
+def _fold(values): # Función para pasar una columna de texto a minúsculas y sin tildes (así "Córdova" y "cordova" son el mismo término).
+    return values.fillna("").astype("string").str.lower().str.normalize("NFKD").str.replace("[\u0300-\u036f]", "", regex=True)
+
+
+def _terms(values): # Función para separar cada texto de una columna en sus términos indexables, retorna una Serie con un término por fila (el índice es la fila del texto).
+    terms = _fold(values).str.findall(TOKEN_PATTERN).explode().dropna()
+    return terms[(terms.str.len() >= MIN_TERM_LENGTH) & ~terms.isin(STOPWORDS)]
+
+
+def tokenize(text): # Función para separar una búsqueda en términos, con las mismas reglas que el índice. Una palabra terminada en * busca los términos que empiezan así.
+    words = str(text).split()
+    terms = []
+    for word, found in zip(words, _fold(pd.Series([word.rstrip("*") for word in words], dtype="string")).str.findall(TOKEN_PATTERN)):
+        prefix = found.pop() if word.endswith("*") and found else None # El prefijo se busca aunque sea corto o una palabra ignorada.
+        terms.extend(term for term in found if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS)
+        if prefix:
+            terms.append(f"{prefix}*")
+    return terms
+
+
+def build_index(titles): # Función para construir el índice invertido de los títulos, retorna los términos ordenados y las filas de cada uno (CSR: offsets y postings).
+    terms = _terms(titles.reset_index(drop=True))
+    codes, vocabulary = pd.factorize(terms.to_numpy(dtype=object), sort=True)
+    rows = terms.index.to_numpy(dtype=np.int32)
+    order = np.lexsort((rows, codes)) # Por término y, dentro de cada término, por fila.
+    codes, rows = codes[order], rows[order]
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1]) # Un término repetido en el mismo título cuenta una vez.
+    codes, rows = codes[keep], rows[keep]
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=len(vocabulary)), out=offsets[1:])
+    return list(vocabulary), offsets, rows
+
+
+def read_articles(path): # Función para leer noticias de un archivo o carpeta (se recorre completa), retorna un DataFrame con Title, Date, URL y Website en texto.
+    if os.path.isdir(path):
+        frames = [read_articles(os.path.join(root, name)) for root, _, names in os.walk(path) for name in sorted(names) if name.endswith(ANALYTICS_FORMATS)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Title", "Date", "URL", "Website"], dtype="string")
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, dtype="string")
+    elif path.endswith(".jsonl"):
+        df = pd.read_json(path, lines=True, dtype=False)
+    elif path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif path.endswith(".db"): # Todas las noticias guardadas por store.py, de todas las búsquedas.
+        with sqlite3.connect(path) as conn:
+            df = pd.read_sql("SELECT title AS Title, date AS Date, url AS URL, website AS Website FROM articles", conn)
+    else:
+        raise ValueError(f"Formato no soportado: {path} (se aceptan {', '.join(ANALYTICS_FORMATS)}).")
+    return df.reindex(columns=["Title", "Date", "URL", "Website"]).astype("string")
+
+
+def _day(value): # Función para pasar una fecha (date o texto aaaa-mm-dd) a días desde 1970, el formato en que se comparan las fechas del almacén.
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return (value - EPOCH).days
+
+
+def _date_argument(value): # Función para validar una fecha de la línea de comandos (aaaa-mm-dd), así argparse muestra el error junto al uso del comando.
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: {value!r} (se espera aaaa-mm-dd)")
+    return value
+
+
+def _format_day(day): # Función para pasar días desde 1970 a dd/mm/aaaa, el formato de fechas del scraper.
+    return None if day == MISSING_DAY else (EPOCH + timedelta(days=int(day))).strftime("%d/%m/%Y")
+
+
+class Analytics: # Almacén columnar de noticias (Arrow mapeado en memoria) con un índice invertido de los títulos, para búsquedas, conteos y tendencias en milisegundos.
+    def __init__(self, directory=ANALYTICS_DIR): # Inicializador del almacén, carga la versión vigente si existe.
+        if pa is None:
+            raise ImportError("Para la analítica se necesita instalar pyarrow (pip install pyarrow).")
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._current_path = os.path.join(directory, "current.json")
+        self._loaded = None # Momento de modificación de current.json cuando se cargó, para notar ingestas de otros procesos.
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self): # Carga la versión vigente: las noticias se mapean en memoria sin copiarlas y el índice se lee como arreglos de numpy mapeados.
+        try:
+            with open(self._current_path, encoding="utf-8") as file:
+                self.info = json.load(file)
+            self._loaded = os.path.getmtime(self._current_path)
+        except FileNotFoundError:
+            self.info, self._loaded = None, None
+            self.table = pa.table({"Title": pa.array([], pa.string()), "Date": pa.array([], pa.date32()), "URL": pa.array([], pa.string()), "Website": pa.array([], pa.string())})
+            self._vocabulary, self._term_ids = [], {}
+            self._offsets, self._postings = np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+        else:
+            version = os.path.join(self.directory, self.info["version"])
+            self.table = pa.ipc.open_file(pa.memory_map(os.path.join(version, "articles.arrow"))).read_all()
+            self._vocabulary = pa.ipc.open_file(pa.memory_map(os.path.join(version, "terms.arrow"))).read_all()["term"].to_pylist()
+            self._term_ids = {term: index for index, term in enumerate(self._vocabulary)}
+            self._offsets = np.load(os.path.join(version, "offsets.npy"), mmap_mode="r")
+            self._postings = np.load(os.path.join(version, "postings.npy"), mmap_mode="r")
+
+        # Columnas que usan todas las consultas, como arreglos de numpy.
+        self._days = self.table["Date"].cast(pa.int32()).fill_null(MISSING_DAY).to_numpy()
+        self._site_codes, self._sites = pd.factorize(self.table["Website"].to_pandas())
+        self._posting_terms = np.repeat(np.arange(len(self._vocabulary), dtype=np.int32), np.diff(self._offsets)) # Término de cada posting, para las tendencias.
+        self._posting_days = self._days[self._postings]
+
+    def _changed(self): # Otro proceso (por ejemplo, la CLI) ingirió noticias nuevas desde la última carga.
+        try:
+            return os.path.getmtime(self._current_path) != self._loaded
+        except FileNotFoundError:
+            return False
+
+    def _refresh(self): # Vuelve a cargar si cambió la versión vigente.
+        if self._changed():
+            with self._lock:
+                if self._changed():
+                    self._load()
+
+    @property
+    def rows(self): # Cantidad de noticias en el almacén.
+        return self.table.num_rows
+
+    def ingest(self, paths): # Método para agregar noticias de archivos o carpetas (ver ANALYTICS_FORMATS) sin duplicados, retorna cuántas noticias nuevas se agregaron.
+        new = pd.concat([read_articles(path) for path in paths], ignore_index=True)
+        new = normalize_frame(new).dropna(subset=["URL"]) # Fechas como datetime64, títulos y URLs canónicos (así el mismo artículo tiene el mismo URL en todas las fuentes).
+        with self._lock:
+            if self._changed():
+                self._load()
+            existing = self.table.to_pandas(date_as_object=False)
+            merged = pd.concat([existing, new], ignore_index=True)
+            merged = merged[~canonicalize_urls(merged["URL"]).duplicated(keep="first")] # Misma llave que store.py (las mismas reglas que normalize_url, vectorizadas), así una noticia de la base de datos y de un .csv con otro URL (http, www., / final) cuenta una vez. Las versiones anteriores pueden tener URLs con otras reglas.
+            added = len(merged) - len(existing)
+            merged = merged.sort_values("Date", ascending=False, na_position="last", kind="stable").reset_index(drop=True) # Las filas quedan de la más nueva a la más antigua, así las búsquedas no tienen que ordenar.
+            self._write(merged)
+            self._load()
+            self._clean()
+        return added
+
+    def _write(self, df): # Escribe una versión nueva completa y después cambia current.json, así quien esté leyendo la versión anterior no se ve afectado.
+        version = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1_000_000:06d}"
+        path = os.path.join(self.directory, version)
+        os.makedirs(path)
+        table = pa.table({
+            "Title": pa.array(df["Title"].astype(object).where(df["Title"].notna(), None), pa.string()),
+            "Date": pa.array(pd.to_datetime(df["Date"]).to_numpy().astype("datetime64[D]"), pa.date32(), from_pandas=True),
+            "URL": pa.array(df["URL"].astype(object), pa.string()),
+            "Website": pa.array(df["Website"].astype(object).where(df["Website"].notna(), None), pa.string())
+        })
+        with pa.OSFile(os.path.join(path, "articles.arrow"), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer: # Sin compresión, para poder mapearlo en memoria.
+            writer.write_table(table)
+        vocabulary, offsets, postings = build_index(df["Title"])
+        terms = pa.table({"term": pa.array(vocabulary, pa.string())})
+        with pa.OSFile(os.path.join(path, "terms.arrow"), "wb") as sink, pa.ipc.new_file(sink, terms.schema) as writer:
+            writer.write_table(terms)
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+        np.save(os.path.join(path, "postings.npy"), postings)
+
+        info = {"version": version, "rows": len(df), "terms": len(vocabulary), "postings": len(postings), "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(f"{self._current_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(info, file)
+        os.replace(f"{self._current_path}.tmp", self._current_path)
+
+    def _clean(self): # Elimina las versiones anteriores. En Windows no se puede si otro proceso aún las tiene mapeadas, se reintenta en la siguiente ingesta.
+        for name in os.listdir(self.directory):
+            if name != self.info["version"] and os.path.isdir(os.path.join(self.directory, name)):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _postings_for(self, term): # Filas cuyo título tiene el término (o algún término que empiece así, si termina en *).
+        if not term.endswith("*"):
+            index = self._term_ids.get(term)
+            return self._postings[self._offsets[index]:self._offsets[index + 1]] if index is not None else np.empty(0, dtype=np.int32)
+        prefix = term[:-1]
+        start = bisect.bisect_left(self._vocabulary, prefix) # El vocabulario está ordenado, los términos con el prefijo son un rango continuo.
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return np.unique(self._postings[self._offsets[start]:self._offsets[end]])
+
+    def _match(self, query=None, website=None, since=None, until=None): # Filas que cumplen la búsqueda (todos los términos) y los filtros, de la más nueva a la más antigua.
+        self._refresh()
+        rows = None
+        for term in tokenize(query or ""):
+            found = self._postings_for(term)
+            rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+        if rows is None:
+            rows = np.arange(self.rows, dtype=np.int32)
+        if website:
+            code = self._sites.get_loc(website) if website in self._sites else -2
+            rows = rows[self._site_codes[rows] == code]
+        since, until = _day(since), _day(until)
+        if since is not None:
+            rows = rows[self._days[rows] >= since]
+        if until is not None:
+            rows = rows[(self._days[rows] <= until) & (self._days[rows] != MISSING_DAY)]
+        return rows
+
+    def search(self, query, website=None, since=None, until=None, limit=SEARCH_LIMIT): # Método para buscar noticias por palabras del título, retorna el total y las `limit` más nuevas.
+        rows = self._match(query, website, since, until)
+        results = self.table.take(pa.array(rows[:limit])).to_pylist()
+        for result, row in zip(results, rows[:limit]):
+            result["Date"] = _format_day(self._days[row])
+        return {"total": len(rows), "results": results}
+
+    def counts(self, query=None, website=None, since=None, until=None): # Método para contar las noticias por sitio web y por día (solo las de la búsqueda, si se entrega).
+        rows = self._match(query, website, since, until)
+        rows = rows[self._days[rows] != MISSING_DAY]
+        codes = self._site_codes[rows].astype(np.int64)
+        codes[codes < 0] = len(self._sites) # pd.factorize marca con -1 las noticias sin sitio web, se agrupan aparte en vez de quedar con el último sitio web.
+        keys = codes << 32 | (self._days[rows].astype(np.int64) & 0xFFFFFFFF) # Sitio web y día en un solo número, para agrupar con np.unique.
+        keys, counts = np.unique(keys, return_counts=True)
+        days = (keys & 0xFFFFFFFF).astype(np.uint32).astype(np.int32)
+        sites = list(self._sites) + [None]
+        dates = {int(day): _format_day(day) for day in np.unique(days)} # Cada día se formatea una sola vez.
+        groups = sorted(((int(day), sites[key >> 32], int(count)) for key, day, count in zip(keys.tolist(), days.tolist(), counts.tolist())), key=lambda group: (group[0], group[1] is None, group[1] or "")) # Por día y sitio web, las noticias sin sitio web al final.
+        return [{"Website": website, "Date": dates[day], "count": count} for day, website, count in groups]
+
+    def trends(self, days=TRENDS_DAYS, top=TRENDS_TOP, website=None, until=None): # Método para obtener los términos más frecuentes de los últimos `days` días (hasta `until` o la noticia más nueva) y su cambio respecto de los `days` días anteriores.
+        self._refresh()
+        dated = self._days[self._days != MISSING_DAY]
+        if len(dated) == 0:
+            return {"since": None, "until": None, "terms": []}
+        end = _day(until) if until else int(dated.max())
+        start = end - days + 1
+        mask = self._posting_days <= end
+        if website:
+            code = self._sites.get_loc(website) if website in self._sites else -2
+            mask &= self._site_codes[self._postings] == code
+        recent = np.bincount(self._posting_terms[mask & (self._posting_days >= start)], minlength=len(self._vocabulary))
+        previous = np.bincount(self._posting_terms[mask & (self._posting_days < start) & (self._posting_days >= start - days)], minlength=len(self._vocabulary))
+        order = np.argsort(-recent, kind="stable")[:top]
+        return {
+            "since": _format_day(start),
+            "until": _format_day(end),
+            "terms": [{
+                "term": self._vocabulary[index],
+                "count": int(recent[index]),
+                "previous": int(previous[index]),
+                "change": round(recent[index] / previous[index] - 1, 3) if previous[index] else None # None si el término no aparecía antes.
+            } for index in order if recent[index] > 0]
+        }
+
+    def stats(self): # Método para obtener el tamaño del almacén y de su índice.
+        self._refresh()
+        return {"rows": self.rows, "terms": len(self._vocabulary), "postings": len(self._postings), "websites": list(self._sites), **({"version": self.info["version"], "created": self.info["created"]} if self.info else {})}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsquedas, conteos y tendencias sobre las noticias extraídas.")
+    parser.add_argument("--dir", default=ANALYTICS_DIR, help=f"Carpeta del almacén (predeterminado: {ANALYTICS_DIR}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Agrega noticias de archivos .csv, .jsonl, .parquet, carpetas de batch.py o la base de datos de store.py.")
+    ingest.add_argument("paths", nargs="*", default=[STORE_PATH], help=f"Archivos o carpetas a ingerir (predeterminado: {STORE_PATH}).")
+    search = commands.add_parser("search", help="Busca noticias por palabras del título (todas deben estar, un * al final busca prefijos).")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    counts = commands.add_parser("counts", help="Cantidad de noticias por sitio web y por día.")
+    counts.add_argument("--query", help="Contar solo las noticias de esta búsqueda.")
+    trends = commands.add_parser("trends", help="Términos más frecuentes de los últimos días y su cambio.")
+    trends.add_argument("--days", type=int, default=TRENDS_DAYS)
+    trends.add_argument("--top", type=int, default=TRENDS_TOP)
+    trends.add_argument("--until", type=_date_argument, help="Último día de la ventana (aaaa-mm-dd, predeterminado: el de la noticia más nueva).")
+    commands.add_parser("stats", help="Tamaño del almacén y de su índice.")
+    for command in (search, counts, trends):
+        command.add_argument("--website", help="Solo noticias de este sitio web.")
+    for command in (search, counts):
+        command.add_argument("--since", type=_date_argument, help="Desde esta fecha (aaaa-mm-dd).")
+        command.add_argument("--until", type=_date_argument, help="Hasta esta fecha (aaaa-mm-dd).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analytics = Analytics(args.dir)
+    loaded = time.perf_counter()
+    if args.command == "ingest":
+        added = analytics.ingest(args.paths)
+        print(f"{added} noticias nuevas, {analytics.rows} en total ({len(analytics._vocabulary)} términos en el índice).")
+    elif args.command == "search":
+        result = analytics.search(args.query, args.website, args.since, args.until, args.limit)
+        for row in result["results"]:
+            print(f"{row['Date'] or '-':<10}  {row['Website'] or '-':<12} {row['Title']}\n{'':<24}{row['URL']}")
+        print(f"{result['total']} noticias encontradas.")
+    elif args.command == "counts":
+        for row in analytics.counts(args.query, args.website, args.since, args.until):
+            print(f"{row['Date']}  {row['Website'] or '-':<12} {row['count']:>6}")
+    elif args.command == "trends":
+        result = analytics.trends(args.days, args.top, args.website, args.until)
+        print(f"Términos más frecuentes del {result['since']} al {result['until']}:")
+        for row in result["terms"]:
+            change = f"{row['change']:+.0%}" if row["change"] is not None else "nuevo"
+            print(f"{row['term']:<20} {row['count']:>6} (antes {row['previous']}, {change})")
+    elif args.command == "stats":
+        print(json.dumps(analytics.stats(), indent=2, ensure_ascii=False))
+    print(f"Carga del almacén: {(loaded - start) * 1000:.1f} ms, consulta: {(time.perf_counter() - loaded) * 1000:.1f} ms.")
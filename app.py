@@ -1,9 +1,38 @@
-from flask import Flask, render_template, request, send_file
-from ABCD_Scraper import WebScraper  # Import your WebScraper class
+from flask import Flask, Response, abort, jsonify, render_template, request, send_file, stream_with_context, url_for
+from http_fetcher import HttpFetcher
+from cache import ResultCache
+from metrics import Metrics
+from jobs import JobManager
+from analytics import Analytics, SEARCH_LIMIT, TRENDS_DAYS, TRENDS_TOP
 import os
 
 app = Flask(__name__)
 DRIVER_PATH = "C:/Users/Equipo/Desktop/PRÁCTICA INTERMEDIA PUCV/Web Scraper/WebScraper_Analitic/chromedriver.exe"
+fetcher = HttpFetcher()  # Shared keep-alive HTTP client for the sites that don't need a browser
+cache = ResultCache()  # Per-site results of recent queries, served instantly on repeat queries
+metrics = Metrics()  # WebDriver call counts/timings and per-site phase timings of every job
+jobs = JobManager(DRIVER_PATH, fetcher=fetcher, cache=cache, metrics=metrics)  # Bounded job queue sharing one pool of long-lived drivers
+try:
+    analytics = Analytics()  # Memory-mapped columnar store of past results with a title index
+except ImportError:  # pyarrow not installed
+    analytics = None
+
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+def get_analytics():
+    if analytics is None:
+        abort(503, "Analytics requires pyarrow.")
+    return analytics
+
+def analytics_query(method, *args, **kwargs):
+    try:
+        return jsonify(method(*args, **kwargs))
+    except ValueError as e:  # Malformed date (expected yyyy-mm-dd) or number
+        return str(e), 400
 
 @app.route("/")
 def home():
@@ -15,18 +44,75 @@ def scrape():
     if not query:
         return "Please enter a query.", 400
 
-    scraper = WebScraper(DRIVER_PATH)
-    try:
-        scraper.scrape_adnradio(query)
-        scraper.scrape_biobiochile(query)
-        scraper.scrape_duckduckgo(query)
-        scraper.scrape_cooperativa(query)
-
-        filename = "scraped_articles.csv"
-        scraper.save_to_csv(filename)
-        return send_file(filename, as_attachment=True)
-    finally:
-        scraper.close()
+    job = jobs.submit(query)  # Returns the running (or recently finished) job if the same query was already requested
+    response = jsonify(job.to_dict())
+    response.headers["Location"] = url_for("job_status", job_id=job.id)
+    return response, 202
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    return jsonify(get_job(job_id).to_dict())
+
+@app.route("/jobs/<job_id>/progress")
+def job_progress(job_id):
+    job = get_job(job_id)
+    return jsonify({"status": job.status, **job.progress()})
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    job = get_job(job_id)
+    filename = f"noticias_{job.query.strip().replace(' ', '_')}.csv"
+    if job.done:
+        if not os.path.exists(job.path):
+            abort(404)
+        return send_file(os.path.abspath(job.path), as_attachment=True, download_name=filename)
+
+    # Still running: stream the CSV as rows are written
+    return Response(
+        stream_with_context(jobs.follow(job)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+@app.route("/analytics/ingest", methods=["POST"])
+def analytics_ingest():
+    job = get_job(request.form.get("job_id", ""))
+    if not job.done or not os.path.exists(job.path):
+        return "The job has no finished results to ingest.", 409
+    added = get_analytics().ingest([job.path])
+    return jsonify({"added": added, "rows": analytics.rows})
+
+@app.route("/analytics/search")
+def analytics_search():
+    query = request.args.get("q")
+    if not query:
+        return "Please enter a query.", 400
+    args = request.args
+    return analytics_query(get_analytics().search, query, args.get("website"), args.get("since"), args.get("until"), args.get("limit", SEARCH_LIMIT, type=int))
+
+@app.route("/analytics/counts")
+def analytics_counts():
+    args = request.args
+    return analytics_query(get_analytics().counts, args.get("q"), args.get("website"), args.get("since"), args.get("until"))
+
+@app.route("/analytics/trends")
+def analytics_trends():
+    args = request.args
+    return analytics_query(get_analytics().trends, args.get("days", TRENDS_DAYS, type=int), args.get("top", TRENDS_TOP, type=int), args.get("website"), args.get("until"))
+
+@app.route("/analytics/stats")
+def analytics_stats():
+    return jsonify(get_analytics().stats())
+
+@app.route("/cache")
+def cache_stats():
+    return jsonify(cache.stats())
+
+@app.route("/metrics")
+def prometheus_metrics():
+    for name, value in cache.stats().items():
+        metrics.set(f"cache_{name}", value)
+    return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     app.run(debug=True)
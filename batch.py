@@ -0,0 +1,163 @@
+from web_scraper_analitic import WebScraper, SITES, MAX_QUERY_INPUT
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from http_fetcher import HttpFetcher
+from store import normalize_query
+from sinks import open_sink, pq
+import multiprocessing.util
+import argparse
+import time
+import os
+import re
+
+# Constantes.
+BATCH_WORKERS = 4 # Cantidad de procesos, cada uno con su propio controlador (Chrome).
+BATCH_OUTPUT_DIR = "datasets" # Carpeta donde se guarda el dataset de cada búsqueda.
+BATCH_FORMAT = "parquet" if pq is not None else "csv" # Formato de los archivos del dataset (.parquet si está pyarrow, si no .csv).
+BATCH_RATE_LIMITS = { # Límite de cada sitio web: (segundos mínimos entre el inicio de dos búsquedas, búsquedas al mismo tiempo), para no ser bloqueados.
+    "ADNRadio": (2, 2),
+    "BioBioChile": (2, 2),
+    "Cooperativa": (5, 1), # El servidor de Cooperativa es lento, no conviene cargarlo con varias búsquedas a la vez.
+    "DuckDuckGo": (1, 2)
+}
+
+_scraper = None # Scraper de cada proceso trabajador, se crea una sola vez y se reutiliza para todas sus búsquedas.
+
+
+def read_queries(path): # Función para leer los términos de búsqueda de un archivo (uno por línea, se ignoran líneas vacías, comentarios con # y repetidos).
+    queries, seen = [], set()
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            query = line.strip()
+            if not query or query.startswith("#"):
+                continue
+            if len(query) > MAX_QUERY_INPUT:
+                print(f"Término muy largo, se omite (máximo {MAX_QUERY_INPUT} caracteres): {query[:30]}...")
+                continue
+            if normalize_query(query) not in seen:
+                seen.add(normalize_query(query))
+                queries.append(query)
+    return queries
+
+
+def dataset_path(output_dir, query): # Función para obtener la carpeta del dataset de una búsqueda.
+    return os.path.join(output_dir, re.sub(r"[^\w-]+", "_", normalize_query(query)).strip("_") or "_")
+
+
+def partition_path(output_dir, query, site, file_format=BATCH_FORMAT): # Función para obtener el archivo de un sitio web dentro del dataset de una búsqueda (particionado por site=<sitio web>, como lo lee pyarrow o pandas).
+    return os.path.join(dataset_path(output_dir, query), f"site={site}", f"part-0.{file_format}")
+
+
+def _init_worker(driver_path, base_urls): # Inicializador de cada proceso trabajador: un scraper con su propio controlador (creado con _setup_driver al necesitarlo) y su propio cliente HTTP.
+    global _scraper
+    _scraper = WebScraper(driver_path, fetcher=HttpFetcher(), keep_data=False)
+    if base_urls:
+        _scraper.base_urls.update(base_urls)
+    multiprocessing.util.Finalize(_scraper, _close_worker, exitpriority=10) # Los procesos de multiprocessing no ejecutan atexit, así se cierra Chrome al terminar.
+
+
+def _close_worker():
+    _scraper.close()
+    _scraper.fetcher.close()
+
+
+def _scrape_pair(query, site, path): # Función que ejecuta cada proceso trabajador: scrapea un sitio web para una búsqueda y escribe su partición.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sink = open_sink(path)
+    _scraper.sink = sink
+    _scraper.count = 0
+    started, start = time.time(), time.perf_counter()
+    error = None
+    try:
+        if not _scraper._scrape_site(site, query): # Los scrapers guardan su error en vez de lanzarlo, un sitio web que no terminó es un error del par.
+            error = str(_scraper._error or "el sitio web no terminó")
+    except Exception as e:
+        error = str(e)
+    finally:
+        sink.close()
+        _scraper.sink = None
+    if error or sink.count == 0: # Sin noticias no se deja una partición vacía, y la de un par con error queda incompleta.
+        os.remove(path)
+    return {"query": query, "site": site, "rows": sink.count, "started": started, "seconds": round(time.perf_counter() - start, 2), "error": error, "pid": os.getpid()}
+
+
+def run_batch(driver_path, queries, sites=None, workers=BATCH_WORKERS, output_dir=BATCH_OUTPUT_DIR, file_format=BATCH_FORMAT, rate_limits=None, base_urls=None): # Función para scrapear todos los pares (búsqueda, sitio web) en varios procesos, retorna el resultado de cada par.
+    sites = list(sites or SITES)
+    rate_limits = BATCH_RATE_LIMITS if rate_limits is None else rate_limits
+    for site in sites: # Un sitio web sin búsquedas permitidas al mismo tiempo nunca terminaría.
+        if rate_limits.get(site, (0, workers))[1] < 1:
+            raise ValueError(f"El límite de {site} debe permitir al menos una búsqueda al mismo tiempo.")
+    pending = {site: deque(queries) for site in sites} # Búsquedas pendientes por sitio web, se reparten por turnos entre los sitios web.
+    running = {site: 0 for site in sites} # Búsquedas en curso por sitio web.
+    last_start = {site: float("-inf") for site in sites} # Momento en que empezó la última búsqueda de cada sitio web.
+    in_flight = {}
+    results = []
+    total = len(queries) * len(sites)
+    start = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(driver_path, base_urls)) as executor:
+        wait([executor.submit(os.getpid) for _ in range(workers)]) # Se esperan los procesos antes de repartir, si no las primeras búsquedas empiezan juntas cuando terminan de iniciar.
+        while any(pending.values()) or in_flight:
+            now = time.monotonic()
+            next_ready = None # Momento en que algún sitio web vuelve a tener permitido iniciar una búsqueda.
+            submitted = True
+            while submitted and len(in_flight) < workers: # Se entregan búsquedas mientras haya procesos libres y sitios web bajo su límite.
+                submitted = False
+                for site in sites:
+                    if not pending[site] or len(in_flight) >= workers:
+                        continue
+                    interval, concurrent = rate_limits.get(site, (0, workers))
+                    if running[site] >= concurrent:
+                        continue
+                    ready = last_start[site] + interval
+                    if now < ready:
+                        next_ready = ready if next_ready is None else min(next_ready, ready)
+                        continue
+                    query = pending[site].popleft()
+                    future = executor.submit(_scrape_pair, query, site, partition_path(output_dir, query, site, file_format))
+                    in_flight[future] = (query, site)
+                    running[site] += 1
+                    last_start[site] = now
+                    submitted = True
+
+            timeout = None if next_ready is None else max(0, next_ready - time.monotonic())
+            if not in_flight: # Todos los sitios web pendientes están esperando su intervalo.
+                time.sleep(timeout or 0)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                query, site = in_flight.pop(future)
+                running[site] -= 1
+                try:
+                    result = future.result()
+                except Exception as e: # El proceso trabajador se cayó (por ejemplo, Chrome dejó de responder).
+                    result = {"query": query, "site": site, "rows": 0, "started": None, "seconds": None, "error": str(e), "pid": None}
+                if result["started"] is not None: # El intervalo se cuenta desde que la búsqueda empezó en el proceso, que puede ser después de entregarla.
+                    last_start[site] = max(last_start[site], time.monotonic() - (time.time() - result["started"]))
+                results.append(result)
+                status = f"error: {result['error']}" if result["error"] else f"{result['rows']} noticias en {result['seconds']} s"
+                print(f"[{len(results)}/{total}] {query} - {site}: {status}")
+
+    elapsed = time.monotonic() - start
+    print(f"{len(queries)} búsquedas en {len(sites)} sitios web terminadas en {elapsed:.1f} s con {workers} procesos ({sum(result['rows'] for result in results)} noticias).")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrapea una lista de búsquedas en varios procesos y guarda un dataset por búsqueda.")
+    parser.add_argument("queries", help="Archivo con un término de búsqueda por línea.")
+    parser.add_argument("--driver", default=None, help="Ruta de acceso al controlador del browser (si no se entrega, Selenium lo busca).")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help=f"Cantidad de procesos (predeterminado: {BATCH_WORKERS}).")
+    parser.add_argument("--sites", nargs="+", choices=list(SITES), help="Sitios web a scrapear (predeterminado: todos).")
+    parser.add_argument("--output", default=BATCH_OUTPUT_DIR, help=f"Carpeta de los datasets (predeterminado: {BATCH_OUTPUT_DIR}).")
+    parser.add_argument("--format", default=BATCH_FORMAT, choices=["parquet", "csv", "jsonl"], help=f"Formato de los archivos (predeterminado: {BATCH_FORMAT}).")
+    args = parser.parse_args()
+
+    queries = read_queries(args.queries)
+    print(f"{len(queries)} búsquedas leídas de {args.queries}")
+    results = run_batch(args.driver, queries, args.sites, args.workers, args.output, args.format)
+    failed = [result for result in results if result["error"]]
+    if failed:
+        print(f"{len(failed)} pares (búsqueda, sitio web) con error:")
+        for result in failed:
+            print(f"- {result['query']} - {result['site']}: {result['error']}")
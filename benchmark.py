@@ -0,0 +1,566 @@
+from web_scraper_analitic import WebScraper, SITES, HTTP_BACKENDS, MAX_NEWS_PER_SITE, DRIVER_PROFILES, DEFAULT_DRIVER_PROFILE, create_driver
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote_plus
+from datetime import date, datetime, timedelta
+from bodies import BodyFetcher, fetch_bodies
+from http_fetcher import HttpFetcher
+from store import ArticleStore
+from metrics import Metrics
+from html import escape
+import threading
+import platform
+import argparse
+import json
+import time
+import sys
+import os
+
+try: # psutil permite medir también la memoria de Chrome y chromedriver (procesos hijos), sin él solo se mide la de Python.
+    import psutil
+except ImportError:
+    psutil = None
+
+try: # resource solo existe en Linux y macOS.
+    import resource
+except ImportError:
+    resource = None
+
+# Constantes.
+BENCH_SIZES = [100, 1000] # Cantidad de noticias que entrega cada sitio web de prueba (se puede llegar hasta MAX_NEWS_PER_SITE).
+BENCH_QUERY = "benchmark" # Término de búsqueda usado en las páginas de prueba.
+BENCH_PAGE_SIZES = { # Noticias que carga cada sitio web de prueba por página, por desplazamiento o por botón, igual que los sitios reales.
+    "ADNRadio": 20,
+    "BioBioChile": 20,
+    "Cooperativa": 15,
+    "DuckDuckGo": 30
+}
+BENCH_LATENCY = 0.05 # Segundos que tarda el servidor de prueba en responder cada petición, para simular la red.
+BENCH_RSS_INTERVAL = 0.1 # Segundos entre mediciones de memoria.
+BENCH_PROFILES = list(DRIVER_PROFILES) # Perfiles del controlador que se miden (ver DRIVER_PROFILES).
+BENCH_ASSET_BYTES = 20 * 1024 # Peso de cada imagen y de la fuente de las páginas de prueba.
+BENCH_AD_HOST = "ads.doubleclick.net" # "Dominio" de los anuncios de prueba (es una carpeta del servidor local, pero coincide con los patrones de BLOCKED_RESOURCES).
+BENCH_AD_LATENCY = 0.5 # Segundos extra que tardan los anuncios de prueba, igual que los servidores de anuncios reales son los más lentos.
+BENCH_ARTICLE_PARAGRAPHS = 12 # Párrafos del cuerpo de cada noticia de prueba.
+BENCH_ARTICLE_SCRIPT_BYTES = 60 * 1024 # Peso del JavaScript en línea de cada noticia de prueba (las noticias reales pesan cientos de KB, casi todo scripts y menús).
+BENCH_RESULTS_DIR = "benchmarks" # Carpeta donde se guardan los resultados en JSON.
+BENCH_REGRESSION_THRESHOLD = 0.1 # Caída relativa de noticias/segundo (o aumento de llamadas por noticia) que se considera una regresión.
+SITE_SLUGS = {site: site.lower() for site in SITES} # Prefijo de cada sitio web en el servidor de prueba (ej: /adnradio/...).
+MONTH_NAMES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+DAY_NAMES = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+# Páginas de prueba: réplicas sintéticas de la estructura de cada sitio web, con los mismos XPaths que usa el scraper (ver SELECTORS).
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+@font-face {{ font-family: "Noticias"; src: url("/static/fuente.woff2"); }}
+body {{ font-family: "Noticias", sans-serif; }}
+.fila {{ display: block; min-height: 120px; background-size: cover; }}
+</style>
+<script async src="/{ad_host}/tag.js"></script>
+<script>const CONFIG = {config};
+async function cargar(offset) {{ // Pide el HTML de las noticias siguientes al servidor de prueba.
+    const response = await fetch(`${{CONFIG.api}}&offset=${{offset}}`);
+    return response.json();
+}}</script>
+</head>
+{body}
+</html>"""
+
+ADNRADIO_BODY = """<body>
+<div id="fusion-app"><main>
+<section><h1>Resultados de búsqueda</h1></section>
+<section><div><div id="resultados">{rows}</div></div></section>
+</main></div>
+<script>
+let offset = CONFIG.loaded, cargando = false;
+window.addEventListener("scroll", async () => {{ // Lazy-loading: al llegar al fondo se cargan más noticias.
+    if (cargando || offset >= CONFIG.total || window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    cargando = true;
+    const data = await cargar(offset);
+    document.getElementById("resultados").insertAdjacentHTML("beforeend", data.html);
+    offset += data.count;
+    cargando = false;
+}});
+</script>
+</body>"""
+
+BIOBIOCHILE_BODY = """<body>
+<main>
+<div><div><div><div>Búsqueda</div><div>{total} resultados</div></div></div></div>
+<div><section><div><div><div><div id="primeras">{rows}<div>
+<div id="resultados"></div>
+<div><button id="cargar-mas">Cargar más</button></div>
+</div></div></div></div></section></div>
+</main>
+<script src="/{ad_host}/anuncio.js"></script>
+<script>
+let offset = CONFIG.loaded;
+document.getElementById("cargar-mas").addEventListener("click", async (event) => {{
+    const data = await cargar(offset);
+    document.getElementById("resultados").insertAdjacentHTML("beforeend", data.html);
+    offset += data.count;
+    if (offset >= CONFIG.total) event.target.parentElement.remove(); // Sin más noticias el sitio web quita el botón.
+}});
+</script>
+</body>"""
+
+COOPERATIVA_HOME_BODY = """<body>
+<div id="buscador_media"><p><a href="#" onclick="document.getElementById('buscador').style.display = 'block'; return false;">Buscar</a></p></div>
+<form id="buscador" action="buscar" method="get" style="display: none;"><input class="buscador-input" name="q" type="text"></form>
+<div id="portada">{rows}</div>
+</body>"""
+
+COOPERATIVA_RESULTS_BODY = """<body>
+<div id="contenedor-pagina"><section><div><section>
+<div>Resultados para "{query}"</div>
+{rows}
+<div>{pages}</div>
+</section></div></section></div>
+</body>"""
+
+DUCKDUCKGO_BODY = """<body>
+<div id="vertical_wrapper"><div>
+<div></div><div></div>
+<div><div><div>
+<div></div><div></div>
+<div id="resultados">{rows}</div>
+</div></div></div>
+</div></div>
+<script>
+let offset = CONFIG.loaded, vqd="{vqd}"; // Token que DuckDuckGo exige para consultar news.js.
+document.getElementById("resultados").addEventListener("click", async (event) => {{
+    if (!event.target.classList.contains("result--more__btn")) return;
+    event.preventDefault();
+    const data = await cargar(offset);
+    event.target.classList.remove("result--more__btn"); // El botón sigue ocupando su resultado, las noticias nuevas (y otro botón si quedan más) se agregan después.
+    event.target.parentElement.style.display = "none";
+    document.getElementById("resultados").insertAdjacentHTML("beforeend", data.html);
+    offset += data.count;
+}});
+</script>
+</body>"""
+
+AD_SCRIPT = """// Anuncio que tapa los resultados de BioBioChile, lo agrega el script del servidor de anuncios (si se bloquea, no aparece).
+const anuncio = document.createElement("iframe");
+anuncio.id = "google_ads_iframe_benchmark";
+anuncio.style.cssText = "position: fixed; top: 0; left: 0; width: 300px; height: 250px;";
+anuncio.srcdoc = "<button id='btnClose' onclick='parent.document.getElementById(&quot;google_ads_iframe_benchmark&quot;).remove()'>Cerrar</button>";
+document.body.appendChild(anuncio);
+"""
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>{head}
+<script>window.dataLayer = [{padding}];</script>
+</head>
+<body><nav><a href="/">Portada</a><p>Menú del sitio</p></nav>
+<h1>{title}</h1>
+{article}
+<aside class="relacionadas"><p>Lee también: otra noticia</p></aside>
+<footer><p>Todos los derechos reservados</p></footer>
+</body></html>""" # Noticia de prueba: el cuerpo, autor y fecha van con la estructura de cada sitio web (ver ARTICLE_PARSERS en bodies.py), rodeados de párrafos que no son parte de la noticia.
+ARTICLE_AUTHORS = ["Redacción ADN", "Matías Vega", "Catalina Rojas", "Equipo de Prensa"]
+
+
+def _article(site, query, index): # Función para generar la noticia `index` de un sitio web de prueba, siempre la misma para el mismo índice.
+    published = date(2025, 1, 31) - timedelta(days=index // 10) # Diez noticias por día, de la más nueva a la más antigua.
+    return {
+        "title": f"Noticia {index + 1} de {site} sobre {query}",
+        "url": f"/{SITE_SLUGS[site]}/noticias/{index + 1}",
+        "date": published
+    }
+
+
+def _render_rows(site, query, offset, limit, total): # Función para generar el HTML de las noticias [offset, offset + limit) con la estructura de cada sitio web.
+    end = min(total, offset + limit)
+    rows = []
+    for index in range(offset, end):
+        article = _article(site, query, index)
+        title, url, published = escape(article["title"]), article["url"], article["date"]
+        image = f"/static/img/{index + 1}.jpg" # Cada noticia tiene su imagen, como en los sitios reales (va como fondo para no cambiar los XPaths).
+        if site == "ADNRadio":
+            author = "<p>Por Redacción ADN</p>" if index % 2 == 0 else "" # Algunas noticias tienen autor y otras no, como en el sitio real.
+            rows.append(f'<div class="fila" style="background-image: url({image})"><article><div><header><h3><a href="{url}">{title}</a></h3></header><div>{author}<p>{published:%d/%m/%Y}</p></div></div></article></div>')
+        elif site == "BioBioChile":
+            when = f"{DAY_NAMES[published.weekday()]} {published:%d} {MONTH_NAMES[published.month - 1]}, {published.year}"
+            row = f'<a class="fila" href="{url}"><article><div><img alt="" src="{image}"></div><div><h2>{title}</h2><div>{when}</div></div></article></a>'
+            rows.append(row if index < BENCH_PAGE_SIZES[site] else f"<div>{row}</div>") # Las primeras 20 noticias tienen un XPath distinto a todo el resto.
+        elif site == "Cooperativa":
+            rows.append(f'<article style="background-image: url({image})"><a href="{url}"><h3>{index + 1} "{title}"</h3><div><div><time>{published:%d/%m/%Y} 10:00</time></div></div></a></article>')
+        elif site == "DuckDuckGo":
+            rows.append(f'<div class="fila" style="background-image: url({image})"><div><h2><a href="{url}">{title}</a></h2><span>cooperativa.cl</span></div></div>')
+    if site == "DuckDuckGo" and end < total:
+        rows.append('<div><a class="result--more__btn" href="#">Más resultados</a></div>')
+    return "".join(rows), end - offset
+
+
+def _article_details(site, index): # Función para generar el autor, la fecha de publicación (con hora, en Chile) y los párrafos del cuerpo de la noticia `index`.
+    published = datetime.combine(_article(site, BENCH_QUERY, index)["date"], datetime.min.time()) + timedelta(hours=8 + index % 10, minutes=index * 7 % 60)
+    paragraphs = [f"Párrafo {number + 1} de la noticia {index + 1} de {site}, con el texto que el scraper solo puede obtener visitando la noticia." for number in range(BENCH_ARTICLE_PARAGRAPHS)]
+    return ARTICLE_AUTHORS[index % len(ARTICLE_AUTHORS)], published, paragraphs
+
+
+def _article_page(site, index): # Función para generar la página completa de la noticia `index` de un sitio web de prueba.
+    article = _article(site, BENCH_QUERY, index)
+    author, published, paragraphs = _article_details(site, index)
+    body = "".join(f"<p>{escape(paragraph)}</p>" for paragraph in paragraphs)
+    head = ""
+    if site == "ADNRadio": # Autor y fecha solo en JSON-LD.
+        head = f'<script type="application/ld+json">{json.dumps({"@context": "https://schema.org", "@type": "NewsArticle", "headline": article["title"], "datePublished": f"{published:%Y-%m-%dT%H:%M:%S}-03:00", "author": [{"@type": "Person", "name": author}]})}</script>'
+        content = f'<article><div class="a_md"><div class="a_md_a"><a href="/autor">{escape(author)}</a></div></div><div class="a_c clearfix" data-dtm-region="articulo_cuerpo">{body}</div></article>'
+    elif site == "BioBioChile": # Fecha en las etiquetas meta y autor en el texto.
+        head = f'<meta property="article:published_time" content="{published:%Y-%m-%dT%H:%M:%S}-03:00"><meta property="article:author" content="https://www.facebook.com/biobiochile">'
+        content = f'<div class="post"><div class="autores"><span>Por</span> <a href="/autor">{escape(author)}</a></div><div class="post-date">{published:%d/%m/%Y %H:%M}</div><div class="post-content clearfix">{body}</div></div>'
+    elif site == "Cooperativa": # Autor y fecha solo en el texto, la fecha en español.
+        when = f"{DAY_NAMES[published.weekday()]} {published.day} {MONTH_NAMES[published.month - 1].lower()} de {published.year} | {published:%H:%M}"
+        content = f'<div class="autor">Por {escape(author)}</div><div class="fecha-publicacion">{when}</div><div class="texto-nota"><div class="contenedor">{body}</div></div>'
+    else: # Cualquier otro sitio web (los resultados de DuckDuckGo), solo con la estructura genérica.
+        head = f'<meta name="author" content="{escape(author)}">'
+        content = f'<article><time datetime="{published:%Y-%m-%dT%H:%M:%S}-03:00">{published:%d/%m/%Y}</time>{body}</article>'
+    return ARTICLE_TEMPLATE.format(title=escape(article["title"]), head=head, padding=json.dumps("x" * BENCH_ARTICLE_SCRIPT_BYTES), article=content)
+
+
+def _page(title, body, config):
+    return PAGE_TEMPLATE.format(title=escape(title), config=json.dumps(config), body=body, ad_host=BENCH_AD_HOST)
+
+
+class FixtureServer: # Servidor HTTP local con páginas de prueba de cada sitio web, para medir los scrapers sin depender de los sitios reales.
+    def __init__(self, sizes=None, latency=BENCH_LATENCY, host="127.0.0.1", port=0): # `sizes` es la cantidad de noticias de cada sitio web (se puede cambiar entre ejecuciones).
+        self.sizes = dict(sizes or {site: BENCH_SIZES[0] for site in SITES})
+        self.latency = latency
+        self.requests = 0 # Cantidad de peticiones recibidas.
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Conexiones persistentes (keep-alive), igual que los sitios reales.
+            disable_nagle_algorithm = True # Los encabezados y el cuerpo se envían por separado, con Nagle cada respuesta en una conexión persistente esperaría ~40 ms el ACK del cliente.
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                try:
+                    status, content_type, content = server._route(self.path)
+                except Exception as e:
+                    status, content_type, content = 500, "text/plain", str(e)
+                body = content.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): # Sin registro por cada petición.
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def base_urls(self): # URL base de cada sitio web de prueba, para reemplazar WebScraper.base_urls.
+        return {site: f"{self.url}/{slug}" for site, slug in SITE_SLUGS.items()}
+
+    def _route(self, path): # Retorna el estado, el tipo y el contenido de la respuesta a una petición.
+        parts = urlsplit(path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        segments = parts.path.strip("/").split("/", 1)
+        if segments[0] == "static": # Imágenes y fuente de las páginas de prueba, solo importa su peso.
+            return 200, "font/woff2" if parts.path.endswith(".woff2") else "image/jpeg", "0" * BENCH_ASSET_BYTES
+        if segments[0] == BENCH_AD_HOST:
+            time.sleep(BENCH_AD_LATENCY)
+            return 200, "application/javascript", AD_SCRIPT if parts.path.endswith("anuncio.js") else "/* Seguimiento */"
+        site = next((name for name, slug in SITE_SLUGS.items() if slug == segments[0]), None)
+        if site is None:
+            return 404, "text/plain", "Sitio web no encontrado."
+        page = segments[1] if len(segments) > 1 else ""
+        query = params.get("q", params.get("s", BENCH_QUERY))
+        total, size = self.sizes.get(site, 0), BENCH_PAGE_SIZES[site]
+
+        if page.startswith("noticias/"):
+            index = int(page.split("/")[1]) - 1
+            if not 0 <= index < total:
+                return 404, "text/plain", "Noticia no encontrada."
+            return 200, "text/html", _article_page(site, index)
+        if page == "api": # Noticias siguientes ya renderizadas, las agrega el JavaScript de la página.
+            rows, count = _render_rows(site, query, int(params.get("offset", 0)), size, total)
+            return 200, "application/json", json.dumps({"html": rows, "count": count, "total": total})
+        config = {"api": f"/{SITE_SLUGS[site]}/api?q={quote_plus(query)}", "total": total, "loaded": min(size, total)}
+
+        if site == "ADNRadio" and page.rstrip("/") == "buscador":
+            rows, _ = _render_rows(site, query, 0, size, total)
+            return 200, "text/html", _page("ADNRadio", ADNRADIO_BODY.format(rows=rows), config)
+        if site == "BioBioChile" and page == "buscador.shtml":
+            rows, _ = _render_rows(site, query, 0, size, total)
+            return 200, "text/html", _page("BioBioChile", BIOBIOCHILE_BODY.format(rows=rows, total=total, ad_host=BENCH_AD_HOST), config)
+        if site == "Cooperativa" and page == "":
+            return 200, "text/html", _page("Cooperativa", COOPERATIVA_HOME_BODY.format(rows=_render_rows(site, "portada", 0, 5, 5)[0]), config)
+        if site == "Cooperativa" and page == "buscar": # Cada página de resultados se carga completa, con links a las páginas siguientes.
+            number = int(params.get("page", 1))
+            rows, _ = _render_rows(site, query, (number - 1) * size, size, total)
+            return 200, "text/html", _page("Cooperativa", COOPERATIVA_RESULTS_BODY.format(query=escape(query), rows=rows, pages=self._cooperativa_pages(query, number, total)), config)
+        if site == "DuckDuckGo" and page == "":
+            rows, _ = _render_rows(site, query, 0, size, total)
+            return 200, "text/html", _page("DuckDuckGo", DUCKDUCKGO_BODY.format(rows=rows, vqd="4-123456789"), config)
+        if site == "DuckDuckGo" and page == "news.js": # Endpoint JSON que usa DuckDuckGoNewsBackend (ver http_fetcher.py).
+            offset = int(params.get("s", 0))
+            end = min(total, offset + size)
+            results = [{
+                "title": escape(article["title"]),
+                "url": f"{self.url}{article['url']}",
+                "date": int(time.mktime(article["date"].timetuple()))
+            } for article in (_article(site, query, index) for index in range(offset, end))]
+            data = {"results": results}
+            if end < total:
+                data["next"] = f"news.js?q={quote_plus(query)}&s={end}"
+            return 200, "application/json", json.dumps(data)
+        return 404, "text/plain", "Página no encontrada."
+
+    def _cooperativa_pages(self, query, number, total): # Links de paginación: el scraper presiona a[página] en las primeras 5 páginas y a[6] desde la sexta.
+        pages = -(-total // BENCH_PAGE_SIZES["Cooperativa"])
+        position = min(number, 6) # Posición del link a la página siguiente.
+        links = []
+        for index in range(1, 7):
+            if index == position:
+                if number >= pages: # En la última página no hay link a la siguiente.
+                    break
+                links.append(f'<a href="buscar?q={quote_plus(query)}&page={number + 1}">Siguiente</a>')
+            else:
+                links.append(f'<a href="buscar?q={quote_plus(query)}&page={index}">{index}</a>')
+        return "".join(links)
+
+    def close(self): # Método para detener el servidor.
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class PeakRss: # Medidor del pico de memoria (RSS) del proceso y sus hijos (Chrome y chromedriver) mientras se ejecuta un bloque.
+    def __init__(self, interval=BENCH_RSS_INTERVAL):
+        self.interval = interval
+        self.peak = None # Pico de memoria en bytes.
+        self.chrome_peak = None # Pico de memoria de los procesos hijos (Chrome y chromedriver) en bytes.
+        self._stop = threading.Event()
+
+    def _sample(self):
+        process = psutil.Process(os.getpid())
+        children = 0
+        for child in process.children(recursive=True):
+            try:
+                children += child.memory_info().rss
+            except psutil.Error: # El proceso terminó mientras se medía.
+                pass
+        self.peak = max(self.peak or 0, process.memory_info().rss + children)
+        self.chrome_peak = max(self.chrome_peak or 0, children)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if psutil is not None:
+            self._sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if psutil is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        elif resource is not None: # Sin psutil solo se conoce el pico de Python (ru_maxrss está en KB en Linux y en bytes en macOS).
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def count_commands(driver): # Función para contar los comandos WebDriver que envía el controlador (incluye los de sus elementos, como click o text), retorna el contador.
+    counts = {}
+    execute = driver.execute
+
+    def counting_execute(command, params=None):
+        counts[command] = counts.get(command, 0) + 1
+        return execute(command, params)
+    driver.execute = counting_execute # Todos los comandos pasan por WebDriver.execute, también los de WebElement.
+    return counts
+
+
+def _result(site, mode, size, scraper, elapsed, counts, rss, metrics):
+    calls = sum(counts.values())
+    loads = metrics.calls(site).get("get") # Llamadas a driver.get: cuánto espera el scraper a que cargue cada página (depende de la estrategia de carga del perfil).
+    return {
+        "site": site,
+        "mode": mode,
+        "profile": scraper.profile if mode == "browser" else None,
+        "size": size,
+        "articles": scraper.count,
+        "complete": scraper.count == min(size, MAX_NEWS_PER_SITE), # Si el scraper no extrajo todas las noticias de prueba, el resultado no es comparable.
+        "wall_time": round(elapsed, 3),
+        "articles_per_sec": round(scraper.count / elapsed, 2) if elapsed else None,
+        "webdriver_calls": calls,
+        "calls_per_article": round(calls / scraper.count, 3) if scraper.count else None,
+        "commands": dict(sorted(counts.items(), key=lambda item: -item[1])),
+        "phases": metrics.phases(site), # Cantidad y tiempo de cada fase (esperas, desplazamiento, extracción, etc.).
+        "page_load_ms": round(loads["seconds"] / loads["count"] * 1000, 1) if loads else None,
+        "peak_rss_mb": round(rss.peak / 1024 ** 2, 1) if rss.peak else None,
+        "chrome_rss_mb": round(rss.chrome_peak / 1024 ** 2, 1) if rss.chrome_peak else None
+    }
+
+
+def bench_browser(driver, server, site, size, query=BENCH_QUERY, profile=DEFAULT_DRIVER_PROFILE): # Función para medir el scraper de un sitio web con el navegador, `profile` debe ser el perfil con el que se creó `driver`.
+    server.sizes[site] = size
+    metrics = Metrics()
+    scraper = WebScraper(None, driver=driver, keep_data=False, metrics=metrics, profile=profile)
+    scraper.base_urls.update(server.base_urls)
+    counts = count_commands(driver)
+    try:
+        with PeakRss() as rss:
+            start = time.perf_counter()
+            getattr(scraper, SITES[site])(query)
+            elapsed = time.perf_counter() - start
+    finally:
+        del driver.execute # Se deja de contar para la siguiente medición.
+    return _result(site, "browser", size, scraper, elapsed, counts, rss, metrics)
+
+
+def bench_http(fetcher, server, site, size, query=BENCH_QUERY): # Función para medir un sitio web de HTTP_BACKENDS solo con HTTP.
+    server.sizes[site] = size
+    metrics = Metrics()
+    scraper = WebScraper(None, fetcher=fetcher, keep_data=False, metrics=metrics)
+    scraper.base_urls.update(server.base_urls)
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        scraper._scrape_http(site, query)
+        elapsed = time.perf_counter() - start
+    return _result(site, "http", size, scraper, elapsed, {}, rss, metrics)
+
+
+def bench_bodies(server, site, size, query=BENCH_QUERY): # Función para medir la descarga del cuerpo de las noticias de un sitio web (bodies.py) con una base de datos nueva.
+    server.sizes[site] = size
+    rows = [{"URL": f"{server.url}{_article(site, query, index)['url']}", "Website": site} for index in range(size)]
+    store = ArticleStore(":memory:")
+    try:
+        with PeakRss() as rss:
+            summary = fetch_bodies(store, rows, BodyFetcher())
+        parsed = 0 # Noticias cuyo cuerpo, autor y fecha de publicación se extrajeron correctamente.
+        for index, row in enumerate(rows):
+            author, published, paragraphs = _article_details(site, index)
+            stored = store.body(row["URL"]) or {}
+            parsed += stored.get("Author") == author and (stored.get("Published") or "").startswith(published.isoformat()) and stored.get("Body") == "\n\n".join(paragraphs)
+    finally:
+        store.close()
+    elapsed = summary["seconds"]
+    return {
+        "site": site,
+        "mode": "bodies",
+        "profile": None,
+        "size": size,
+        "articles": summary["fetched"],
+        "complete": parsed == size,
+        "wall_time": elapsed,
+        "articles_per_sec": round(summary["fetched"] / elapsed, 2) if elapsed else None,
+        "articles_per_min": summary["per_minute"],
+        "webdriver_calls": 0,
+        "calls_per_article": None,
+        "commands": {},
+        "phases": {},
+        "page_load_ms": None,
+        "peak_rss_mb": round(rss.peak / 1024 ** 2, 1) if rss.peak else None,
+        "chrome_rss_mb": None
+    }
+
+
+def run(driver_path, sites=None, sizes=None, http=True, latency=BENCH_LATENCY, profiles=None, bodies=True): # Función para medir todos los scrapers en todos los tamaños y perfiles del controlador (y la descarga de cuerpos, si `bodies`), retorna el informe.
+    sites = list(sites or SITES)
+    sizes = [min(size, MAX_NEWS_PER_SITE) for size in (sizes or BENCH_SIZES)]
+    profiles = list(profiles or BENCH_PROFILES)
+    server = FixtureServer(latency=latency)
+    fetcher = HttpFetcher() if http else None
+    browser = None
+    results = []
+    try:
+        for profile in profiles: # Un controlador por perfil, porque la estrategia de carga y los argumentos de Chrome se fijan al crearlo.
+            driver = create_driver(driver_path, profile)
+            browser = driver.capabilities.get("browserVersion")
+            try:
+                for size in sizes:
+                    for site in sites:
+                        print(f"= = = {site} con {size} noticias (navegador, perfil {profile}) = = =")
+                        results.append(bench_browser(driver, server, site, size, profile=profile))
+            finally:
+                driver.quit()
+        for size in sizes: # Por HTTP (y la descarga de cuerpos) no hay navegador, así que se mide una sola vez.
+            for site in sites:
+                if fetcher is not None and site in HTTP_BACKENDS:
+                    print(f"= = = {site} con {size} noticias (HTTP) = = =")
+                    results.append(bench_http(fetcher, server, site, size))
+                if bodies:
+                    print(f"= = = {site} con {size} noticias (cuerpos) = = =")
+                    results.append(bench_bodies(server, site, size))
+    finally:
+        if fetcher is not None:
+            fetcher.close()
+        server.close()
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "browser": browser},
+        "config": {"sites": sites, "sizes": sizes, "profiles": profiles, "latency": latency, "page_sizes": BENCH_PAGE_SIZES},
+        "results": results
+    }
+
+
+def _key(result): # Llave para comparar un resultado entre informes. Los informes anteriores a los perfiles usaban Chrome completo ("full").
+    return result["site"], result["mode"], result["size"], result.get("profile", "full" if result["mode"] == "browser" else None)
+
+
+def compare(previous, current, threshold=BENCH_REGRESSION_THRESHOLD): # Función para comparar dos informes, retorna las regresiones encontradas.
+    before = {_key(result): result for result in previous["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get(_key(result))
+        if old is None or not old["articles_per_sec"] or not result["articles_per_sec"]:
+            continue
+        speed = result["articles_per_sec"] / old["articles_per_sec"] - 1
+        calls = (result["calls_per_article"] or 0) - (old["calls_per_article"] or 0)
+        regressed = speed < -threshold or (old["calls_per_article"] and calls / old["calls_per_article"] > threshold)
+        print(f"{result['site']} ({result['mode']}{', ' + result['profile'] if result.get('profile') else ''}, {result['size']}): {old['articles_per_sec']} -> {result['articles_per_sec']} noticias/s ({speed:+.1%}), "
+              f"{old['calls_per_article']} -> {result['calls_per_article']} llamadas/noticia{' REGRESIÓN' if regressed else ''}")
+        if regressed:
+            regressions.append(result)
+    return regressions
+
+
+def print_report(report): # Función para mostrar los resultados como tabla en la consola.
+    print(f"{'Sitio web':<12} {'Modo':<8} {'Perfil':<8} {'Noticias':>9} {'Tiempo (s)':>11} {'Noticias/s':>11} {'Llamadas/noticia':>17} {'Carga (ms)':>11} {'RSS (MB)':>9} {'Chrome (MB)':>12}")
+    for result in report["results"]:
+        print(f"{result['site']:<12} {result['mode']:<8} {result.get('profile') or '-':<8} {result['articles']:>9} {result['wall_time']:>11} {result['articles_per_sec'] or '-':>11} "
+              f"{result['calls_per_article'] or '-':>17} {result.get('page_load_ms') or '-':>11} {result['peak_rss_mb'] or '-':>9} {result.get('chrome_rss_mb') or '-':>12}"
+              f"{'' if result['complete'] else '  (incompleto)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide los scrapers contra páginas de prueba locales (sin conexión a los sitios reales).")
+    parser.add_argument("--driver", default=None, help="Ruta de acceso al controlador del browser (si no se entrega, Selenium lo busca).")
+    parser.add_argument("--sites", nargs="+", choices=list(SITES), help="Sitios web a medir (predeterminado: todos).")
+    parser.add_argument("--sizes", nargs="+", type=int, help=f"Cantidad de noticias de prueba por sitio web (predeterminado: {BENCH_SIZES}, máximo {MAX_NEWS_PER_SITE}).")
+    parser.add_argument("--latency", type=float, default=BENCH_LATENCY, help="Segundos de latencia simulada por petición.")
+    parser.add_argument("--profiles", nargs="+", choices=list(DRIVER_PROFILES), help=f"Perfiles del controlador a medir (predeterminado: {BENCH_PROFILES}).")
+    parser.add_argument("--no-http", action="store_true", help="No medir los sitios web de HTTP_BACKENDS por HTTP.")
+    parser.add_argument("--no-bodies", action="store_true", help="No medir la descarga del cuerpo de las noticias (bodies.py).")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados (predeterminado: benchmarks/<fecha>.json).")
+    parser.add_argument("--compare", help="Archivo JSON de una ejecución anterior para comparar.")
+    args = parser.parse_args()
+
+    report = run(args.driver, args.sites, args.sizes, http=not args.no_http, latency=args.latency, profiles=args.profiles, bodies=not args.no_bodies)
+    print_report(report)
+
+    output = args.output or os.path.join(BENCH_RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report)
+        if regressions:
+            print(f"{len(regressions)} regresiones encontradas.")
+            sys.exit(1)
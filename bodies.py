@@ -0,0 +1,278 @@
+from postprocess import SPANISH_MONTHS, LONG_DATE_PATTERN, NUMERIC_DATE_PATTERN
+from store import ArticleStore, STORE_PATH
+from analytics import read_articles
+from fake_useragent import UserAgent
+from urllib.parse import urlsplit
+from collections import deque
+from datetime import datetime
+from lxml import etree, html
+import argparse
+import asyncio
+import httpx
+import json
+import time
+import re
+
+# Constantes.
+BODY_CONCURRENCY = 64 # Cantidad máxima de noticias descargándose al mismo tiempo, sumando todos los sitios web.
+BODY_PER_HOST = 8 # Conexiones (y noticias descargándose al mismo tiempo) por cada sitio web, para no ser bloqueados.
+BODY_TIMEOUT = 15 # Tiempo máximo (en segundos) de cada petición.
+BODY_RETRIES = 2 # Reintentos de una noticia ante errores de red o respuestas de RETRY_STATUS.
+BODY_RETRY_DELAY = 1 # Segundos de espera antes del primer reintento (se duplica en cada uno).
+BODY_HOST_FAILURES = 10 # Noticias seguidas de un mismo sitio web sin poder conectarse para dar por hecho que está caído y dejar el resto para la siguiente ejecución.
+RETRY_STATUS = (429, 500, 502, 503, 504) # Respuestas temporales (límite de peticiones o servidor caído) que vale la pena reintentar.
+SITE_HOSTS = { # Sitio web de cada dominio, así las noticias de DuckDuckGo que apuntan a estos sitios también usan su parser.
+    "adnradio.cl": "ADNRadio",
+    "biobiochile.cl": "BioBioChile",
+    "cooperativa.cl": "Cooperativa"
+}
+ARTICLE_PARSERS = { # XPaths del cuerpo (párrafos), autor y fecha de publicación de cada sitio web, se usa el primero que encuentre algo. None se usa para cualquier otro sitio web.
+    "ADNRadio": {
+        "body": ["//div[@data-dtm-region='articulo_cuerpo']/p", "//div[contains(@class, 'a_c')]/p"],
+        "author": ["//div[contains(@class, 'a_md_a')]//a", "//span[contains(@class, 'a_md_a_n')]"],
+        "published": ["//div[contains(@class, 'a_md_f')]//time/@datetime", "//time/@datetime"]
+    },
+    "BioBioChile": {
+        "body": ["//div[contains(@class, 'post-content')]/p", "//div[contains(@class, 'post-content')]//p"],
+        "author": ["//div[contains(@class, 'autores')]//a", "//a[contains(@class, 'autor')]"],
+        "published": ["//div[contains(@class, 'post-date')]"]
+    },
+    "Cooperativa": {
+        "body": ["//div[contains(@class, 'texto-nota')]//p", "//div[@id='cuerpo-ad']//p"],
+        "author": ["//div[contains(@class, 'autor')]", "//span[contains(@class, 'autor')]"],
+        "published": ["//div[contains(@class, 'fecha-publicacion')]", "//span[contains(@class, 'fecha')]"]
+    },
+    None: {
+        "body": ["//article//p", "//main//p", "//p"],
+        "author": ["//*[@rel='author']", "//*[contains(@class, 'author')]"],
+        "published": ["//time/@datetime", "//time"]
+    }
+}
+METADATA_XPATHS = { # Datos estructurados que publican casi todos los sitios web de noticias, se revisan antes que los XPaths de ARTICLE_PARSERS.
+    "author": ["//meta[@name='author']/@content", "//meta[@property='article:author']/@content"],
+    "published": ["//meta[@property='article:published_time']/@content", "//meta[@itemprop='datePublished']/@content"]
+}
+TIME_PATTERN = re.compile(r"(?P<hour>\d{1,2}):(?P<minute>\d{2})") # Hora que acompaña a la fecha en el texto (ej: 31 enero de 2025 | 10:21).
+TEXT_DATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (LONG_DATE_PATTERN, NUMERIC_DATE_PATTERN)] # Fechas en texto, las mismas que entiende postprocess.
+AUTHOR_PREFIX = re.compile(r"^\s*(?:por|by)[:\s]+", re.IGNORECASE) # "Por" antes del nombre del autor.
+
+
+def site_for(url, website=None): # Función para obtener el sitio web cuyo parser corresponde a un URL: por su dominio o, si no se conoce, por el sitio web donde se encontró la noticia.
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError: # URL inválido, se usa el sitio web donde se encontró.
+        host = ""
+    for domain, site in SITE_HOSTS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return site
+    return website if website in ARTICLE_PARSERS else None
+
+
+def _text(value): # Función para obtener el texto de un resultado de XPath (elemento o atributo) con los espacios normalizados.
+    text = value.text_content() if isinstance(value, html.HtmlElement) else str(value)
+    return " ".join(text.split())
+
+
+def _first(document, xpaths): # Función para obtener el primer texto no vacío de una lista de XPaths.
+    for xpath in xpaths:
+        for value in document.xpath(xpath):
+            text = _text(value)
+            if text:
+                return text
+    return None
+
+
+def _paragraphs(document, xpaths): # Función para obtener el cuerpo (párrafos separados por una línea en blanco) con el primer XPath que encuentre algo.
+    for xpath in xpaths:
+        paragraphs = [_text(paragraph) for paragraph in document.xpath(xpath)]
+        body = "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+        if body:
+            return body
+    return None
+
+
+def _json_ld(document): # Función para obtener el NewsArticle (JSON-LD) de una página, retorna {} si no tiene.
+    for script in document.xpath("//script[@type='application/ld+json']"):
+        try:
+            data = json.loads(script.text or "")
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if isinstance(item, dict) and ("datePublished" in item or "articleBody" in item):
+                return item
+    return {}
+
+
+def _author_name(author): # Función para obtener el nombre del autor de JSON-LD (texto, objeto Person o lista de ellos).
+    if isinstance(author, list):
+        names = [_author_name(item) for item in author]
+        return ", ".join(name for name in names if name) or None
+    if isinstance(author, dict):
+        author = author.get("name")
+    return " ".join(author.split()) if isinstance(author, str) and author.strip() else None
+
+
+def parse_timestamp(text): # Función para convertir la fecha de publicación (ISO 8601 o en texto, con su hora si la tiene) a ISO 8601, retorna None si no es una fecha.
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.strip()).isoformat()
+    except ValueError:
+        pass
+    for pattern in TEXT_DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        month = match.group("month").lower()
+        month = int(month) if month.isdigit() else SPANISH_MONTHS.get(month)
+        clock = TIME_PATTERN.search(text, match.end())
+        try:
+            return datetime(int(match.group("year")), month, int(match.group("day")), *(int(value) for value in clock.groups()) if clock else ()).isoformat()
+        except (TypeError, ValueError): # Mes desconocido o fecha inválida.
+            return None
+    return None
+
+
+def parse_article(content, site=None, encoding=None): # Función para extraer el cuerpo, autor y fecha de publicación de una noticia con el parser de su sitio web, retorna un diccionario con Body, Author y Published (None si no se encontró).
+    document = html.fromstring(content, parser=html.HTMLParser(encoding=encoding) if encoding else None) # `content` en bytes: lxml rechaza texto con declaración <?xml encoding?>, y sin `encoding` (el charset de la respuesta) detecta la codificación de la página.
+    parser = ARTICLE_PARSERS.get(site, ARTICLE_PARSERS[None])
+    metadata = _json_ld(document)
+
+    body = _paragraphs(document, parser["body"])
+    if not body and metadata.get("articleBody"): # Algunos sitios web solo publican el cuerpo completo en JSON-LD.
+        body = metadata["articleBody"].strip()
+    if not body and parser is not ARTICLE_PARSERS[None]: # El sitio web cambió su diseño (o es una página distinta, como un especial), se intenta con el parser genérico.
+        body = _paragraphs(document, ARTICLE_PARSERS[None]["body"])
+
+    author = _author_name(metadata.get("author")) or _first(document, METADATA_XPATHS["author"] + parser["author"])
+    if author and author.startswith("http"): # article:author suele ser el URL del perfil del autor.
+        author = _first(document, parser["author"])
+    published = parse_timestamp(metadata.get("datePublished") if isinstance(metadata.get("datePublished"), str) else None)
+    for xpath in METADATA_XPATHS["published"] + parser["published"]:
+        if published:
+            break
+        published = parse_timestamp(_first(document, [xpath]))
+    return {"Body": body or None, "Author": AUTHOR_PREFIX.sub("", author) if author else None, "Published": published}
+
+
+class BodyFetcher: # Descarga concurrente (asyncio) del cuerpo de las noticias, con un pool de conexiones y un límite de descargas por cada sitio web.
+    def __init__(self, concurrency=BODY_CONCURRENCY, per_host=BODY_PER_HOST, retries=BODY_RETRIES, transport=None): # Inicializador del descargador. `transport` permite reemplazar la red (por ejemplo, con httpx.MockTransport).
+        ua = UserAgent(os={"Windows", "Linux", "Ubuntu"}) # Utilizar User-Agents distintos por cada ejecución del código, igual que el navegador.
+        self.headers = {"User-Agent": ua.random, "Accept-Language": "es-CL,es;q=0.9"}
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.retries = retries
+        self.transport = transport
+
+    def _client(self): # Cliente de un sitio web, su pool tiene tantas conexiones como descargas al mismo tiempo permite el sitio web, así siempre se reutilizan (keep-alive).
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=BODY_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.per_host, max_keepalive_connections=self.per_host),
+            follow_redirects=True,
+            transport=self.transport
+        )
+
+    async def fetch(self, client, url, site=None): # Método para descargar y extraer una noticia, reintentando los errores temporales. Retorna Body, Author, Published y el estado HTTP (None si falló la conexión).
+        delay = BODY_RETRY_DELAY
+        status = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(delay)
+                delay *= 2
+            try:
+                response = await client.get(url)
+            except httpx.TransportError: # Error de red o tiempo de espera agotado.
+                status = None
+                continue
+            except (httpx.HTTPError, httpx.InvalidURL): # Demasiadas redirecciones, contenido que no se puede descomprimir o URL inválido (por ejemplo, con caracteres de control), reintentar no cambia nada.
+                status = None
+                break
+            status = response.status_code
+            if status < 400:
+                try:
+                    article = await asyncio.to_thread(parse_article, response.content, site, response.charset_encoding) # lxml suelta el GIL mientras analiza, así las descargas siguen avanzando.
+                except (etree.LxmlError, ValueError): # Respuesta vacía o HTML que lxml no puede analizar, cuenta como fallida.
+                    break
+                return {**article, "status": status}
+            if status not in RETRY_STATUS:
+                break
+        return {"Body": None, "Author": None, "Published": None, "status": status}
+
+    async def fetch_all(self, items, callback): # Método para descargar todas las noticias [(URL, sitio web), ...], llama a `callback(url, website, result)` a medida que termina cada una.
+        queues = {} # Noticias pendientes de cada dominio, cada uno con sus propias conexiones, así un sitio web lento no frena a los demás.
+        for url, website in items:
+            try:
+                host = urlsplit(url).netloc.lower()
+            except ValueError: # URL inválido (por ejemplo, https://[mal/a).
+                host = ""
+            if not host: # Falla solo esta noticia, no toda la descarga.
+                callback(url, website, {"Body": None, "Author": None, "Published": None, "status": None})
+                continue
+            queues.setdefault(host, deque()).append((url, website))
+        limit = asyncio.Semaphore(self.concurrency)
+
+        failures = {host: 0 for host in queues} # Noticias seguidas de cada dominio que fallaron sin respuesta del servidor.
+
+        async def worker(host, client, queue):
+            while queue:
+                url, website = queue.popleft()
+                async with limit:
+                    result = await self.fetch(client, url, site_for(url, website))
+                callback(url, website, result)
+                failures[host] = failures[host] + 1 if result["status"] is None else 0
+                if failures[host] == BODY_HOST_FAILURES:
+                    print(f"No se pudo conectar con {host}, se omiten sus {len(queue)} noticias restantes.")
+                    for url, website in queue:
+                        callback(url, website, {"Body": None, "Author": None, "Published": None, "status": None})
+                    queue.clear()
+
+        clients = {host: self._client() for host in queues}
+        try:
+            await asyncio.gather(*(worker(host, clients[host], queue) for host, queue in queues.items() for _ in range(min(self.per_host, len(queue)))))
+        finally:
+            for client in clients.values():
+                await client.aclose()
+
+
+def fetch_bodies(store, rows, fetcher=None): # Función para descargar y guardar en `store` el cuerpo de las noticias (diccionarios con URL y Website) que aún no lo tienen, retorna un resumen.
+    items = store.missing_bodies(rows)
+    fetcher = fetcher or BodyFetcher()
+    summary = {"articles": len(items), "fetched": 0, "failed": 0}
+
+    def save(url, website, result):
+        store.add_body(url, website, result["Body"], result["Author"], result["Published"], result["status"])
+        summary["fetched" if result["Body"] else "failed"] += 1
+
+    start = time.perf_counter()
+    if items:
+        asyncio.run(fetcher.fetch_all(items, save))
+    store.flush()
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 2)
+    summary["per_minute"] = round(summary["fetched"] / elapsed * 60) if elapsed and items else None
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Descarga el cuerpo, autor y fecha de publicación de las noticias extraídas que aún no lo tienen.")
+    parser.add_argument("paths", nargs="*", help="Archivos o carpetas con noticias (.csv, .jsonl, .parquet). Si no se entregan, se usan las noticias de la base de datos.")
+    parser.add_argument("--db", default=STORE_PATH, help=f"Base de datos donde se guardan los cuerpos (predeterminado: {STORE_PATH}).")
+    parser.add_argument("--query", help="Solo las noticias de esta búsqueda (de la base de datos).")
+    parser.add_argument("--website", help="Solo las noticias de este sitio web.")
+    parser.add_argument("--concurrency", type=int, default=BODY_CONCURRENCY, help=f"Descargas al mismo tiempo en total (predeterminado: {BODY_CONCURRENCY}).")
+    parser.add_argument("--per-host", type=int, default=BODY_PER_HOST, help=f"Descargas al mismo tiempo por sitio web (predeterminado: {BODY_PER_HOST}).")
+    args = parser.parse_args()
+
+    store = ArticleStore(args.db)
+    try:
+        if args.paths:
+            frames = [read_articles(path) for path in args.paths]
+            rows = [row for df in frames for row in df.astype(object).where(df.notna(), None).to_dict("records") if not args.website or row["Website"] == args.website]
+        else:
+            rows = store.articles(args.query, args.website)
+        summary = fetch_bodies(store, rows, BodyFetcher(args.concurrency, args.per_host))
+    finally:
+        store.close()
+    print(f"{summary['fetched']} de {summary['articles']} noticias descargadas en {summary['seconds']} s ({summary['per_minute'] or '-'} por minuto), {summary['failed']} con error.")
@@ -0,0 +1,120 @@
+from store import normalize_query
+import threading
+import hashlib
+import json
+import time
+import os
+
+# Constantes.
+CACHE_DIR = "cache" # Carpeta donde se guardan los resultados de cada búsqueda por sitio web.
+CACHE_TTL = 60 * 60 # Segundos durante los que un resultado se considera actualizado.
+CACHE_MAX_STALE = 24 * 60 * 60 # Segundos durante los que un resultado desactualizado todavía se entrega (mientras se actualiza en segundo plano).
+CACHE_MAX_BYTES = 500 * 1024 * 1024 # Tamaño máximo del caché en el disco, al pasarlo se eliminan los resultados usados hace más tiempo.
+
+
+class ResultCache: # Caché en disco de los resultados de cada (búsqueda, sitio web, MAX_NEWS_PER_SITE), con expiración y límite de tamaño.
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_stale=CACHE_MAX_STALE, max_bytes=CACHE_MAX_BYTES): # Inicializador del caché, carga el índice si ya existe.
+        self.directory = directory
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._refreshing = set() # Llaves que se están actualizando en segundo plano.
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refreshes": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        self._index = {} # Llave -> tamaño, fecha de creación y último uso de cada resultado.
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as file:
+                self._index = {key: entry for key, entry in json.load(file).items() if os.path.exists(self._path(key))}
+
+    @staticmethod
+    def key(query, site, max_news): # Llave de un resultado, la búsqueda se normaliza para que "CDE" y " cde " compartan resultado.
+        return hashlib.sha1(json.dumps([normalize_query(query), site, max_news]).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, query, site, max_news): # Método para obtener un resultado, retorna (noticias, actualizado) o None si no está o es demasiado antiguo.
+        key = self.key(query, site, max_news)
+        with self._lock:
+            entry = self._index.get(key)
+            age = time.time() - entry["created"] if entry else None
+            if entry is None or age >= self.max_stale:
+                self._stats["misses"] += 1
+                return None
+            fresh = age < self.ttl
+        try:
+            with open(self._path(key), encoding="utf-8") as file: # Se lee sin el candado, así un resultado grande no bloquea al resto.
+                rows = json.load(file)
+        except FileNotFoundError: # _evict lo eliminó entre que se soltó el candado y se abrió el archivo.
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits" if fresh else "stale_hits"] += 1
+            if key in self._index:
+                self._index[key]["accessed"] = time.time()
+                self._save_index() # El último uso se guarda en el disco, si no el orden LRU se pierde al reiniciar.
+        return rows, fresh
+
+    def put(self, query, site, max_news, rows): # Método para guardar el resultado de un sitio web y eliminar los menos usados si el caché se pasa de tamaño.
+        key = self.key(query, site, max_news)
+        data = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+        temp_path = f"{self._path(key)}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self._path(key)) # Reemplazo atómico, quien esté leyendo el resultado anterior no ve un archivo a medias.
+        with self._lock:
+            now = time.time()
+            self._index[key] = {"size": len(data), "created": now, "accessed": now}
+            self._evict()
+            self._save_index()
+
+    def refresh(self, query, site, max_news, scrape): # Método para actualizar un resultado en segundo plano con `scrape()`, sin repetir actualizaciones en curso.
+        key = self.key(query, site, max_news)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+
+        def run():
+            try:
+                rows = scrape()
+                if rows:
+                    self.put(query, site, max_news, rows)
+            except Exception as e:
+                print(f"No se pudo actualizar el caché de {site}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        threading.Thread(target=run, daemon=True).start()
+
+    def _evict(self): # Elimina los resultados usados hace más tiempo (LRU) hasta quedar bajo el tamaño máximo.
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda key: self._index[key]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)["size"]
+            self._stats["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _save_index(self):
+        temp_path = f"{self._index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._index, file)
+        os.replace(temp_path, self._index_path)
+
+    def stats(self): # Métricas del caché: aciertos, fallos, actualizaciones, eliminaciones y tamaño.
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": (self._stats["hits"] + self._stats["stale_hits"]) / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values())
+            }
@@ -0,0 +1,63 @@
+from store import normalize_query
+import threading
+import hashlib
+import json
+import time
+import os
+
+# Constantes.
+CHECKPOINT_DIR = "checkpoints" # Carpeta donde se guarda el punto de control de cada búsqueda por sitio web.
+CHECKPOINT_INTERVAL = 15 # Segundos mínimos entre dos escrituras del punto de control de un mismo sitio web (la posición en memoria se actualiza siempre).
+CHECKPOINT_MAX_AGE = 24 * 60 * 60 # Segundos durante los que un punto de control sirve para retomar, después los resultados del sitio web ya cambiaron demasiado.
+
+
+class CheckpointStore: # Puntos de control en disco de cada (búsqueda, sitio web): página, offset y noticias escritas, para retomar un scraping largo donde quedó.
+    def __init__(self, directory=CHECKPOINT_DIR, interval=CHECKPOINT_INTERVAL, max_age=CHECKPOINT_MAX_AGE): # Inicializador de los puntos de control.
+        self.directory = directory
+        self.interval = interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._last_save = {} # Llave -> momento de la última escritura, para no escribir en cada noticia.
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(query, site): # Llave de un punto de control, la búsqueda se normaliza igual que en el caché.
+        return hashlib.sha1(json.dumps([normalize_query(query), site]).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, query, site): # Método para obtener la posición guardada de una búsqueda en un sitio web, retorna None si no hay o es demasiado antigua.
+        path = self._path(self.key(query, site))
+        try:
+            with open(path, encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError): # No existe o quedó a medio escribir.
+            return None
+        if time.time() - checkpoint["saved_at"] > self.max_age:
+            self.clear(query, site)
+            return None
+        return checkpoint["position"]
+
+    def save(self, query, site, position, force=False, flush=None): # Método para guardar la posición, solo si pasaron `interval` segundos desde la última escritura (o si se fuerza). `flush` se llama justo antes de escribir. Retorna True si se escribió.
+        key = self.key(query, site)
+        with self._lock:
+            if not force and time.monotonic() - self._last_save.get(key, float("-inf")) < self.interval:
+                return False
+            self._last_save[key] = time.monotonic()
+        if flush is not None: # Lo extraído hasta la posición se guarda primero, así el punto de control nunca apunta más allá de lo guardado.
+            flush()
+        path = self._path(key)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({"query": query, "site": site, "saved_at": time.time(), "position": position}, file, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path) # Se reemplaza de una vez, así un corte a mitad de la escritura no deja un punto de control roto.
+        return True
+
+    def clear(self, query, site): # Método para eliminar el punto de control cuando el sitio web terminó de scrapearse.
+        key = self.key(query, site)
+        with self._lock:
+            self._last_save.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,70 @@
+from fake_useragent import UserAgent
+from urllib.parse import urljoin, urlparse, parse_qs
+from lxml import html
+import httpx
+import time
+import re
+
+# Constantes.
+HTTP_TIMEOUT = 15 # Tiempo máximo (en segundos) de cada petición HTTP.
+HTTP_MAX_CONNECTIONS = 20 # Cantidad máxima de conexiones abiertas por el cliente.
+HTTP_MAX_KEEPALIVE = 10 # Cantidad de conexiones que se mantienen abiertas (keep-alive) para reutilizarlas.
+VQD_PATTERN = re.compile(r"vqd=[\"']?([\d-]+)") # Token que DuckDuckGo exige para consultar sus resultados de noticias.
+
+
+class HttpFetcher: # Cliente HTTP con conexiones persistentes para scrapear sin abrir un navegador.
+    def __init__(self, transport=None): # Inicializador del cliente. `transport` permite reemplazar la red (por ejemplo, con respuestas grabadas de httpx.MockTransport).
+        ua = UserAgent(os={"Windows", "Linux", "Ubuntu"}) # Utilizar User-Agents distintos por cada ejecución del código, igual que el navegador.
+        self.client = httpx.Client(
+            headers={"User-Agent": ua.random, "Accept-Language": "es-CL,es;q=0.9"},
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+            follow_redirects=True,
+            transport=transport
+        )
+
+    def get(self, url, params=None): # Método para descargar una página y retornar su contenido como texto.
+        response = self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.text
+
+    def get_json(self, url, params=None): # Método para descargar una respuesta JSON.
+        response = self.client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self): # Método para cerrar las conexiones del cliente.
+        self.client.close()
+
+
+class DuckDuckGoNewsBackend: # Backend para las noticias de DuckDuckGo, que las carga desde un endpoint JSON (news.js).
+    def fetch(self, fetcher, query, limit, base_url, start=0, stop=None): # Retorna las noticias encontradas desde la posición `start`, hasta `limit` o hasta la última página. `stop` recibe las noticias de cada página y retorna True para dejar de paginar (por ejemplo, al llegar a las ya guardadas).
+        page = fetcher.get(f"{base_url}/", params={"q": query.strip(), "kl": "cl-es", "iar": "news", "ia": "news"})
+        match = VQD_PATTERN.search(page)
+        if not match:
+            raise ValueError("DuckDuckGo no entregó el token vqd.")
+
+        rows = []
+        url = f"{base_url}/news.js"
+        params = {"l": "cl-es", "o": "json", "noamp": "1", "q": query.strip(), "vqd": match.group(1), "p": "-1"}
+        if start:
+            params["s"] = start # news.js pagina con el parámetro "s", así se salta directo a la posición.
+        while len(rows) < limit:
+            data = fetcher.get_json(url, params)
+            results = data.get("results", [])
+            page = [{
+                "Title": html.fromstring(result["title"]).text_content() if result.get("title") else None, # Los títulos vienen con entidades HTML.
+                "Date": time.strftime("%d/%m/%Y", time.gmtime(result["date"])) if result.get("date") else None, # Por HTTP si se obtiene la fecha (timestamp UNIX).
+                "URL": _unwrap_redirect(result.get("url"))
+            } for result in results]
+            rows.extend(page)
+            if not results or not data.get("next") or (stop is not None and stop(page)): # No hay más páginas de resultados (o no se necesitan).
+                break
+            url, params = urljoin(f"{base_url}/", data["next"]), None # "next" ya incluye todos los parámetros de la página siguiente.
+        return rows[:limit]
+
+
+def _unwrap_redirect(url): # Función para obtener el URL real cuando DuckDuckGo lo envuelve en su redirección (/l/?uddg=...).
+    if url and "uddg=" in url:
+        return parse_qs(urlparse(url).query).get("uddg", [url])[0]
+    return url
@@ -0,0 +1,172 @@
+from web_scraper_analitic import WebScraper, DriverPool, SITES, HTTP_BACKENDS
+from concurrent.futures import ThreadPoolExecutor
+from store import normalize_query
+from sinks import Sink, CsvSink
+import threading
+import uuid
+import time
+import os
+
+# Constantes.
+JOB_WORKERS = 2 # Cantidad de búsquedas que se ejecutan al mismo tiempo, el resto espera en la cola.
+JOB_POOL_SIZE = 4 # Cantidad de controladores que comparten todas las búsquedas.
+JOB_RESULTS_DIR = "resultados" # Carpeta donde se guarda el .csv de cada búsqueda.
+JOB_COALESCE_TTL = 600 # Segundos durante los que una búsqueda terminada se reutiliza si se vuelve a pedir el mismo término.
+
+QUEUED, RUNNING, DONE, FAILED = "en_cola", "ejecutando", "terminado", "error" # Estados de una búsqueda.
+
+
+class ProgressSink(Sink): # Destino que cuenta las noticias de cada sitio web antes de pasarlas al destino real.
+    def __init__(self, inner):
+        super().__init__(chunk_size=1, normalize=False) # El destino real normaliza sus bloques.
+        self.inner = inner
+        self.per_site = {} # Cantidad de noticias extraídas por sitio web.
+
+    def _write_chunk(self, rows):
+        for row in rows:
+            self.per_site[row["Website"]] = self.per_site.get(row["Website"], 0) + 1
+            self.inner.write(row)
+
+    def _close(self):
+        self.inner.close()
+
+
+class Job: # Búsqueda encolada, con su estado, progreso y archivo de resultados.
+    def __init__(self, query, results_dir):
+        self.id = uuid.uuid4().hex[:12]
+        self.query = query
+        self.path = os.path.join(results_dir, f"{self.id}.csv") # Archivo .csv con los resultados, se escribe a medida que se extraen las noticias.
+        self.status = QUEUED
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.sink = None
+
+    @property
+    def done(self): # La búsqueda ya no va a escribir más noticias.
+        return self.status in (DONE, FAILED)
+
+    def progress(self): # Cantidad de noticias extraídas en total y por sitio web.
+        per_site = dict(self.sink.per_site) if self.sink is not None else {}
+        return {"rows": sum(per_site.values()), "sites": per_site}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.progress()
+        }
+
+
+class JobManager: # Cola de búsquedas con un número limitado de trabajadores que comparten un pool de controladores.
+    def __init__(self, driver_path, fetcher=None, cache=None, metrics=None, workers=JOB_WORKERS, pool_size=JOB_POOL_SIZE, results_dir=JOB_RESULTS_DIR, coalesce_ttl=JOB_COALESCE_TTL):
+        self.driver_path = driver_path
+        self.fetcher = fetcher
+        self.cache = cache # Caché opcional de resultados por sitio web (ver cache.py).
+        self.metrics = metrics # Métricas opcionales de todas las búsquedas (ver metrics.py).
+        self.pool_size = pool_size
+        self.results_dir = results_dir
+        self.coalesce_ttl = coalesce_ttl
+        self.jobs = {} # Búsquedas por id.
+        self._by_query = {} # Última búsqueda de cada término normalizado, para no repetir búsquedas en curso o recientes.
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pool = None # El pool se crea con la primera búsqueda, así la aplicación inicia sin abrir Chrome.
+        os.makedirs(results_dir, exist_ok=True)
+        self._remove_stale_files()
+
+    @property
+    def pool(self): # Pool de controladores compartido por todas las búsquedas.
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = DriverPool(self.driver_path, size=min(self.pool_size, len(SITES) - len(HTTP_BACKENDS)))
+            return self._pool
+
+    def _expired(self, job, now): # Una búsqueda terminada hace más de coalesce_ttl ya no se reutiliza, así que se puede descartar con su archivo.
+        return job.done and now - job.finished >= self.coalesce_ttl
+
+    def _prune(self): # Método para descartar las búsquedas vencidas y borrar sus archivos, así la memoria y la carpeta de resultados no crecen sin límite.
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self.jobs.values() if self._expired(job, now)]
+            for job in expired:
+                del self.jobs[job.id]
+                key = normalize_query(job.query)
+                if self._by_query.get(key) == job.id:
+                    del self._by_query[key]
+        for job in expired:
+            try:
+                os.remove(job.path)
+            except FileNotFoundError:
+                pass
+
+    def _remove_stale_files(self): # Método para borrar los .csv de ejecuciones anteriores de la aplicación que ya vencieron (las búsquedas solo existen en memoria, nadie más puede pedirlos).
+        now = time.time()
+        for entry in os.scandir(self.results_dir):
+            if entry.name.endswith(".csv") and now - entry.stat().st_mtime >= self.coalesce_ttl: # Los recientes pueden ser de otro proceso de la aplicación que sigue funcionando.
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def submit(self, query): # Método para encolar una búsqueda, retorna la búsqueda existente si el mismo término está en curso o terminó hace poco.
+        self._prune()
+        key = normalize_query(query)
+        with self._lock:
+            job = self.jobs.get(self._by_query.get(key))
+            if job is not None and (not job.done or (job.status == DONE and time.time() - job.finished < self.coalesce_ttl and os.path.exists(job.path))):
+                return job
+            job = Job(query, self.results_dir)
+            self.jobs[job.id] = job
+            self._by_query[key] = job.id
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id): # Método para obtener una búsqueda por su id, retorna None si no existe o ya venció.
+        self._prune()
+        return self.jobs.get(job_id)
+
+    def _run(self, job): # Método que ejecuta una búsqueda en un trabajador.
+        job.status, job.started = RUNNING, time.time()
+        job.sink = ProgressSink(CsvSink(job.path))
+        error = None
+        try:
+            scraper = WebScraper(self.driver_path, pool=self.pool, fetcher=self.fetcher, sink=job.sink, keep_data=False, cache=self.cache, metrics=self.metrics)
+            try:
+                scraper.scrape_all(job.query)
+            finally:
+                scraper.close()
+        except Exception as e:
+            error = str(e)
+        finally:
+            job.sink.close() # Se cierra antes de cambiar el estado, así quien siga el .csv recibe las últimas noticias.
+        job.error, job.finished = error, time.time()
+        job.status = FAILED if error else DONE
+
+    def follow(self, job, poll=0.5): # Generador del contenido del .csv de una búsqueda, sigue leyendo mientras la búsqueda escribe noticias nuevas.
+        while not os.path.exists(job.path) and not job.done:
+            time.sleep(poll)
+        if not os.path.exists(job.path):
+            return
+        with open(job.path, encoding="utf-8", newline="") as file:
+            while True:
+                done = job.done # Se revisa antes de leer para no perder lo último que se escribió.
+                chunk = file.read()
+                if chunk:
+                    yield chunk
+                elif done:
+                    return
+                else:
+                    time.sleep(poll)
+
+    def close(self): # Método para esperar a las búsquedas en curso y cerrar el pool de controladores.
+        self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+import threading
+import cProfile
+import time
+import os
+
+# Constantes.
+METRICS_PREFIX = "scraper" # Prefijo de las métricas exportadas en formato Prometheus.
+INSTRUMENTED_METHODS = ("get", "find_element", "find_elements", "execute_script") # Métodos del controlador que se cuentan y se miden.
+METRIC_HELP = { # Descripción y tipo de cada métrica.
+    "webdriver_call_seconds": ("Tiempo de las llamadas al controlador por sitio web y método.", "summary"),
+    "phase_seconds": ("Tiempo de cada fase del scraper por sitio web (las fases pueden estar anidadas).", "summary"),
+    "articles_total": ("Noticias extraídas por sitio web.", "counter")
+}
+
+
+def _escape(value): # Función para escapar el valor de una etiqueta en formato Prometheus.
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics: # Registro de métricas (contadores, tiempos y valores) compartido por todos los scrapers, se puede usar desde varios hilos a la vez.
+    def __init__(self, prefix=METRICS_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {} # (nombre, etiquetas) -> valor.
+        self._summaries = {} # (nombre, etiquetas) -> [cantidad, segundos].
+        self._gauges = {} # (nombre, etiquetas) -> valor.
+
+    def inc(self, name, value=1, **labels): # Método para aumentar un contador.
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels): # Método para registrar un tiempo.
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.setdefault(key, [0, 0.0])
+            summary[0] += 1
+            summary[1] += seconds
+
+    def set(self, name, value, **labels): # Método para fijar un valor (gauge), por ejemplo el tamaño del caché.
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    @contextmanager
+    def span(self, site, phase): # Bloque que mide cuánto tarda una fase del scraper en un sitio web.
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("phase_seconds", time.perf_counter() - start, site=site or "", phase=phase)
+
+    def _by_label(self, name, site, label): # Tiempos de una métrica para un sitio web, agrupados por una etiqueta.
+        with self._lock:
+            return {
+                dict(labels)[label]: {"count": count, "seconds": round(seconds, 6)}
+                for (metric, labels), (count, seconds) in self._summaries.items()
+                if metric == name and dict(labels).get("site") == site
+            }
+
+    def phases(self, site): # Método para obtener la cantidad y el tiempo total de cada fase de un sitio web.
+        return self._by_label("phase_seconds", site, "phase")
+
+    def calls(self, site): # Método para obtener la cantidad y el tiempo total de las llamadas al controlador de un sitio web, por método.
+        return self._by_label("webdriver_call_seconds", site, "method")
+
+    def to_prometheus(self): # Método para exportar todas las métricas en el formato de texto de Prometheus.
+        with self._lock:
+            series = {}
+            for (name, labels), value in self._counters.items():
+                series.setdefault(name, []).append(("", labels, value))
+            for (name, labels), (count, seconds) in self._summaries.items():
+                series.setdefault(name, []).extend([("_count", labels, count), ("_sum", labels, seconds)])
+            for (name, labels), value in self._gauges.items():
+                series.setdefault(name, []).append(("", labels, value))
+            gauges = {name for name, _ in self._gauges}
+
+        lines = []
+        for name in sorted(series):
+            description, kind = METRIC_HELP.get(name, (name, "gauge" if name in gauges else "untyped"))
+            lines.append(f"# HELP {self.prefix}_{name} {description}")
+            lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+            for suffix, labels, value in sorted(series[name], key=lambda sample: (sample[1], sample[0])):
+                rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{self.prefix}_{name}{suffix}{{{rendered}}} {value}" if rendered else f"{self.prefix}_{name}{suffix} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedDriver: # Envoltorio del controlador que cuenta y mide cada get, find_element(s) y execute_script, el resto pasa directo al controlador.
+    def __init__(self, driver, metrics, site=lambda: None): # `site` es una función que retorna el sitio web que se está scrapeando en ese momento.
+        self.driver = driver
+        self.metrics = metrics
+        self._site = site
+
+    def __getattr__(self, name):
+        attribute = getattr(self.driver, name)
+        if name not in INSTRUMENTED_METHODS:
+            return attribute
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self.metrics.observe("webdriver_call_seconds", time.perf_counter() - start, site=self._site() or "", method=name)
+        return timed
+
+
+@contextmanager
+def profile_site(site, directory=None): # Bloque que perfila con cProfile el scraper de un sitio web y guarda el perfil en `directory` (si es None no hace nada).
+    if directory is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable() # Solo perfila el hilo actual, así cada sitio web en paralelo tiene su propio perfil.
+    except ValueError as e: # Desde Python 3.12 no se pueden perfilar dos hilos a la vez.
+        print(f"No se pudo perfilar {site}: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{site}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        print(f"Perfil de {site} guardado en {path} (ver con: python -m pstats {path})")
@@ -0,0 +1,162 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from datetime import datetime
+import pandas as pd
+import argparse
+import time
+import re
+
+# Constantes.
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|mc_cid|mc_eid|_ga|ref|ref_src|amp)$", re.IGNORECASE) # Parámetros de seguimiento que no cambian la noticia.
+FIELDS = ["Title", "Date", "URL", "Website"] # Columnas de cada noticia extraída.
+SPANISH_MONTHS = { # Número de cada mes en español (en minúsculas, con sus variantes y abreviaciones de 3 letras).
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7, "agosto": 8,
+    "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+    "ene": 1, "feb": 2, "mar": 3, "abr": 4, "may": 5, "jun": 6, "jul": 7, "ago": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dic": 12
+}
+RELATIVE_UNITS = { # Segundos de cada unidad de tiempo de las fechas relativas, según sus 3 primeras letras.
+    "seg": 1, "min": 60, "hor": 3600, "día": 86400, "dia": 86400, "sem": 7 * 86400, "mes": 30 * 86400, "año": 365 * 86400
+}
+NUMERIC_DATE_PATTERN = r"(?P<day>\d{1,2})/(?P<month>\d{1,2})/(?P<year>\d{4})" # dd/mm/aaaa (ej: 15/01/2025).
+ISO_DATE_PATTERN = r"(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})" # aaaa-mm-dd (ej: 2025-01-15).
+LONG_DATE_PATTERN = r"(?P<day>\d{1,2})\s+(?:de\s+)?(?P<month>[a-záéíóúñ]+)\.?,?\s+(?:de\s+|del\s+)?(?P<year>\d{4})" # Fecha en español (ej: Jueves 09 Enero, 2025 o 9 de enero de 2025).
+RELATIVE_DATE_PATTERN = r"hace\s+(?:(?P<amount>\d+|un|una)\s+)?(?P<unit>segundos?|minutos?|min|horas?|hrs?|d[ií]as?|semanas?|mes(?:es)?|años?)\b" # Fecha relativa (ej: hace 2 horas, hace un día).
+COOPERATIVA_TITLE_PATTERN = r'^(?:"\d+\s+|\d+\s+")' # Número inicial que Cooperativa agrega a sus títulos entre comillas (ej: 1 "Título").
+URL_PATTERN = r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?//(?P<host>[^/?#\t\r\n]*)(?P<path>[^?#\t\r\n]*)(?:#.*)?$" # Host y ruta de un URL absoluto sin query string (la gran mayoría), el fragmento (#...) se descarta.
+CANONICAL_URL_PATTERN = r"^https://(?!www\.)[a-z0-9.-]+(?:/|/[^?#\s]*[^/?#\s])$" # URL que ya está normalizado, se deja tal cual.
+
+
+def _fix(values, mask, function): # Función para aplicar una transformación solo a los valores que la necesitan (el resto se copia tal cual, que es mucho más rápido).
+    if not mask.any():
+        return values
+    values = values.copy()
+    values[mask] = function(values[mask])
+    return values
+
+
+def _relative_seconds(amounts, units): # Función para pasar la cantidad y unidad de una fecha relativa a segundos.
+    amounts = amounts.replace({"un": "1", "una": "1"}).fillna("1").astype(float)
+    return amounts * units.str[:3].str.replace("hr", "hor").map(RELATIVE_UNITS).astype(float)
+
+
+def parse_dates(dates, now=None): # Función para convertir una columna de fechas en texto a datetime64, retorna NaT donde no hay una fecha válida.
+    now = pd.Timestamp(now or datetime.now())
+    text = dates.astype("string").str.strip()
+    result = pd.to_datetime(text, format="%d/%m/%Y", errors="coerce").astype("datetime64[us]") # Formato que entrega el scraper, con el parser de pandas (sin regex).
+    pending = result.isna() & text.notna()
+    if not pending.any():
+        return result
+    text = text[pending].str.lower() # Solo las fechas en otro formato pasan por las expresiones regulares.
+
+    for pattern in (NUMERIC_DATE_PATTERN, ISO_DATE_PATTERN, LONG_DATE_PATTERN): # Se usa el primer formato que coincida.
+        parts = text.str.extract(pattern)
+        if pattern is LONG_DATE_PATTERN:
+            parts["month"] = parts["month"].map(SPANISH_MONTHS, na_action="ignore")
+        found = pd.to_datetime(parts[["year", "month", "day"]].astype(float), errors="coerce") # Fechas imposibles (ej: 31/02/2025) quedan como NaT.
+        result = result.fillna(found.reindex(result.index))
+
+    parts = text.str.extract(RELATIVE_DATE_PATTERN)
+    found = parts["unit"].notna()
+    if found.any():
+        seconds = _relative_seconds(parts.loc[found, "amount"], parts.loc[found, "unit"])
+        result = result.fillna((now - pd.to_timedelta(seconds, unit="s")).reindex(result.index))
+    today = now.normalize()
+    result = result.fillna(pd.Series(today, index=text.index).where(text.str.contains(r"\bhoy\b", na=False)).reindex(result.index))
+    result = result.fillna(pd.Series(today - pd.Timedelta(days=1), index=text.index).where(text.str.contains(r"\bayer\b", na=False)).reindex(result.index))
+    return result
+
+
+def normalize_url(url): # Función para normalizar un URL, así el mismo artículo tiene siempre la misma llave aunque cambie el esquema, el host o los parámetros de seguimiento (es la llave de store.py).
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(key)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, query, "")) # http y https se consideran el mismo artículo, y el fragmento (#...) se descarta.
+
+
+def canonicalize_urls(urls): # Función para normalizar una columna de URLs con las mismas reglas que normalize_url: esquema https, host en minúsculas y sin www., sin fragmento ni barra final, y parámetros ordenados y sin los de seguimiento.
+    def canonicalize(text):
+        text = text.str.strip()
+        parts = text.str.extract(URL_PATTERN)
+        path = parts["path"].str.rstrip("/").replace("", "/")
+        result = ("https://" + parts["host"].str.lower().str.replace(r"^www\.", "", regex=True) + path).fillna(text)
+        return _fix(result, parts["host"].isna() & text.notna(), lambda values: values.map(normalize_url)) # Solo los URLs con query string (o que no son URLs absolutos) pasan por urlsplit, uno a la vez.
+
+    text = urls.astype("string")
+    return _fix(text, ~text.str.match(CANONICAL_URL_PATTERN, na=True), canonicalize)
+
+
+def normalize_titles(titles, websites=None): # Función para normalizar una columna de títulos: Unicode NFC, espacios simples y sin el número inicial de Cooperativa.
+    titles = titles.astype("string")
+    titles = _fix(titles, titles.str.contains("[\u0300-\u036f]", na=False), lambda values: values.str.normalize("NFC")) # Tildes como caracteres separados (ej: a + ´).
+    titles = _fix(titles, titles.str.contains(r"\s\s|[^\S ]|^ | $", na=False), lambda values: values.str.replace(r"\s+", " ", regex=True).str.strip())
+    if websites is not None:
+        cooperativa = websites.eq("Cooperativa").fillna(False) & titles.str.contains(COOPERATIVA_TITLE_PATTERN, na=False)
+        titles = _fix(titles, cooperativa, lambda values: values.str.replace(COOPERATIVA_TITLE_PATTERN, "", regex=True).str.strip('"'))
+    return titles
+
+
+def normalize_frame(df, now=None): # Función para normalizar de una vez todas las noticias extraídas (fechas, títulos y URLs), retorna un DataFrame nuevo.
+    df = df.copy()
+    if "Title" in df:
+        df["Title"] = normalize_titles(df["Title"], df.get("Website"))
+    if "Date" in df:
+        df["Date"] = parse_dates(df["Date"], now)
+    if "URL" in df:
+        df["URL"] = canonicalize_urls(df["URL"])
+    return df
+
+
+def normalize_rows(rows, now=None): # Función para normalizar un bloque de noticias (diccionarios) con normalize_frame, retorna una lista nueva con la fecha como datetime (o None).
+    df = normalize_frame(pd.DataFrame(rows, columns=FIELDS), now)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+if __name__ == "__main__": # Mide la normalización vectorizada contra la de una noticia a la vez, con un .csv de noticias extraídas.
+    parser = argparse.ArgumentParser(description="Mide la normalización de noticias con pandas contra la normalización de una noticia a la vez.")
+    parser.add_argument("path", nargs="?", default="noticias_CDE.csv", help="Archivo .csv con noticias extraídas.")
+    parser.add_argument("--repeat", type=int, default=5, help="Cantidad de repeticiones (se informa la más rápida).")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.path, dtype="string")
+    now = datetime.now()
+
+    def parse_date(text): # Mismos formatos que parse_dates (sin las fechas relativas), una fecha a la vez.
+        for pattern in (NUMERIC_DATE_PATTERN, ISO_DATE_PATTERN, LONG_DATE_PATTERN):
+            match = re.search(pattern, text.lower())
+            if match:
+                month = match["month"]
+                try:
+                    return datetime(int(match["year"]), int(month) if month.isdigit() else SPANISH_MONTHS.get(month, 0), int(match["day"]))
+                except ValueError: # Fecha imposible (ej: 31/02/2025).
+                    return None
+        return None
+
+    def per_row(df): # Normalización de una noticia a la vez, como la hacía el scraper en su loop.
+        rows = []
+        for title, date, url, website in df[["Title", "Date", "URL", "Website"]].itertuples(index=False):
+            rows.append({
+                "Title": re.sub(COOPERATIVA_TITLE_PATTERN, "", title).strip('"') if website == "Cooperativa" else " ".join(title.split()),
+                "Date": parse_date(date) if isinstance(date, str) else None,
+                "URL": normalize_url(url),
+                "Website": website
+            })
+        return pd.DataFrame(rows)
+
+    def best(function):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = function(df)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    row_time, row_result = best(per_row)
+    vector_time, vector_result = best(lambda df: normalize_frame(df, now))
+    print(f"{len(df)} noticias de {args.path}")
+    print(f"Una a la vez:  {row_time:.3f} s ({len(df) / row_time:,.0f} noticias/s)")
+    print(f"Vectorizado:   {vector_time:.3f} s ({len(df) / vector_time:,.0f} noticias/s), {row_time / vector_time:.1f} veces más rápido")
+    for column in ("Title", "Date", "URL"):
+        same = (vector_result[column].astype("string") == row_result[column].astype("string")) | (vector_result[column].isna() & row_result[column].isna())
+        print(f"{column}: {same.sum()} de {len(df)} iguales")
@@ -0,0 +1,119 @@
+from postprocess import normalize_rows, FIELDS
+from datetime import datetime
+import threading
+import json
+import csv
+import os
+
+try: # pyarrow solo se necesita para guardar en Parquet.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Constantes.
+SINK_CHUNK_SIZE = 500 # Cantidad de noticias que se acumulan antes de escribirlas al archivo.
+
+
+def _as_text(rows): # Función para pasar la fecha normalizada (datetime) de cada noticia a dd/mm/aaaa en los formatos de texto, igual que el formato del scraper.
+    return [{**row, "Date": row["Date"].strftime("%d/%m/%Y")} if isinstance(row.get("Date"), datetime) else row for row in rows]
+
+
+class Sink: # Destino de las noticias extraídas, las recibe una por una y las escribe en bloques (chunks) mientras el scraper sigue funcionando.
+    def __init__(self, chunk_size=SINK_CHUNK_SIZE, normalize=True): # Inicializador del destino. Con `normalize` cada bloque pasa por postprocess.normalize_rows antes de escribirse (fechas, títulos y URLs).
+        self.chunk_size = chunk_size # Cantidad de noticias por bloque.
+        self.normalize = normalize
+        self.count = 0 # Cantidad total de noticias recibidas.
+        self._buffer = [] # Noticias que todavía no se escriben.
+        self._lock = threading.Lock() # Candado para que varios scrapers en paralelo puedan escribir en el mismo destino.
+
+    def write(self, row): # Método para agregar una noticia, se escribe el bloque cuando se llena.
+        with self._lock:
+            self._buffer.append(row)
+            self.count += 1
+            if len(self._buffer) >= self.chunk_size:
+                self._flush()
+
+    def flush(self): # Método para escribir las noticias pendientes aunque el bloque no esté lleno.
+        with self._lock:
+            self._flush()
+
+    def close(self): # Método para escribir lo pendiente y cerrar el destino.
+        with self._lock:
+            self._flush()
+            self._close()
+
+    def _flush(self):
+        if self._buffer:
+            self._write_chunk(normalize_rows(self._buffer) if self.normalize else self._buffer) # Se normaliza un bloque completo a la vez (vectorizado), no noticia por noticia.
+            self._buffer = []
+
+    def _write_chunk(self, rows): # Cada destino define cómo escribe un bloque de noticias.
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(Sink): # Destino que escribe las noticias en un archivo .csv.
+    def __init__(self, path, chunk_size=SINK_CHUNK_SIZE, append=False, normalize=True): # Con `append` se agregan noticias a un archivo existente sin repetir el encabezado.
+        super().__init__(chunk_size, normalize)
+        self.path = path
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self._file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def _write_chunk(self, rows):
+        self._writer.writerows(_as_text(rows))
+        self._file.flush() # Lo escrito queda en el disco aunque el proceso se caiga después.
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonLinesSink(Sink): # Destino que escribe una noticia en formato JSON por línea (.jsonl).
+    def __init__(self, path, chunk_size=SINK_CHUNK_SIZE, append=False, normalize=True):
+        super().__init__(chunk_size, normalize)
+        self.path = path
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def _write_chunk(self, rows):
+        self._file.write("".join(json.dumps({field: row.get(field) for field in FIELDS}, ensure_ascii=False) + "\n" for row in _as_text(rows)))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetSink(Sink): # Destino que escribe las noticias en un archivo .parquet, cada bloque es un row group nuevo. Normalizadas, las fechas se guardan como timestamp (no como texto).
+    def __init__(self, path, chunk_size=SINK_CHUNK_SIZE, normalize=True):
+        if pq is None:
+            raise ImportError("Para guardar en Parquet se necesita instalar pyarrow (pip install pyarrow).")
+        super().__init__(chunk_size, normalize)
+        self.path = path
+        self._schema = pa.schema([(field, pa.timestamp("us") if field == "Date" and normalize else pa.string()) for field in FIELDS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def _write_chunk(self, rows):
+        columns = {field: [row.get(field) for row in rows] for field in FIELDS}
+        self._writer.write_table(pa.table(columns, schema=self._schema))
+
+    def _close(self):
+        self._writer.close() # El archivo .parquet solo es legible una vez que se cierra (se escribe el footer).
+
+
+def open_sink(path, chunk_size=SINK_CHUNK_SIZE, normalize=True): # Función para crear el destino correspondiente a la extensión del archivo (.csv, .jsonl o .parquet).
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return JsonLinesSink(path, chunk_size, normalize=normalize)
+    if extension == ".parquet":
+        return ParquetSink(path, chunk_size, normalize)
+    return CsvSink(path, chunk_size, normalize=normalize)
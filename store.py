@@ -0,0 +1,186 @@
+from postprocess import normalize_url, normalize_rows
+from sinks import open_sink
+import threading
+import sqlite3
+import time
+
+# Constantes.
+STORE_PATH = "noticias.db" # Archivo de la base de datos SQLite con las noticias guardadas.
+STORE_BATCH_SIZE = 500 # Cantidad de noticias que se acumulan antes de guardarlas en la base de datos.
+KNOWN_STOP_STREAK = 20 # Cantidad de noticias seguidas ya guardadas para dar por hecho que el resto también lo está y dejar de paginar.
+BODY_FINAL_STATUS = (404, 410) # Respuestas que significan que la noticia ya no existe, así su cuerpo no se vuelve a pedir.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    date TEXT,
+    website TEXT NOT NULL,
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_website_date ON articles (website, date);
+CREATE TABLE IF NOT EXISTS query_articles (
+    query TEXT NOT NULL,
+    url_key TEXT NOT NULL,
+    website TEXT NOT NULL,
+    seen REAL NOT NULL,
+    PRIMARY KEY (query, url_key)
+);
+CREATE INDEX IF NOT EXISTS idx_query_articles_website ON query_articles (query, website);
+CREATE TABLE IF NOT EXISTS article_bodies (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    website TEXT,
+    body TEXT,
+    author TEXT,
+    published TEXT,
+    status INTEGER,
+    fetched REAL NOT NULL
+);
+""" # `articles` guarda cada noticia una sola vez (aunque la encuentren varios sitios web), `query_articles` qué noticias encontró cada búsqueda en cada sitio y `article_bodies` el contenido de cada noticia (ver bodies.py).
+
+
+def normalize_query(query): # Función para normalizar un término de búsqueda (mayúsculas y espacios no cambian la búsqueda).
+    return " ".join(query.lower().split())
+
+
+def _from_iso(date): # Función para volver a dd/mm/aaaa al exportar, igual que el formato del scraper.
+    if not date:
+        return None
+    year, month, day = date.split("-")
+    return f"{day}/{month}/{year}"
+
+
+class ArticleStore: # Base de datos local con las noticias guardadas, evita duplicados entre sitios web y permite scrapear solo las noticias nuevas.
+    def __init__(self, path=STORE_PATH, batch_size=STORE_BATCH_SIZE): # Inicializador de la base de datos, crea las tablas si no existen.
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False) # Los scrapers en paralelo comparten la conexión, protegida por el candado.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._known = {} # Llaves de las noticias ya guardadas por búsqueda (con el sitio web que las encontró primero), se cargan una sola vez.
+        self._pending = [] # Noticias que todavía no se guardan en la base de datos.
+        self._bodies = None # Llaves de las noticias que ya tienen su cuerpo guardado (o que ya no existen), se cargan una sola vez.
+        self._pending_bodies = [] # Cuerpos que todavía no se guardan en la base de datos.
+
+    def _known_keys(self, query): # Igual que la llave primaria de query_articles, una noticia se guarda una sola vez por búsqueda aunque la encuentren varios sitios web.
+        if query not in self._known:
+            cursor = self._conn.execute("SELECT url_key, website FROM query_articles WHERE query = ?", (query,))
+            self._known[query] = dict(cursor.fetchall())
+        return self._known[query]
+
+    def add(self, query, website, row): # Método para guardar una noticia encontrada por una búsqueda, retorna False si ya estaba guardada para esa búsqueda (por cualquier sitio web).
+        if not row.get("URL"):
+            return True
+        url_key = normalize_url(row["URL"])
+        query = normalize_query(query)
+        with self._lock:
+            known = self._known_keys(query)
+            if url_key in known:
+                return False
+            known[url_key] = website
+            self._pending.append((query, url_key, row, website, time.time()))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        return True
+
+    def seen_by(self, query, url): # Método para obtener el sitio web que guardó primero una noticia para una búsqueda, retorna None si aún no está guardada.
+        with self._lock:
+            return self._known_keys(normalize_query(query)).get(normalize_url(url))
+
+    def _body_keys(self):
+        if self._bodies is None:
+            cursor = self._conn.execute(f"SELECT url_key FROM article_bodies WHERE body IS NOT NULL OR status IN ({', '.join('?' * len(BODY_FINAL_STATUS))})", BODY_FINAL_STATUS)
+            self._bodies = {url_key for (url_key,) in cursor}
+        return self._bodies
+
+    def missing_bodies(self, rows): # Método para filtrar las noticias (diccionarios con URL y Website) cuyo cuerpo aún no está guardado, retorna una lista de (URL, sitio web) sin repetidos.
+        candidates = {}
+        for row in rows: # Antes de tomar el candado, `rows` puede ser un generador de esta misma base de datos (ver articles).
+            if row.get("URL"):
+                candidates.setdefault(normalize_url(row["URL"]), (row["URL"], row.get("Website")))
+        with self._lock:
+            stored = self._body_keys()
+            return [item for url_key, item in candidates.items() if url_key not in stored]
+
+    def articles(self, query=None, website=None): # Generador de todas las noticias guardadas (o solo las de una búsqueda y/o sitio web), en el mismo formato que entrega el scraper.
+        self.flush()
+        conditions, params = [], []
+        if query:
+            conditions.append("a.url_key IN (SELECT url_key FROM query_articles WHERE query = ?)")
+            params.append(normalize_query(query))
+        if website:
+            conditions.append("a.website = ?")
+            params.append(website)
+        with self._lock:
+            results = self._conn.execute(f"SELECT a.title, a.date, a.url, a.website FROM articles a{' WHERE ' + ' AND '.join(conditions) if conditions else ''}", params).fetchall()
+        for title, date, url, website in results:
+            yield {"Title": title, "Date": _from_iso(date), "URL": url, "Website": website}
+
+    def add_body(self, url, website, body=None, author=None, published=None, status=None): # Método para guardar el cuerpo de una noticia (o solo el estado HTTP si no se pudo obtener).
+        url_key = normalize_url(url)
+        with self._lock:
+            if body is not None or status in BODY_FINAL_STATUS:
+                self._body_keys().add(url_key)
+            self._pending_bodies.append((url_key, url, website, body, author, published, status, time.time()))
+            if len(self._pending_bodies) >= self.batch_size:
+                self._flush()
+
+    def body(self, url): # Método para obtener el cuerpo, autor y fecha de publicación guardados de una noticia, retorna None si no hay.
+        self.flush()
+        with self._lock:
+            result = self._conn.execute("SELECT body, author, published FROM article_bodies WHERE url_key = ? AND body IS NOT NULL", (normalize_url(url),)).fetchone()
+        return dict(zip(("Body", "Author", "Published"), result)) if result else None
+
+    def flush(self): # Método para guardar las noticias pendientes.
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending_bodies:
+            with self._conn:
+                self._conn.executemany( # Un cuerpo reemplaza al intento fallido anterior de la misma noticia.
+                    "INSERT OR REPLACE INTO article_bodies (url_key, url, website, body, author, published, status, fetched) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending_bodies)
+            self._pending_bodies = []
+        if not self._pending:
+            return
+        normalized = normalize_rows([{"Website": website, **row} for _, _, row, website, _ in self._pending]) # Títulos y fechas se normalizan una vez por bloque (ver postprocess.py), no en el loop del scraper.
+        with self._conn: # Una sola transacción por bloque de noticias.
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO articles (url_key, url, title, date, website, first_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                [(url_key, row["URL"], clean["Title"], clean["Date"].strftime("%Y-%m-%d") if clean["Date"] else None, clean["Website"], seen) for (_, url_key, row, _, seen), clean in zip(self._pending, normalized)])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO query_articles (query, url_key, website, seen) VALUES (?, ?, ?, ?)",
+                [(query, url_key, website, seen) for query, url_key, _, website, seen in self._pending])
+        self._pending = []
+
+    def count(self, query): # Método para obtener cuántas noticias distintas hay guardadas para una búsqueda.
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT url_key) FROM query_articles WHERE query = ?", (normalize_query(query),)).fetchone()[0]
+
+    def rows(self, query): # Generador de las noticias (sin duplicados) de una búsqueda, en el mismo formato que entrega el scraper.
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute("""
+                SELECT a.title, a.date, a.url, a.website
+                FROM query_articles q JOIN articles a ON a.url_key = q.url_key
+                WHERE q.query = ?
+                ORDER BY a.website, a.date DESC
+            """, (normalize_query(query),))
+            results = cursor.fetchall()
+        for title, date, url, website in results:
+            yield {"Title": title, "Date": _from_iso(date), "URL": url, "Website": website}
+
+    def export(self, query, path): # Método para exportar las noticias de una búsqueda a un archivo (.csv, .jsonl o .parquet), normalizadas por el destino (ver sinks.py), retorna cuántas se exportaron.
+        with open_sink(path) as sink:
+            for row in self.rows(query):
+                sink.write(row)
+        return sink.count
+
+    def close(self): # Método para guardar lo pendiente y cerrar la base de datos.
+        self.flush()
+        self._conn.close()
@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Los módulos del scraper están en la raíz del repositorio.
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from benchmark import FixtureServer
+from urllib.parse import urlsplit, parse_qs
+from lxml import html
+import web_scraper_analitic
+import pytest
+import httpx
+import json
+import re
+
+
+class HtmlDriver: # Controlador falso sobre un HTML estático (lxml), responde los comandos que usan Waiter y _extract_rows sin abrir Chrome.
+    def __init__(self, text):
+        self.text = text
+        self.ready_state = "complete"
+        self.resources = 0 # Peticiones de red que informa performance.getEntriesByType('resource').
+
+    @property
+    def document(self):
+        return html.fromstring(self.text)
+
+    def find_elements(self, by, xpath):
+        return self.document.xpath(xpath)
+
+    def find_element(self, by, xpath):
+        elements = self.find_elements(by, xpath)
+        if not elements:
+            raise NoSuchElementException(xpath)
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        if script is web_scraper_analitic.EXTRACT_ROWS_JS:
+            rows_xpath, fields, offset, limit = args
+            nodes = self.document.xpath(rows_xpath)
+            end = len(nodes) if limit is None else min(len(nodes), offset + limit)
+            rows = []
+            for node in nodes[offset:end]:
+                row = {}
+                for name, (xpaths, attribute) in fields.items():
+                    row[name] = None
+                    for xpath in xpaths:
+                        elements = node.xpath(xpath)
+                        value = (elements[0].text_content().strip() if attribute == "text" else elements[0].get(attribute)) if elements else None
+                        if value:
+                            row[name] = value
+                            break
+                rows.append(row)
+            return {"rows": rows, "total": len(nodes)}
+        if "snapshotLength" in script:
+            return len(self.document.xpath(args[0]))
+        if "scrollHeight" in script:
+            return len(self.text)
+        if "readyState" in script:
+            return [self.ready_state, self.resources]
+        raise NotImplementedError(script)
+
+
+class FixtureDriver(HtmlDriver): # Controlador falso que abre las páginas del servidor de prueba (sin red) y hace lo mismo que su JavaScript: cargar más noticias al desplazarse (ADNRadio) o al presionar el botón (BioBioChile y DuckDuckGo).
+    def __init__(self, server):
+        super().__init__("<html></html>")
+        self.server = server
+        self.current_url = None
+        self.cdp = [] # Comandos de CDP recibidos.
+        self._config, self._loaded = None, 0
+
+    @property
+    def document(self):
+        document = html.fromstring(self.text)
+        if self.current_url:
+            document.make_links_absolute(self.current_url) # Los href se leen completos, igual que `element.href` en el navegador.
+        return document
+
+    def get(self, url):
+        self.current_url = url
+        _, _, self.text = self.server._route(url[len(self.server.url):])
+        config = re.search(r"const CONFIG = (\{.*?\});", self.text)
+        self._config = json.loads(config.group(1)) if config else None
+        self._loaded = self._config["loaded"] if config else 0
+
+    def find_elements(self, by, value):
+        if by == By.CLASS_NAME:
+            value = f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+        return super().find_elements(by, value)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+        return {}
+
+    def execute_script(self, script, *args):
+        if "scrollTo" in script: # ADNRadio carga más noticias al llegar al fondo.
+            self._load_more()
+            return None
+        if script.endswith("click();"):
+            if args[0].get("id") == "cargar-mas" or "result--more__btn" in (args[0].get("class") or ""):
+                self._load_more()
+            return None
+        return super().execute_script(script, *args)
+
+    def _load_more(self): # Pide al servidor las noticias siguientes y las agrega a la página, como `cargar` en PAGE_TEMPLATE.
+        if self._config is None or self._loaded >= self._config["total"]:
+            return
+        data = json.loads(self.server._route(f"{self._config['api']}&offset={self._loaded}")[2])
+        document = self.document
+        for button in document.find_class("result--more__btn"): # DuckDuckGo oculta el botón, que sigue ocupando su resultado.
+            button.set("class", "")
+            button.getparent().set("style", "display: none")
+        results = document.get_element_by_id("resultados")
+        for element in html.fragments_fromstring(data["html"]):
+            results.append(element)
+        self._loaded += data["count"]
+        button = document.get_element_by_id("cargar-mas", None)
+        if button is not None and self._loaded >= self._config["total"]: # Sin más noticias BioBioChile quita el botón.
+            button.getparent().drop_tree()
+        self.text = html.tostring(document, encoding="unicode")
+
+
+@pytest.fixture
+def html_driver():
+    return HtmlDriver
+
+
+@pytest.fixture(scope="session")
+def fixture_server(): # Servidor local con las réplicas de los sitios web (ver benchmark.py), sin latencia.
+    server = FixtureServer(latency=0)
+    yield server
+    server.close()
+
+
+class Recorder: # Transporte de httpx que responde con el servidor de prueba (sin red) y guarda las peticiones.
+    def __init__(self, server):
+        self.server = server
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request.url)
+        status, content_type, text = self.server._route(request.url.raw_path.decode())
+        return httpx.Response(status, headers={"Content-Type": content_type}, text=text)
+
+    def offsets(self): # Posición ("s") de cada página pedida a news.js de DuckDuckGo.
+        return [int(parse_qs(urlsplit(str(url)).query).get("s", ["0"])[0]) for url in self.requests if url.path.endswith("news.js")]
+
+
+@pytest.fixture
+def recorder(fixture_server):
+    return Recorder(fixture_server)
+
+
+@pytest.fixture
+def fixture_driver(fixture_server, monkeypatch): # Controlador falso sobre el servidor de prueba, con esperas cortas: al final de cada sitio web se espera en vano a que carguen más noticias.
+    monkeypatch.setattr(web_scraper_analitic, "SCROLL_WAIT_TIMEOUT", 0.05)
+    for site in web_scraper_analitic.SITES:
+        monkeypatch.setitem(web_scraper_analitic.WAIT_TIMEOUTS, site, 0.2)
+    return FixtureDriver(fixture_server)
@@ -0,0 +1,41 @@
+from analytics import Analytics
+from store import ArticleStore
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_search_and_counts(tmp_path):
+    path = tmp_path / "noticias.csv"
+    path.write_text("Title,Date,URL,Website\nLluvias en Santiago,31/01/2025,https://adnradio.cl/1,ADNRadio\nCalor en Santiago,30/01/2025,https://biobiochile.cl/2,BioBioChile\n", encoding="utf-8")
+    analytics = Analytics(str(tmp_path / "analytics"))
+    assert analytics.ingest([str(path)]) == 2
+    assert analytics.search("santiago", since="2025-01-31")["total"] == 1
+    assert [row["Website"] for row in analytics.counts(until="2025-01-30")] == ["BioBioChile"]
+
+
+def test_cli_rejects_malformed_dates(tmp_path):
+    for command in (["counts", "--since", "2025-13-01"], ["search", "chile", "--until", "31/01/2025"], ["trends", "--until", "ayer"]):
+        result = subprocess.run([sys.executable, "analytics.py", "--dir", str(tmp_path), *command], cwd=ROOT, capture_output=True, text=True)
+        assert result.returncode == 2 # Error de uso de argparse, sin traceback.
+        assert "fecha inválida" in result.stderr and "Traceback" not in result.stderr
+
+
+def test_counts_keep_rows_without_website_apart(tmp_path):
+    path = tmp_path / "noticias.csv"
+    path.write_text("Title,Date,URL,Website\nLluvias,31/01/2025,https://adnradio.cl/1,ADNRadio\nCalor,31/01/2025,https://adnradio.cl/2,\n", encoding="utf-8")
+    analytics = Analytics(str(tmp_path / "analytics"))
+    analytics.ingest([str(path)])
+    assert analytics.counts() == [{"Website": "ADNRadio", "Date": "31/01/2025", "count": 1}, {"Website": None, "Date": "31/01/2025", "count": 1}]
+
+
+def test_ingest_dedups_with_the_store_url_key(tmp_path):
+    store = ArticleStore(str(tmp_path / "noticias.db"))
+    store.add("chile", "ADNRadio", {"Title": "Lluvias", "Date": "31/01/2025", "URL": "http://www.adnradio.cl/1/"})
+    store.close()
+    path = tmp_path / "noticias.csv"
+    path.write_text("Title,Date,URL,Website\nLluvias,31/01/2025,https://adnradio.cl/1,ADNRadio\n", encoding="utf-8")
+    analytics = Analytics(str(tmp_path / "analytics"))
+    assert analytics.ingest([str(tmp_path / "noticias.db"), str(path)]) == 1 # La misma noticia en la base de datos y en el .csv.
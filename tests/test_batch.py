@@ -0,0 +1,46 @@
+from batch import read_queries, partition_path, run_batch, _scrape_pair
+from web_scraper_analitic import WebScraper, MAX_QUERY_INPUT
+import batch
+import os
+import pytest
+
+
+def test_read_queries(tmp_path):
+    path = tmp_path / "consultas.txt"
+    path.write_text(f"Lluvias\n\n# Comentario\n  lluvias  \nIncendios\n{'x' * (MAX_QUERY_INPUT + 1)}\n", encoding="utf-8")
+    assert read_queries(str(path)) == ["Lluvias", "Incendios"] # Sin vacías, comentarios, repetidas (mayúsculas y espacios) ni muy largas.
+
+
+def test_partition_path():
+    assert partition_path("datasets", " Lluvias en  Santiago! ", "ADNRadio", "csv") == os.path.join("datasets", "lluvias_en_santiago", "site=ADNRadio", "part-0.csv")
+    assert partition_path("datasets", "!!", "ADNRadio", "csv") == os.path.join("datasets", "_", "site=ADNRadio", "part-0.csv")
+
+
+def test_failed_pair_is_reported_as_error(tmp_path, monkeypatch):
+    scraper = WebScraper(None, keep_data=False)
+
+    def scrape_cooperativa(query): # Falla después de extraer una noticia, como los scrapers, que guardan el error en vez de lanzarlo.
+        scraper._start_site("Cooperativa", query)
+        scraper._add_rows("Cooperativa", [{"Title": "Noticia", "Date": "31/01/2025", "URL": "https://cooperativa.cl/1"}])
+        scraper._error = RuntimeError("sin conexión")
+    scraper.scrape_cooperativa = scrape_cooperativa
+    monkeypatch.setattr(batch, "_scraper", scraper)
+    path = partition_path(str(tmp_path), "chile", "Cooperativa", "csv")
+    result = _scrape_pair("chile", "Cooperativa", path)
+    assert result["error"] == "sin conexión"
+    assert not os.path.exists(path) # La partición incompleta no queda como si fuera el resultado del par.
+
+
+def test_rate_limits(fixture_server, tmp_path):
+    queries = ["lluvias", "incendios", "sismos"]
+    results = run_batch(None, queries, sites=["DuckDuckGo"], workers=3, output_dir=str(tmp_path), file_format="csv", rate_limits={"DuckDuckGo": (0.3, 1)}, base_urls=fixture_server.base_urls)
+    assert all(result["error"] is None and result["rows"] == fixture_server.sizes["DuckDuckGo"] for result in results)
+    results.sort(key=lambda result: result["started"])
+    for previous, current in zip(results, results[1:]):
+        assert current["started"] - previous["started"] >= 0.3 - 0.05 # Intervalo mínimo entre el inicio de dos búsquedas (con margen por el reloj).
+        assert current["started"] >= previous["started"] + previous["seconds"] - 0.05 # Una sola búsqueda al mismo tiempo, aunque haya procesos libres.
+
+
+def test_rate_limits_without_concurrency_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run_batch(None, ["lluvias"], sites=["DuckDuckGo"], output_dir=str(tmp_path), rate_limits={"DuckDuckGo": (0, 0)})
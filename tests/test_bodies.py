@@ -0,0 +1,74 @@
+from benchmark import _article_page, _article_details
+from bodies import BodyFetcher, parse_article, fetch_bodies
+from store import ArticleStore
+import asyncio
+import httpx
+import pytest
+
+
+@pytest.mark.parametrize("site", ["ADNRadio", "BioBioChile", "Cooperativa", None])
+def test_parse_article(site):
+    author, published, paragraphs = _article_details(site or "DuckDuckGo", 3)
+    article = parse_article(_article_page(site or "DuckDuckGo", 3).encode("utf-8"), site)
+    assert article["Body"] == "\n\n".join(paragraphs) # Sin los párrafos del menú, las relacionadas ni el pie de página.
+    assert article["Author"] == author
+    assert article["Published"].startswith(f"{published:%Y-%m-%dT%H:%M}")
+
+
+def test_parse_article_with_xml_declaration(): # Como texto lxml la rechaza (ValueError), por eso se analizan los bytes de la respuesta.
+    page = '<?xml version="1.0" encoding="utf-8"?>\n<html><body><article><p>Canción nacional</p></article></body></html>'
+    assert parse_article(page.encode("utf-8"))["Body"] == "Canción nacional"
+    assert parse_article(page.replace("utf-8", "iso-8859-1").encode("iso-8859-1"), encoding="iso-8859-1")["Body"] == "Canción nacional" # Con el charset de la respuesta.
+
+
+def test_parse_article_falls_back_to_the_generic_parser(): # Página de ADNRadio con otro diseño, sin los XPaths de su parser.
+    page = '<html><head><meta charset="utf-8"></head><body><nav><a>Inicio</a></nav><article><p>Primer párrafo</p><p>Segundo párrafo</p></article></body></html>'
+    assert parse_article(page.encode("utf-8"), "ADNRadio")["Body"] == "Primer párrafo\n\nSegundo párrafo"
+
+
+def _fetch_all(handler, urls):
+    results = {}
+    fetcher = BodyFetcher(retries=0, transport=httpx.MockTransport(handler))
+    asyncio.run(fetcher.fetch_all([(url, "ADNRadio") for url in urls], lambda url, website, result: results.__setitem__(url, result)))
+    return results
+
+
+def test_fetch_records_failures_per_url():
+    page = _article_page("ADNRadio", 0).encode("utf-8")
+
+    def handler(request):
+        if request.url.path == "/bucle": # Redirección a sí misma.
+            return httpx.Response(302, headers={"Location": str(request.url)})
+        if request.url.path == "/gzip": # Dice venir comprimida pero no lo está.
+            return httpx.Response(200, headers={"Content-Encoding": "gzip"}, content=b"no es gzip")
+        if request.url.path == "/vacia":
+            return httpx.Response(200, content=b"")
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=page)
+
+    urls = [f"https://adnradio.cl/{path}" for path in ("bucle", "gzip", "vacia", "noticia")]
+    results = _fetch_all(handler, urls)
+    assert results[urls[0]]["status"] is None and results[urls[0]]["Body"] is None
+    assert results[urls[1]]["status"] is None
+    assert results[urls[2]] == {"Body": None, "Author": None, "Published": None, "status": 200}
+    assert results[urls[3]]["Body"] # Las fallas de las otras noticias no detienen a esta.
+
+
+def test_fetch_records_invalid_urls_as_failed():
+    page = _article_page("ADNRadio", 0).encode("utf-8")
+    urls = ["https://adnradio.cl/a\x01b", "https://[mal/a", "/relativa", "https://adnradio.cl/noticia"] # Caracter de control, IPv6 inválido y sin dominio.
+    results = _fetch_all(lambda request: httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=page), urls)
+    for url in urls[:3]:
+        assert results[url] == {"Body": None, "Author": None, "Published": None, "status": None}
+    assert results[urls[3]]["Body"] # Un URL inválido no detiene la descarga de las demás.
+
+
+def test_fetch_bodies_saves_results(tmp_path, fixture_server):
+    store = ArticleStore(str(tmp_path / "noticias.db"))
+    rows = [{"URL": f"{fixture_server.url}/adnradio/noticias/{index}", "Website": "ADNRadio"} for index in (1, 2, 100000)]
+    try:
+        summary = fetch_bodies(store, rows, BodyFetcher(retries=0))
+        assert (summary["fetched"], summary["failed"]) == (2, 1) # La última no existe (404).
+        assert store.body(rows[0]["URL"])["Author"] == _article_details("ADNRadio", 0)[0]
+        assert store.missing_bodies(rows) == [] # El 404 no se vuelve a pedir.
+    finally:
+        store.close()
@@ -0,0 +1,55 @@
+from cache import ResultCache
+from web_scraper_analitic import WebScraper, MAX_NEWS_PER_SITE
+import json
+import os
+
+ROWS = [{"Title": "Noticia", "Date": "31/01/2025", "URL": "https://adnradio.cl/1", "Website": "ADNRadio"}]
+
+
+def test_get_after_put(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.get("Chile", "ADNRadio", 100) is None
+    cache.put("Chile", "ADNRadio", 100, ROWS)
+    assert cache.get(" chile ", "ADNRadio", 100) == (ROWS, True)
+    assert cache.stats()["hits"] == 1
+
+
+def test_missing_file_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("chile", "ADNRadio", 100, ROWS)
+    os.remove(cache._path(cache.key("chile", "ADNRadio", 100))) # Como si _evict lo hubiera eliminado después de revisar el índice.
+    assert cache.get("chile", "ADNRadio", 100) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_order_survives_restart(tmp_path):
+    size = len(json.dumps(ROWS, ensure_ascii=False).encode("utf-8"))
+    cache = ResultCache(str(tmp_path), max_bytes=size * 3)
+    cache.put("chile", "ADNRadio", 100, ROWS)
+    cache.put("chile", "BioBioChile", 100, ROWS)
+    cache.get("chile", "ADNRadio", 100) # ADNRadio queda como el usado más recientemente.
+
+    cache = ResultCache(str(tmp_path), max_bytes=size * 2)
+    cache.put("chile", "Cooperativa", 100, ROWS) # Se pasa del tamaño, se elimina el usado hace más tiempo.
+    assert cache.get("chile", "BioBioChile", 100) is None
+    assert cache.get("chile", "ADNRadio", 100) is not None
+
+
+def test_failed_site_is_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    scraper = WebScraper(None, cache=cache)
+    rows = [{"Title": f"Noticia {index}", "Date": "31/01/2025", "URL": f"https://cooperativa.cl/{index}"} for index in range(3)]
+
+    def scrape_cooperativa(query): # Falla después de extraer 3 noticias, como los scrapers, que guardan el error en vez de lanzarlo.
+        scraper._start_site("Cooperativa", query)
+        scraper._add_rows("Cooperativa", rows)
+        scraper._checkpoint(page=1, offset=3, rows=3)
+        scraper._error = RuntimeError("sin conexión")
+    scraper.scrape_cooperativa = scrape_cooperativa
+    assert not scraper._scrape_site("Cooperativa", "chile")
+    assert scraper.count > 0 # Las noticias extraídas igual se entregan.
+    assert cache.get("chile", "Cooperativa", MAX_NEWS_PER_SITE) is None
+
+    scraper.scrape_cooperativa = lambda query: scraper._add_rows("Cooperativa", rows) # Sin error sí se guarda.
+    assert scraper._scrape_site("Cooperativa", "chile")
+    assert cache.get("chile", "Cooperativa", MAX_NEWS_PER_SITE)[0] == [dict(row, Website="Cooperativa") for row in rows]
@@ -0,0 +1,75 @@
+from benchmark import BENCH_QUERY, _article
+from checkpoint import CheckpointStore
+from store import ArticleStore, KNOWN_STOP_STREAK
+from web_scraper_analitic import WebScraper
+from http_fetcher import HttpFetcher
+import sqlite3
+import httpx
+import pytest
+
+
+def _row(index):
+    return {"Title": f"Noticia {index}", "Date": "31/01/2025", "URL": f"https://adnradio.cl/{index}"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "noticias.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"), interval=60)
+
+
+def test_save_is_throttled_and_flushes_first(checkpoints):
+    flushes = []
+    assert checkpoints.save("chile", "ADNRadio", {"rows": 1}, flush=lambda: flushes.append(1))
+    assert not checkpoints.save("chile", "ADNRadio", {"rows": 2}, flush=lambda: flushes.append(1)) # Antes de `interval` no se escribe ni se guarda nada.
+    assert checkpoints.load("chile", "ADNRadio") == {"rows": 1}
+    assert checkpoints.save("chile", "ADNRadio", {"rows": 3}, force=True, flush=lambda: flushes.append(1))
+    assert flushes == [1, 1]
+    checkpoints.clear("chile", "ADNRadio")
+    assert checkpoints.load("chile", "ADNRadio") is None
+
+
+def test_checkpoint_never_points_past_the_store(tmp_path, store, checkpoints):
+    scraper = WebScraper(None, store=store, checkpoints=checkpoints)
+    scraper._start_site("ADNRadio", "chile")
+    scraper._add_rows("ADNRadio", [_row(index) for index in range(10)]) # Menos que STORE_BATCH_SIZE, quedan pendientes.
+    scraper._checkpoint(offset=10, rows=10)
+    with sqlite3.connect(str(tmp_path / "noticias.db")) as conn: # Como las leería la siguiente ejecución después de un corte.
+        assert conn.execute("SELECT COUNT(*) FROM query_articles").fetchone()[0] == 10
+    assert checkpoints.load("chile", "ADNRadio")["rows"] == 10
+
+
+def test_resume_skips_rows_saved_after_the_checkpoint(store, checkpoints):
+    for index in range(KNOWN_STOP_STREAK * 2): # La ejecución anterior guardó más noticias que las de su último punto de control.
+        store.add("chile", "ADNRadio", _row(index))
+    checkpoints.save("chile", "ADNRadio", {"site": "ADNRadio", "query": "chile", "offset": 5, "rows": 5})
+
+    scraper = WebScraper(None, store=store, checkpoints=checkpoints)
+    assert scraper._start_site("ADNRadio", "chile")["offset"] == 5
+    added = scraper._add_rows("ADNRadio", [_row(index) for index in range(5, KNOWN_STOP_STREAK * 3)])
+    assert not scraper.caught_up # No se confunden con las de una búsqueda anterior.
+    assert added == KNOWN_STOP_STREAK
+
+    scraper._add_rows("ADNRadio", [_row(index) for index in range(KNOWN_STOP_STREAK)]) # Después de la primera noticia nueva se vuelve a dejar de paginar al llegar a las ya guardadas.
+    assert scraper.caught_up
+
+
+def test_http_resume_reaches_the_end(fixture_server, recorder, store, checkpoints):
+    total = fixture_server.sizes["DuckDuckGo"]
+    for index in range(60): # Una ejecución anterior se cortó después de guardar 60 noticias, con el punto de control en 30.
+        store.add(BENCH_QUERY, "DuckDuckGo", {"Title": "Noticia", "Date": None, "URL": fixture_server.url + _article("DuckDuckGo", BENCH_QUERY, index)["url"]})
+    checkpoints.save(BENCH_QUERY, "DuckDuckGo", {"site": "DuckDuckGo", "query": BENCH_QUERY, "offset": 30, "rows": 30})
+
+    scraper = WebScraper(None, fetcher=HttpFetcher(transport=httpx.MockTransport(recorder)), store=store, checkpoints=checkpoints)
+    scraper.base_urls = fixture_server.base_urls
+    scraper.scrape_all(BENCH_QUERY, sites=["DuckDuckGo"])
+    assert recorder.offsets()[0] == 30
+    assert scraper.count == total - 60
+    assert store.count(BENCH_QUERY) == total
+    assert checkpoints.load(BENCH_QUERY, "DuckDuckGo") is None # Terminó, el punto de control se elimina.
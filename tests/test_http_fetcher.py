@@ -0,0 +1,60 @@
+from benchmark import BENCH_QUERY, BENCH_PAGE_SIZES, _article
+from http_fetcher import HttpFetcher, DuckDuckGoNewsBackend
+from web_scraper_analitic import WebScraper
+from datetime import datetime
+import httpx
+
+
+def _fetch(server, recorder, limit, start=0, stop=None):
+    fetcher = HttpFetcher(transport=httpx.MockTransport(recorder))
+    try:
+        return DuckDuckGoNewsBackend().fetch(fetcher, BENCH_QUERY, limit, server.base_urls["DuckDuckGo"], start, stop)
+    finally:
+        fetcher.close()
+
+
+def test_duckduckgo_pages_until_the_last_result(fixture_server, recorder):
+    total = fixture_server.sizes["DuckDuckGo"]
+    rows = _fetch(fixture_server, recorder, 10000)
+    assert [row["Title"] for row in rows] == [_article("DuckDuckGo", BENCH_QUERY, index)["title"] for index in range(total)]
+    assert rows[0]["URL"] == fixture_server.url + _article("DuckDuckGo", BENCH_QUERY, 0)["url"]
+    datetime.strptime(rows[0]["Date"], "%d/%m/%Y") # Por HTTP las noticias sí traen fecha.
+    assert recorder.offsets() == list(range(0, total, BENCH_PAGE_SIZES["DuckDuckGo"]))
+
+
+def test_duckduckgo_stops_at_limit(fixture_server, recorder):
+    rows = _fetch(fixture_server, recorder, 40)
+    assert len(rows) == 40
+    assert recorder.offsets() == [0, 30] # No se piden más páginas que las necesarias.
+
+
+def test_duckduckgo_resumes_from_start(fixture_server, recorder):
+    total = fixture_server.sizes["DuckDuckGo"]
+    rows = _fetch(fixture_server, recorder, 10000, start=60)
+    assert [row["Title"] for row in rows] == [_article("DuckDuckGo", BENCH_QUERY, index)["title"] for index in range(60, total)]
+    assert recorder.offsets()[0] == 60 # Se salta directo a la posición guardada, sin volver a pedir las primeras páginas.
+
+
+def test_duckduckgo_stop_check(fixture_server, recorder):
+    pages = []
+
+    def stop(rows):
+        pages.append(len(rows))
+        return len(pages) == 2
+    rows = _fetch(fixture_server, recorder, 10000, stop=stop)
+    assert len(rows) == 60 # Lo que sigue ya está guardado.
+    assert pages == [30, 30] # `stop` recibe las noticias de cada página.
+    assert recorder.offsets() == [0, 30]
+
+
+def test_http_search_without_results_does_not_open_the_browser():
+    def handler(request):
+        if request.url.path.endswith("news.js"):
+            return httpx.Response(200, json={"results": []})
+        return httpx.Response(200, text='<script>vqd="4-123456789"</script>')
+    scraper = WebScraper(None, fetcher=HttpFetcher(transport=httpx.MockTransport(handler)))
+    try:
+        assert scraper._scrape_http("DuckDuckGo", "sin resultados")
+        assert scraper.count == 0 and scraper._driver is None # Sin resultados no es una falla, no se abre Chrome.
+    finally:
+        scraper.fetcher.close()
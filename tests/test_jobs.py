@@ -0,0 +1,38 @@
+from jobs import JobManager, Job, DONE, RUNNING
+import time
+import os
+
+
+def _job(manager, query, status, finished=None):
+    job = Job(query, manager.results_dir)
+    job.status, job.finished = status, finished
+    with open(job.path, "w", encoding="utf-8") as file:
+        file.write("Title,Date,URL,Website\n")
+    manager.jobs[job.id] = job
+    manager._by_query[query] = job.id
+    return job
+
+
+def test_expired_jobs_are_pruned_with_their_file(tmp_path):
+    manager = JobManager(None, results_dir=str(tmp_path), coalesce_ttl=60)
+    try:
+        old = _job(manager, "chile", DONE, time.time() - 120)
+        recent = _job(manager, "perú", DONE, time.time())
+        running = _job(manager, "bolivia", RUNNING)
+        assert manager.get(old.id) is None
+        assert not os.path.exists(old.path)
+        assert "chile" not in manager._by_query
+        assert manager.get(recent.id) is recent and os.path.exists(recent.path)
+        assert manager.get(running.id) is running # Una búsqueda en curso nunca vence.
+    finally:
+        manager.close()
+
+
+def test_stale_files_from_previous_runs_are_removed(tmp_path):
+    stale, fresh = tmp_path / "viejo.csv", tmp_path / "nuevo.csv"
+    for path in (stale, fresh):
+        path.write_text("Title,Date,URL,Website\n", encoding="utf-8")
+    os.utime(stale, (time.time() - 120, time.time() - 120))
+    JobManager(None, results_dir=str(tmp_path), coalesce_ttl=60).close()
+    assert not stale.exists()
+    assert fresh.exists() # Puede ser de otro proceso de la aplicación.
@@ -0,0 +1,78 @@
+from metrics import Metrics, InstrumentedDriver, profile_site
+import pstats
+import pytest
+
+
+def test_to_prometheus():
+    metrics = Metrics()
+    metrics.inc("articles_total", 3, site="ADNRadio")
+    metrics.inc("articles_total", 2, site="ADNRadio")
+    metrics.observe("phase_seconds", 0.5, site="ADNRadio", phase="total")
+    metrics.observe("phase_seconds", 1.5, site="ADNRadio", phase="total")
+    metrics.set("cache_entries", 7)
+    metrics.set("queue_size", 1, site='Bio"Bio\\Chile\n') # Comillas, barra invertida y salto de línea se escapan.
+    assert metrics.to_prometheus().splitlines() == [
+        "# HELP scraper_articles_total Noticias extraídas por sitio web.",
+        "# TYPE scraper_articles_total counter",
+        'scraper_articles_total{site="ADNRadio"} 5',
+        "# HELP scraper_cache_entries cache_entries",
+        "# TYPE scraper_cache_entries gauge", # Sin METRIC_HELP, un valor fijado es un gauge.
+        "scraper_cache_entries 7", # Sin etiquetas no hay llaves.
+        "# HELP scraper_phase_seconds Tiempo de cada fase del scraper por sitio web (las fases pueden estar anidadas).",
+        "# TYPE scraper_phase_seconds summary",
+        'scraper_phase_seconds_count{phase="total",site="ADNRadio"} 2',
+        'scraper_phase_seconds_sum{phase="total",site="ADNRadio"} 2.0',
+        "# HELP scraper_queue_size queue_size",
+        "# TYPE scraper_queue_size gauge",
+        'scraper_queue_size{site="Bio\\"Bio\\\\Chile\\n"} 1'
+    ]
+
+
+class FakeDriver:
+    title = "Resultados"
+
+    def get(self, url):
+        pass
+
+    def find_elements(self, by, value):
+        return []
+
+    def execute_script(self, script):
+        raise RuntimeError("script inválido")
+
+
+def test_instrumented_driver_counts_calls():
+    metrics = Metrics()
+    site = "ADNRadio"
+    driver = InstrumentedDriver(FakeDriver(), metrics, lambda: site)
+    driver.get("https://adnradio.cl")
+    driver.get("https://adnradio.cl/buscador")
+    assert driver.find_elements("css selector", "a") == []
+    with pytest.raises(RuntimeError): # Las llamadas que fallan también se miden.
+        driver.execute_script("return 1")
+    assert driver.title == "Resultados" # El resto pasa directo al controlador, sin medirse.
+    site = "DuckDuckGo"
+    driver.get("https://duckduckgo.com")
+
+    assert {method: calls["count"] for method, calls in metrics.calls("ADNRadio").items()} == {"get": 2, "find_elements": 1, "execute_script": 1}
+    assert metrics.calls("DuckDuckGo")["get"]["count"] == 1
+    assert all(calls["seconds"] >= 0 for calls in metrics.calls("ADNRadio").values())
+
+
+def _work():
+    return sorted(range(1000))
+
+
+def test_profile_site(tmp_path):
+    with profile_site("ADNRadio"): # Sin carpeta no se perfila.
+        pass
+    directory = tmp_path / "perfiles"
+    assert not directory.exists()
+
+    with pytest.raises(RuntimeError):
+        with profile_site("ADNRadio", str(directory)):
+            _work()
+            raise RuntimeError("el sitio web falló") # El perfil se guarda igual.
+    [path] = directory.iterdir()
+    assert path.name.startswith("ADNRadio-") and path.suffix == ".prof"
+    assert any(function == "_work" for _, _, function in pstats.Stats(str(path)).stats) # Se puede leer con pstats.
@@ -0,0 +1,47 @@
+from postprocess import parse_dates, normalize_rows, canonicalize_urls, normalize_url
+from sinks import open_sink
+from datetime import datetime
+import pyarrow.parquet as pq
+import pandas as pd
+
+NOW = datetime(2025, 1, 31, 12, 0)
+ROWS = [
+    {"Title": '1 "Lluvias  en Santiago"', "Date": "31/01/2025", "URL": "http://www.Cooperativa.cl/noticia/?utm_source=x#fotos", "Website": "Cooperativa"},
+    {"Title": "Noticia sin fecha", "Date": None, "URL": "https://duckduckgo.com/noticia", "Website": "DuckDuckGo"}
+]
+
+
+def test_parse_dates():
+    dates = pd.Series(["31/01/2025", "2025-01-15", "Jueves 09 Enero, 2025", "hace 2 horas", "ayer", "31/02/2025", None])
+    assert parse_dates(dates, NOW).tolist()[:6] == [
+        pd.Timestamp(2025, 1, 31), pd.Timestamp(2025, 1, 15), pd.Timestamp(2025, 1, 9),
+        pd.Timestamp(2025, 1, 31, 10), pd.Timestamp(2025, 1, 30), pd.NaT
+    ]
+
+
+def test_canonicalize_urls_matches_normalize_url(): # Las dos funciones son la misma regla: la columna vectorizada y la llave de store.py.
+    urls = [
+        "https://www.adnradio.cl/a/?b=2&a=1", "http://www.a.cl/1/", "https://a.cl/1", "https://a.cl", " HTTPS://WWW.Cooperativa.CL/noticia/#fotos ",
+        "//biobiochile.cl/x//", "https://a.cl/x?utm_source=x&fbclid=1", "https://a.cl:443/x/", "https://a.cl/x#f?y", "https://a.cl/x?", "noticia"
+    ]
+    assert canonicalize_urls(pd.Series(urls)).tolist() == [normalize_url(url) for url in urls]
+    assert canonicalize_urls(pd.Series([None], dtype="string")).isna().all()
+
+
+def test_normalize_rows():
+    rows = normalize_rows(ROWS, NOW)
+    assert rows[0] == {"Title": "Lluvias en Santiago", "Date": datetime(2025, 1, 31), "URL": "https://cooperativa.cl/noticia", "Website": "Cooperativa"}
+    assert rows[1]["Date"] is None
+
+
+def test_sinks_write_normalized_rows(tmp_path):
+    for extension in ("csv", "parquet"):
+        with open_sink(str(tmp_path / f"noticias.{extension}")) as sink:
+            for row in ROWS:
+                sink.write(row)
+    csv = pd.read_csv(tmp_path / "noticias.csv", dtype="string")
+    assert csv["Title"][0] == "Lluvias en Santiago"
+    assert csv["Date"][0] == "31/01/2025" # En texto se mantiene el formato del scraper.
+    table = pq.read_table(tmp_path / "noticias.parquet")
+    assert str(table.schema.field("Date").type) == "timestamp[us]" # En Parquet la fecha queda con su tipo.
+    assert table["Date"].to_pylist() == [datetime(2025, 1, 31), None]
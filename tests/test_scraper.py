@@ -0,0 +1,120 @@
+from benchmark import BENCH_QUERY, _article
+from web_scraper_analitic import WebScraper
+from checkpoint import CheckpointStore
+from store import ArticleStore
+import web_scraper_analitic
+import pytest
+
+BROWSER_SITES = ["ADNRadio", "BioBioChile", "DuckDuckGo"] # Cooperativa necesita escribir en el buscador, que el controlador falso no hace.
+
+
+def _scraper(fixture_driver, fixture_server, **kwargs):
+    scraper = WebScraper(None, driver=fixture_driver, **kwargs)
+    scraper.base_urls = fixture_server.base_urls
+    return scraper
+
+
+def _urls(server, site, indexes):
+    return [server.url + _article(site, BENCH_QUERY, index)["url"] for index in indexes]
+
+
+@pytest.mark.parametrize("site", BROWSER_SITES)
+def test_scraper_extracts_every_row(fixture_driver, fixture_server, site):
+    total = fixture_server.sizes[site]
+    scraper = _scraper(fixture_driver, fixture_server)
+    assert scraper._scrape_site(site, BENCH_QUERY)
+    assert [row["URL"] for row in scraper.data] == _urls(fixture_server, site, range(total)) # Todas, en orden y sin repetir (cada ronda extrae solo desde `offset`).
+    assert all(row["Title"] and row["Website"] == site for row in scraper.data)
+    if site != "DuckDuckGo": # DuckDuckGo no muestra la fecha en el navegador.
+        assert scraper.to_dataframe()["Date"].notna().all()
+
+
+@pytest.mark.parametrize("site", BROWSER_SITES)
+def test_scraper_stops_at_the_limit(fixture_driver, fixture_server, monkeypatch, site):
+    monkeypatch.setattr(web_scraper_analitic, "MAX_NEWS_PER_SITE", 45) # Entre dos cargas, el límite corta a la mitad de una página.
+    scraper = _scraper(fixture_driver, fixture_server)
+    scraper._scrape_site(site, BENCH_QUERY)
+    assert [row["URL"] for row in scraper.data] == _urls(fixture_server, site, range(45))
+
+
+@pytest.mark.parametrize("site, offset, rows", [("ADNRadio", 40, 40), ("BioBioChile", 40, 40), ("DuckDuckGo", 62, 60)]) # En DuckDuckGo el botón de cada página ocupa un resultado.
+def test_scraper_resumes_from_the_checkpoint_offset(fixture_driver, fixture_server, tmp_path, site, offset, rows):
+    checkpoints = CheckpointStore(str(tmp_path / "checkpoints"))
+    checkpoints.save(BENCH_QUERY, site, {"site": site, "query": BENCH_QUERY, "offset": offset, "rows": rows})
+    scraper = _scraper(fixture_driver, fixture_server, checkpoints=checkpoints)
+    assert scraper._scrape_site(site, BENCH_QUERY)
+    assert [row["URL"] for row in scraper.data] == _urls(fixture_server, site, range(rows, fixture_server.sizes[site])) # Las revisadas antes del corte no se vuelven a extraer.
+    assert checkpoints.load(BENCH_QUERY, site) is None
+
+
+@pytest.mark.parametrize("site", BROWSER_SITES)
+def test_scraper_stops_when_caught_up(fixture_driver, fixture_server, tmp_path, site):
+    store = ArticleStore(str(tmp_path / "noticias.db"))
+    try:
+        for url in _urls(fixture_server, site, range(50, fixture_server.sizes[site])): # Una búsqueda anterior ya guardó las más antiguas.
+            store.add(BENCH_QUERY, site, {"Title": "Noticia", "Date": None, "URL": url})
+        scraper = _scraper(fixture_driver, fixture_server, store=store)
+        scraper._scrape_site(site, BENCH_QUERY)
+        assert scraper.caught_up
+        assert [row["URL"] for row in scraper.data] == _urls(fixture_server, site, range(50))
+        if site != "ADNRadio": # ADNRadio carga todo lo que puede en cada desplazamiento al fondo, los otros dejan de presionar el botón.
+            assert fixture_driver._loaded < fixture_server.sizes[site]
+    finally:
+        store.close()
+
+
+class FakeChrome: # Reemplaza a webdriver.Chrome para revisar las opciones de cada perfil sin abrir Chrome.
+    def __init__(self, service, options):
+        self.options = options
+        self.closed = False
+
+    def argument(self, prefix):
+        return next((argument[len(prefix):] for argument in self.options.arguments if argument.startswith(prefix)), None)
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_chrome(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_scraper_analitic.webdriver, "Chrome", FakeChrome)
+    monkeypatch.setattr(web_scraper_analitic, "DRIVER_CACHE_DIR", str(tmp_path / "chrome-cache"))
+    return tmp_path / "chrome-cache"
+
+
+def test_driver_profiles(fake_chrome):
+    full = web_scraper_analitic.create_driver(None, "full")
+    assert full.options.page_load_strategy == "normal"
+    assert full.argument("--disk-cache-dir=") is None # Sin caché de disco.
+    minimal = web_scraper_analitic.create_driver(None, "minimal")
+    assert minimal.options.page_load_strategy == "none"
+    assert "--blink-settings=imagesEnabled=false" in minimal.options.arguments
+
+
+def test_each_driver_has_its_own_cache_dir(fake_chrome):
+    first, second = (web_scraper_analitic.create_driver(None, "light") for _ in range(2))
+    assert first.argument("--disk-cache-dir=") == str(fake_chrome / "driver-0")
+    assert second.argument("--disk-cache-dir=") == str(fake_chrome / "driver-1") # Dos Chrome abiertos no comparten la caché.
+    first.quit()
+    assert first.closed
+    assert web_scraper_analitic.create_driver(None, "light").argument("--disk-cache-dir=") == str(fake_chrome / "driver-0") # Al cerrarse se reutiliza en el siguiente.
+
+
+@pytest.mark.parametrize("profile", ["full", "light"])
+def test_block_resources(fixture_driver, fixture_server, monkeypatch, profile):
+    monkeypatch.setitem(web_scraper_analitic.SITE_BLOCKED_RESOURCES, "ADNRadio", ["fonts", "ads"])
+    scraper = _scraper(fixture_driver, fixture_server, profile=profile)
+    if profile == "full": # El perfil no bloquea nada, no se envía ningún comando.
+        assert scraper._block_resources("ADNRadio") == []
+        assert fixture_driver.cdp == []
+        return
+    assert scraper._block_resources("ADNRadio") == ["fonts", "ads"] # Solo los que bloquean el perfil y el sitio web.
+    urls = web_scraper_analitic.BLOCKED_RESOURCES["fonts"] + web_scraper_analitic.BLOCKED_RESOURCES["ads"]
+    assert fixture_driver.cdp == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": urls})]
+
+
+def test_block_resources_without_cdp(fixture_driver, fixture_server, monkeypatch):
+    def execute_cdp_cmd(command, params): # Como Firefox, que no tiene CDP.
+        raise RuntimeError("sin CDP")
+    monkeypatch.setattr(fixture_driver, "execute_cdp_cmd", execute_cdp_cmd)
+    assert _scraper(fixture_driver, fixture_server)._block_resources("ADNRadio") == []
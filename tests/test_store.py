@@ -0,0 +1,88 @@
+from benchmark import BENCH_QUERY, _article
+from store import ArticleStore, KNOWN_STOP_STREAK, normalize_url
+from web_scraper_analitic import WebScraper
+from http_fetcher import HttpFetcher
+import httpx
+import pytest
+
+
+def _row(url, title="Noticia", date="31/01/2025"):
+    return {"Title": title, "Date": date, "URL": url}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "noticias.db"), batch_size=3)
+    yield store
+    store.close()
+
+
+def test_normalize_url():
+    assert normalize_url("http://www.ADNRadio.cl/noticia/?utm_source=x&b=2&a=1#fotos") == "https://adnradio.cl/noticia?a=1&b=2"
+
+
+def test_add_skips_duplicates_of_the_same_query(store):
+    assert store.add("Chile", "ADNRadio", _row("https://adnradio.cl/1"))
+    assert not store.add(" chile ", "ADNRadio", _row("http://www.adnradio.cl/1/?utm_source=x"))
+    assert store.add("Perú", "ADNRadio", _row("https://adnradio.cl/1")) # Otra búsqueda.
+    assert store.count("chile") == 1
+
+
+def test_add_skips_duplicates_from_other_sites(tmp_path):
+    path = str(tmp_path / "noticias.db")
+    store = ArticleStore(path)
+    assert store.add("chile", "ADNRadio", _row("https://adnradio.cl/1"))
+    assert not store.add("chile", "DuckDuckGo", _row("https://adnradio.cl/1")) # DuckDuckGo entrega una noticia de ADNRadio.
+    store.close()
+
+    store = ArticleStore(path) # En la siguiente ejecución tampoco se vuelve a entregar.
+    assert not store.add("chile", "DuckDuckGo", _row("https://adnradio.cl/1"))
+    assert store.seen_by("chile", "https://adnradio.cl/1") == "ADNRadio"
+    assert store.seen_by("chile", "https://adnradio.cl/2") is None
+    assert [row["Website"] for row in store.rows("chile")] == ["ADNRadio"]
+    store.close()
+
+
+def test_rows_and_export(store, tmp_path):
+    for index in range(5): # Más que batch_size, una parte queda pendiente hasta flush.
+        store.add("chile", "Cooperativa", _row(f"https://cooperativa.cl/{index}", f"Noticia {index}", f"{index + 1:02d}/01/2025"))
+    rows = list(store.rows("chile"))
+    assert [row["Date"] for row in rows] == [f"{day:02d}/01/2025" for day in range(5, 0, -1)] # De la más nueva a la más antigua.
+    assert rows[0]["Website"] == "Cooperativa"
+    assert store.export("chile", str(tmp_path / "chile.csv")) == 5
+
+
+def test_rows_are_normalized_when_saved(store):
+    store.add("chile", "Cooperativa", _row("https://cooperativa.cl/1", '1 "Lluvias  en Santiago"', "Jueves 09 Enero, 2025")) # Tal como lo extrae el scraper.
+    assert list(store.rows("chile")) == [{"Title": "Lluvias en Santiago", "Date": "09/01/2025", "URL": "https://cooperativa.cl/1", "Website": "Cooperativa"}]
+
+
+def _scraper(server, recorder, store):
+    scraper = WebScraper(None, fetcher=HttpFetcher(transport=httpx.MockTransport(recorder)), store=store)
+    scraper.base_urls = server.base_urls
+    return scraper
+
+
+def test_scraper_stops_at_known_rows(fixture_server, recorder, store):
+    total = fixture_server.sizes["DuckDuckGo"]
+    scraper = _scraper(fixture_server, recorder, store)
+    scraper.scrape_all(BENCH_QUERY, sites=["DuckDuckGo"])
+    assert scraper.count == total
+
+    recorder.requests.clear()
+    scraper = _scraper(fixture_server, recorder, store)
+    scraper.scrape_all(BENCH_QUERY, sites=["DuckDuckGo"])
+    assert scraper.count == 0
+    assert scraper.caught_up
+    assert recorder.offsets() == [0] # La primera página ya tiene KNOWN_STOP_STREAK noticias guardadas, no se piden las siguientes.
+
+
+def test_scraper_ignores_rows_known_from_other_sites(fixture_server, recorder, store):
+    total = fixture_server.sizes["DuckDuckGo"]
+    for index in range(KNOWN_STOP_STREAK * 2): # Las primeras noticias de DuckDuckGo ya las encontró otro sitio web.
+        store.add(BENCH_QUERY, "ADNRadio", _row(fixture_server.url + _article("DuckDuckGo", BENCH_QUERY, index)["url"]))
+    scraper = _scraper(fixture_server, recorder, store)
+    scraper.scrape_all(BENCH_QUERY, sites=["DuckDuckGo"])
+    assert not scraper.caught_up # No se deja de paginar por noticias de otro sitio web.
+    assert scraper.count == total - KNOWN_STOP_STREAK * 2
+    assert store.count(BENCH_QUERY) == total
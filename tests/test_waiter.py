@@ -0,0 +1,78 @@
+from selenium.common.exceptions import StaleElementReferenceException
+from web_scraper_analitic import Waiter
+import threading
+import time
+
+PAGE = "<html><body><div id='lista'><p>1</p><p>2</p></div></body></html>"
+
+
+def test_until_returns_condition_value(html_driver):
+    waiter = Waiter(html_driver(PAGE), "ADNRadio", timeout=1)
+    assert len(waiter.until(lambda: waiter.present("//div[@id='lista']/p"), "resultados")) == 2
+
+
+def test_until_gives_up_after_timeout(html_driver):
+    waiter = Waiter(html_driver(PAGE), "ADNRadio", timeout=0.2)
+    start = time.monotonic()
+    assert waiter.until(lambda: waiter.present("//article"), "resultados") is None
+    assert 0.2 <= time.monotonic() - start < 1
+
+
+def test_until_keeps_waiting_on_stale_elements(html_driver):
+    waiter = Waiter(html_driver(PAGE), "ADNRadio", timeout=1)
+    calls = []
+
+    def condition():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StaleElementReferenceException()
+        return "listo"
+    assert waiter.until(condition, "cambio") == "listo"
+
+
+def test_count_grew_waits_for_new_rows(html_driver):
+    driver = html_driver(PAGE)
+    waiter = Waiter(driver, "ADNRadio", timeout=2)
+    assert waiter.count("//div[@id='lista']/p") == 2
+    assert waiter.count_grew("//div[@id='lista']/p", 2) is None
+
+    def load_more(): # La página agrega noticias después de un momento, como con lazy-loading.
+        time.sleep(0.2)
+        driver.text = PAGE.replace("<p>2</p>", "<p>2</p><p>3</p>")
+    threading.Thread(target=load_more).start()
+    assert waiter.until(lambda: waiter.count_grew("//div[@id='lista']/p", 2), "más noticias") == 3
+
+
+def test_height_changed(html_driver):
+    driver = html_driver(PAGE)
+    waiter = Waiter(driver, "ADNRadio")
+    height = driver.execute_script("return document.body.scrollHeight")
+    assert waiter.height_changed(height) is None
+    driver.text = PAGE.replace("<p>2</p>", "<p>2</p><p>3</p>")
+    assert waiter.height_changed(height) > height
+
+
+def test_network_idle_waits_for_quiet_network(html_driver):
+    driver = html_driver(PAGE)
+    waiter = Waiter(driver, "Cooperativa", timeout=2)
+    driver.ready_state = "loading"
+    idle = waiter.network_idle(idle_time=0.2)
+    assert not idle()
+    driver.ready_state = "complete"
+    start = time.monotonic()
+    assert waiter.until(idle, "red inactiva")
+    assert time.monotonic() - start >= 0.2
+
+
+def test_stale():
+    class Element:
+        def __init__(self, attached):
+            self.attached = attached
+
+        def is_enabled(self):
+            if not self.attached:
+                raise StaleElementReferenceException()
+            return True
+    waiter = Waiter(None, "Cooperativa")
+    assert not waiter.stale(Element(True))
+    assert waiter.stale(Element(False))
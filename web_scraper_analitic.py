@@ -3,79 +3,417 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 from fake_useragent import UserAgent
+from http_fetcher import HttpFetcher, DuckDuckGoNewsBackend
+from store import ArticleStore, KNOWN_STOP_STREAK
+from metrics import InstrumentedDriver, profile_site
+from checkpoint import CheckpointStore
+from sinks import open_sink
+from postprocess import normalize_frame
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import pandas as pd
+import functools
+import itertools
+import threading
+import logging
+import queue
 import time
+import os
 import re
 
+try: # Bloqueo de archivos para que cada controlador tome su propia carpeta de caché (fcntl en Linux y macOS, msvcrt en Windows).
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
 # Constantes.
 MAX_QUERY_INPUT = 100 # Cantidad de caracteres máximos permitidos.
 MAX_NEWS_PER_SITE = 10000 # Cantidad de noticias máximas por sitio web.
-MONTH_MAPPING = { # Diccionario de meses para el formateo de fechas.
-    "Enero": "01",
-    "Febrero": "02",
-    "Marzo": "03",
-    "Abril": "04",
-    "Mayo": "05",
-    "Junio": "06",
-    "Julio": "07",
-    "Agosto": "08",
-    "Septiembre": "09",
-    "Octubre": "10",
-    "Noviembre": "11",
-    "Diciembre": "12"
+SITES = { # Sitios web soportados y el método que los scrapea, en el orden en que se guardan sus resultados.
+    "ADNRadio": "scrape_adnradio",
+    "BioBioChile": "scrape_biobiochile",
+    "Cooperativa": "scrape_cooperativa",
+    "DuckDuckGo": "scrape_duckduckgo"
+}
+BLOCKED_RESOURCES = { # Patrones de URL (* es un comodín) de cada grupo de recursos que se puede bloquear con CDP (Network.setBlockedURLs).
+    "images": ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+    "fonts": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "ads": [ # Dominios de anuncios y de seguimiento.
+        "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*googletagservices.com*", "*googletagmanager.com*",
+        "*google-analytics.com*", "*adservice.google.*", "*amazon-adsystem.com*", "*facebook.net*", "*scorecardresearch.com*",
+        "*chartbeat.*", "*taboola.com*", "*outbrain.com*", "*criteo.*", "*adnxs.com*", "*rubiconproject.com*", "*pubmatic.com*"
+    ]
+}
+DRIVER_PROFILES = { # Perfiles del controlador: estrategia de carga de las páginas, grupos de BLOCKED_RESOURCES que bloquea, si usa la caché de disco y argumentos extra de Chrome.
+    "full": {"page_load_strategy": "normal", "block": [], "cache": False, "args": []}, # Chrome completo, se carga todo (como antes de los perfiles).
+    "light": { # driver.get retorna apenas el HTML está listo (sin esperar imágenes ni anuncios), que de todas formas están bloqueados.
+        "page_load_strategy": "eager",
+        "block": ["images", "media", "fonts", "ads"],
+        "cache": True,
+        "args": ["--disable-extensions", "--disable-background-networking", "--mute-audio"]
+    },
+    "minimal": { # driver.get retorna de inmediato, todo depende de las esperas explícitas de Waiter.
+        "page_load_strategy": "none",
+        "block": ["images", "media", "fonts", "ads"],
+        "cache": True,
+        "args": ["--disable-extensions", "--disable-background-networking", "--mute-audio", "--blink-settings=imagesEnabled=false"]
+    }
+}
+DEFAULT_DRIVER_PROFILE = "light" # Perfil que se usa si no se entrega uno.
+DRIVER_CACHE_DIR = "chrome-cache" # Carpeta de las cachés de disco de los controladores, una subcarpeta por controlador (CSS y JavaScript de los sitios web se reutilizan entre ejecuciones).
+SITE_BLOCKED_RESOURCES = { # Grupos de recursos que cada sitio web permite bloquear sin romper su scraper (se bloquean solo si el perfil también los bloquea).
+    "ADNRadio": ["images", "media", "fonts", "ads"],
+    "BioBioChile": ["images", "media", "fonts", "ads"], # Sin anuncios tampoco aparece el que tapa los resultados, así que no hay que cerrarlo.
+    "Cooperativa": ["images", "media", "fonts", "ads"], # Los anuncios son los que más retrasan la espera de red inactiva.
+    "DuckDuckGo": ["images", "media", "fonts", "ads"]
+}
+BASE_URLS = { # URL base de cada sitio web, se puede cambiar por instancia (por ejemplo, para apuntar a un servidor local de pruebas).
+    "ADNRadio": "https://www.adnradio.cl",
+    "BioBioChile": "https://www.biobiochile.cl",
+    "Cooperativa": "https://www.cooperativa.cl",
+    "DuckDuckGo": "https://duckduckgo.com"
+}
+WAIT_TIMEOUTS = { # Tiempo máximo (en segundos) que se espera a que una condición se cumpla en cada sitio web.
+    "ADNRadio": 10,
+    "BioBioChile": 10,
+    "Cooperativa": 30, # Cuando estuve haciendo las pruebas finales el servidor de Cooperativa estaba bastante lento y le costaba cargar.
+    "DuckDuckGo": 10
+}
+DEFAULT_WAIT_TIMEOUT = 10 # Tiempo máximo de espera para sitios web sin uno propio.
+SCROLL_WAIT_TIMEOUT = 2 # Tiempo máximo que se espera a que la página crezca después de desplazarse al fondo.
+NETWORK_IDLE_TIME = 0.5 # Segundos sin nuevas peticiones de red para considerar que la página terminó de cargar.
+WAIT_POLL_INITIAL = 0.05 # Intervalo inicial entre revisiones de una condición.
+WAIT_POLL_BACKOFF = 1.5 # Factor con el que crece el intervalo entre revisiones.
+WAIT_POLL_MAX = 0.5 # Intervalo máximo entre revisiones.
+SITE_RETRIES = 2 # Veces que se retoma un sitio web desde su última posición después de un error (reiniciando el controlador si murió).
+SELECTORS = { # XPaths de cada sitio web: "rows" encuentra cada noticia y el resto de los campos son XPaths relativos a ella (se usa el primero que tenga valor) y el dato a extraer.
+    "ADNRadio": {
+        "rows": "//*[@id='fusion-app']/main/section[2]/div/div/div",
+        "Title": ([".//article/div/header/h3/a"], "text"),
+        "Date": ([".//article/div/div/p[2]", ".//article/div/div/p[1]"], "text"), # Primero cuando la noticia SI tiene autor y después cuando NO tiene autor.
+        "URL": ([".//article/div/header/h3/a"], "href") # El URL está en el mismo elemento que el título.
+    },
+    "BioBioChile": {
+        "rows": "/html/body/main/div[2]/section/div/div/div/div/a | /html/body/main/div[2]/section/div/div/div/div/div/div[1]/div/a", # Las primeras 20 noticias tienen un XPath distinto a todo el resto.
+        "Title": (["./article/div[2]/h2"], "text"),
+        "Date": (["./article/div[2]/div"], "text"),
+        "URL": (["."], "href")
+    },
+    "Cooperativa": {
+        "rows": "//*[@id='contenedor-pagina']/section/div/section/article",
+        "Title": (["./a/h3"], "text"),
+        "Date": (["./a/div/div/time"], "text"),
+        "URL": (["./a"], "href")
+    },
+    "DuckDuckGo": {
+        "rows": "//*[@id='vertical_wrapper']/div/div[3]/div/div[1]/div[3]/div",
+        "Title": (["./div/h2/a[1]"], "text"),
+        "URL": (["./div/h2/a[1]"], "href") # DuckDuckGo no muestra fecha de las noticias.
+    }
+}
+EXTRACT_ROWS_JS = """
+const [rowsXPath, fields, offset, limit] = arguments;
+const snapshot = document.evaluate(rowsXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const end = limit == null ? snapshot.snapshotLength : Math.min(snapshot.snapshotLength, offset + limit);
+const rows = [];
+for (let i = offset; i < end; i++) {
+    const node = snapshot.snapshotItem(i);
+    const row = {};
+    for (const [name, [xpaths, attribute]] of Object.entries(fields)) {
+        row[name] = null;
+        for (const xpath of xpaths) {
+            const element = document.evaluate(xpath, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            const value = !element ? null : attribute === "text" ? element.innerText.trim() : (element[attribute] || element.getAttribute(attribute));
+            if (value) {
+                row[name] = value;
+                break;
+            }
+        }
+    }
+    rows.push(row);
 }
+return {rows: rows, total: snapshot.snapshotLength};
+""" # Script que extrae en el navegador todas las noticias de la página desde `offset` y las retorna como una lista de diccionarios.
+HTTP_BACKENDS = { # Sitios web que se pueden scrapear solo con HTTP (sin navegador). El resto, o si el backend falla, se scrapea con Selenium.
+    "DuckDuckGo": DuckDuckGoNewsBackend() # Las noticias se cargan desde el endpoint JSON news.js.
+    # ADNRadio y BioBioChile cargan la lista de resultados en el navegador (lazy-loading y buscador interno), por lo que se mantienen con Selenium.
+}
+
+logger = logging.getLogger(__name__) # Registro de los tiempos de espera (y otros eventos internos) del scraper.
+
+
+def _claim_cache_dir(): # Función para tomar una subcarpeta de DRIVER_CACHE_DIR que no esté usando otro controlador (de este u otro proceso), retorna la carpeta y el archivo que la bloquea mientras siga abierto.
+    os.makedirs(DRIVER_CACHE_DIR, exist_ok=True)
+    for slot in itertools.count(): # Chrome no soporta dos instancias sobre la misma caché de disco, se toma la primera libre.
+        path = os.path.join(DRIVER_CACHE_DIR, f"driver-{slot}")
+        lock = open(f"{path}.lock", "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError: # La usa otro controlador.
+            lock.close()
+            continue
+        return os.path.abspath(path), lock # El sistema operativo libera el bloqueo si el proceso muere sin cerrar el controlador.
+
+
+def _quit_and_release(quit, lock): # Función que reemplaza a driver.quit: cierra el controlador y libera su carpeta de caché.
+    try:
+        quit()
+    finally:
+        lock.close()
+
+
+def create_driver(driver_path, profile=DEFAULT_DRIVER_PROFILE): # Función para crear y configurar un controlador con un perfil de DRIVER_PROFILES, usada tanto por WebScraper como por DriverPool.
+    settings = DRIVER_PROFILES[profile]
+    options = Options() # Inicializar opciones para configurar el controlador.
+    options.page_load_strategy = settings["page_load_strategy"] # Cuándo retorna driver.get: al terminar de cargar todo (normal), con el HTML listo (eager) o de inmediato (none).
+    
+    options.add_argument("--headless=new") # Sin interfaz visual.
+    options.add_argument("--disable-gpu") # Antes se necesitaba para la interfaz headless pero ahora parece que no, lo dejé por si acaso.
+    options.add_argument("--disable-dev-shm-usage") # Utiliza un directorio temporario para evitar problemas de espacio.
+    options.add_argument("--window-size=1920,1080") # Asegura que BioBioChile cargue correctamente más resultados debido a que usa lazy-loading en su sitio web.
+    lock = None
+    if settings["cache"]:
+        cache_dir, lock = _claim_cache_dir()
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+    for argument in settings["args"]:
+        options.add_argument(argument)
+    
+    # Utilizar User-Agents distintos por cada ejecución del código.
+    ua = UserAgent(os={"Windows", "Linux", "Ubuntu"})
+    options.add_argument(f"user-agent={ua.random}")
+
+    try:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    except Exception:
+        if lock is not None:
+            lock.close()
+        raise
+    if lock is not None: # La carpeta de caché queda tomada hasta que se cierre el controlador.
+        driver.quit = functools.partial(_quit_and_release, driver.quit, lock)
+    return driver
+
+
+class DriverPool: # Pool de controladores "calientes" que se reutilizan para scrapear varios sitios web al mismo tiempo.
+    def __init__(self, driver_path, size=len(SITES), profile=DEFAULT_DRIVER_PROFILE): # Inicializador del pool, levanta todos los controladores en paralelo.
+        self.driver_path = driver_path # Ruta de acceso al controlador del browser.
+        self.profile = profile # Perfil de todos los controladores del pool (ver DRIVER_PROFILES).
+        self._idle = queue.Queue() # Controladores disponibles para ser usados.
+        with ThreadPoolExecutor(max_workers=size) as executor: # Iniciar Chrome es lento, por lo que se inician todos a la vez.
+            self._drivers = list(executor.map(lambda _: create_driver(driver_path, profile), range(size)))
+        for driver in self._drivers:
+            self._idle.put(driver)
+
+    @property
+    def size(self): # Cantidad de controladores que mantiene el pool.
+        return len(self._drivers)
+
+    def acquire(self): # Método para tomar un controlador libre, espera si todos están ocupados.
+        return self._idle.get()
+
+    def release(self, driver): # Método para devolver un controlador al pool una vez terminado su uso.
+        self._idle.put(driver)
+
+    def replace(self, driver): # Método para reemplazar un controlador prestado que murió por uno nuevo, retorna el nuevo (que sigue prestado a quien lo pidió).
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        new_driver = create_driver(self.driver_path, self.profile)
+        self._drivers = [new_driver if current is driver else current for current in self._drivers]
+        return new_driver
+
+    def close(self): # Método para cerrar todos los controladores del pool.
+        for driver in self._drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._drivers = []
+
+
+class Waiter: # Motor de esperas basado en condiciones explícitas, reemplaza los time.sleep fijos.
+    def __init__(self, driver, site, timeout=None, metrics=None): # Inicializador con el tiempo máximo de espera del sitio web.
+        self.driver = driver
+        self.site = site
+        self.metrics = metrics # Métricas opcionales (ver metrics.py), el tiempo de cada espera se registra como la fase "wait".
+        self.timeout = timeout if timeout is not None else WAIT_TIMEOUTS.get(site, DEFAULT_WAIT_TIMEOUT)
+
+    def until(self, condition, label, timeout=None): # Revisa la condición con backoff hasta que se cumpla, retorna su valor o None si se acaba el tiempo.
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        delay = WAIT_POLL_INITIAL
+        while True:
+            try:
+                result = condition()
+            except (NoSuchElementException, StaleElementReferenceException): # La página todavía está cambiando, se sigue esperando.
+                result = None
+            elapsed = time.monotonic() - start
+            if result:
+                logger.info("%s: espera '%s' cumplida en %.2f s", self.site, label, elapsed)
+                self._record(elapsed)
+                return result
+            if elapsed >= timeout:
+                logger.info("%s: espera '%s' agotada tras %.2f s", self.site, label, elapsed)
+                self._record(elapsed)
+                return None
+            time.sleep(min(delay, timeout - elapsed))
+            delay = min(delay * WAIT_POLL_BACKOFF, WAIT_POLL_MAX) # Backoff exponencial para no saturar al controlador con revisiones.
+
+    def _record(self, elapsed):
+        if self.metrics is not None:
+            self.metrics.observe("phase_seconds", elapsed, site=self.site or "", phase="wait")
+
+    # Condiciones, cada una retorna un valor verdadero cuando se cumple.
+    def present(self, xpath): # Hay al menos un elemento que coincide con el XPath.
+        return self.driver.find_elements(By.XPATH, xpath)
+
+    def count(self, xpath): # Cantidad de elementos que coinciden con el XPath, en una sola llamada al controlador.
+        return self.driver.execute_script(
+            "return document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;", xpath)
+
+    def count_grew(self, xpath, previous): # La cantidad de elementos creció desde `previous`.
+        current = self.count(xpath)
+        return current if current > previous else None
+
+    def height_changed(self, previous): # La altura de la página cambió desde `previous`.
+        current = self.driver.execute_script("return document.body.scrollHeight")
+        return current if current != previous else None
+
+    def stale(self, element): # El elemento ya no está en la página (por ejemplo, porque se cambió de página).
+        try:
+            element.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return True
+
+    def network_idle(self, idle_time=NETWORK_IDLE_TIME): # Retorna una condición que se cumple cuando la página cargó y no hay peticiones nuevas durante `idle_time`.
+        state = {"resources": -1, "since": time.monotonic()}
+
+        def condition():
+            ready, resources = self.driver.execute_script(
+                "return [document.readyState, performance.getEntriesByType('resource').length];")
+            now = time.monotonic()
+            if ready != "complete" or resources != state["resources"]: # Hubo actividad de red, se reinicia el contador.
+                state["resources"], state["since"] = resources, now
+                return False
+            return now - state["since"] >= idle_time
+        return condition
+
+
+def _phase(name): # Decorador para medir un método de WebScraper como una fase del sitio web que se está scrapeando.
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 class WebScraper:
-    def __init__(self, driver_path): # Inicializador de la clase WebScraper.
+    def __init__(self, driver_path, driver=None, pool=None, fetcher=None, sink=None, keep_data=True, store=None, cache=None, metrics=None, profile_dir=None, checkpoints=None, profile=None): # Inicializador de la clase WebScraper.
         self.driver_path = driver_path # Ruta de acceso al controlador del browser.
-        self.driver = self._setup_driver() # Inicializador del controlador.
+        self.pool = pool # Pool de controladores opcional, si existe cada sitio web se scrapea en paralelo con su propio controlador.
+        self.fetcher = fetcher # Cliente HTTP opcional, si existe los sitios web de HTTP_BACKENDS se scrapean sin navegador.
+        self._owns_driver = driver is None and pool is None # Solo se cierra el controlador si fue creado por esta instancia.
+        self._driver = driver # El controlador propio se crea recién cuando se necesita, así no se abre Chrome si todo se resuelve por HTTP.
         self.data = [] # Lista para guardar los datos extraídos.
+        self.sink = sink # Destino opcional (ver sinks.py) al que se escribe cada noticia apenas se extrae.
+        self.keep_data = keep_data # Si es False las noticias solo se escriben en el destino y no se acumulan en memoria.
+        self.count = 0 # Cantidad de noticias extraídas por esta instancia.
+        self.store = store # Base de datos opcional (ver store.py), si existe solo se agregan las noticias que no estaban guardadas para la búsqueda.
+        self.query = None # Término de búsqueda del sitio web que se está scrapeando.
+        self.site = None # Sitio web que se está scrapeando.
+        self.caught_up = False # Se vuelve True cuando el scraper llega a noticias ya guardadas, así deja de paginar.
+        self._known_streak = 0 # Cantidad de noticias seguidas que ya estaban guardadas.
+        self._resuming = False # True al retomar desde un punto de control hasta encontrar la primera noticia nueva (ver _add_rows).
+        self.cache = cache # Caché opcional (ver cache.py) con los resultados de cada búsqueda por sitio web.
+        self._site_rows = None # Noticias del sitio web que se está scrapeando, para guardarlas en el caché al terminar.
+        self.metrics = metrics # Métricas opcionales (ver metrics.py): llamadas al controlador, tiempo de cada fase y noticias por sitio web.
+        self.profile_dir = profile_dir # Si se entrega, cada sitio web se perfila con cProfile y el perfil se guarda en esta carpeta.
+        self._instrumented = None # Controlador envuelto para registrar sus llamadas en las métricas.
+        self.checkpoints = checkpoints # Puntos de control opcionales (ver checkpoint.py), si existen un sitio web que no terminó se retoma donde quedó en la siguiente ejecución.
+        self._position = None # Última posición del sitio web que se está scrapeando (página, offset y noticias escritas), para retomarlo después de un error.
+        self._error = None # Error con el que terminó el último intento de scrapear el sitio web con el navegador.
+        self.base_urls = dict(BASE_URLS) # URL base de cada sitio web.
+        self.profile = profile or (pool.profile if pool is not None else DEFAULT_DRIVER_PROFILE) # Perfil del controlador (ver DRIVER_PROFILES), con pool se usa el de sus controladores.
+        self._data_lock = threading.Lock() # Candado para juntar de forma segura los resultados de los scrapers en paralelo.
+
+    @property
+    def driver(self): # Controlador del browser, se inicializa la primera vez que se usa. Con métricas se entrega envuelto para contar y medir sus llamadas.
+        if self._driver is None and self._owns_driver:
+            self._driver = self._setup_driver()
+        if self.metrics is None or self._driver is None:
+            return self._driver
+        if self._instrumented is None or self._instrumented.driver is not self._driver: # Se envuelve una sola vez por controlador.
+            self._instrumented = InstrumentedDriver(self._driver, self.metrics, lambda: self.site)
+        return self._instrumented
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
 
     def _setup_driver(self): # Método para configurar el controlador.
-        options = Options() # Inicializar opciones para configurar el controlador.
-        
-        options.add_argument("--headless=new") # Sin interfaz visual.
-        options.add_argument("--disable-gpu") # Antes se necesitaba para la interfaz headless pero ahora parece que no, lo dejé por si acaso.
-        options.add_argument("--disable-dev-shm-usage") # Utiliza un directorio temporario para evitar problemas de espacio.
-        options.add_argument("--window-size=1920,1080") # Asegura que BioBioChile cargue correctamente más resultados debido a que usa lazy-loading en su sitio web.
-        
-        # Utilizar User-Agents distintos por cada ejecución del código.
-        ua = UserAgent(os={"Windows", "Linux", "Ubuntu"})
-        options.add_argument(f"user-agent={ua.random}")
+        return create_driver(self.driver_path, self.profile)
+
+    def _block_resources(self, site): # Método para bloquear con CDP los recursos que el perfil bloquea y el sitio web permite bloquear, retorna los grupos bloqueados.
+        blocked = DRIVER_PROFILES[self.profile]["block"]
+        if not blocked: # El perfil no bloquea nada, no se envía ningún comando.
+            return []
+        groups = [group for group in blocked if group in SITE_BLOCKED_RESOURCES.get(site, [])]
+        try: # Se envía siempre, porque el mismo controlador puede venir de otro sitio web con otros grupos bloqueados.
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [pattern for group in groups for pattern in BLOCKED_RESOURCES[group]]})
+        except Exception as e: # Navegadores sin CDP (por ejemplo, Firefox).
+            print(f"No se pudieron bloquear recursos en {site}: {e}")
+            return []
+        return groups
+
+    def _waiter(self, site): # Método para crear un motor de esperas con los tiempos máximos del sitio web.
+        return Waiter(self.driver, site, metrics=self.metrics)
+
+    def _driver_alive(self): # Método para revisar si el controlador sigue respondiendo (Chrome puede cerrarse o colgarse en ejecuciones largas).
+        if self._driver is None:
+            return True
+        try:
+            self._driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _restart_driver(self): # Método para reemplazar un controlador muerto por uno nuevo, del pool si se está usando uno.
+        if self.pool is not None:
+            self._driver = self.pool.replace(self._driver)
+            return
+        try:
+            self._driver.quit()
+        except Exception:
+            pass
+        self._driver = self._setup_driver()
+        self._owns_driver = True # El controlador nuevo lo creó esta instancia, así que también lo cierra.
 
-        return webdriver.Chrome(service=Service(self.driver_path), options=options)
+    def _span(self, phase): # Método para medir una fase del sitio web que se está scrapeando (no hace nada sin métricas).
+        return self.metrics.span(self.site, phase) if self.metrics is not None else nullcontext()
 
-    def _scroll_to_bottom(self): # Método para desplazarse hasta el fondo de la página para tratar con el lazy-loading.
+    @_phase("scroll")
+    def _scroll_to_bottom(self, site=None): # Método para desplazarse hasta el fondo de la página para tratar con el lazy-loading.
+        waiter = self._waiter(site)
         last_height = self.driver.execute_script("return document.body.scrollHeight") # Obtiene la altura actual de la página.
         while True:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);") # Se desplaza al fondo de la página.
-            time.sleep(2)
-            new_height = self.driver.execute_script("return document.body.scrollHeight") # Obtiene la altura nueva de la página.
-            if new_height == last_height: # Compara la primera altura a la segunda y si son iguales es porque ya está al fondo.
+            new_height = waiter.until(lambda: waiter.height_changed(last_height), "scroll", timeout=SCROLL_WAIT_TIMEOUT) # Espera a que la página crezca.
+            if not new_height: # Si la altura no cambió es porque ya está al fondo.
                 break
             last_height = new_height
 
-    def _format_date(self, date): # Método para formatear la fecha a dd/mm/aaaa o retorna None si es inválido.
-        try:
-            # Fecha coincide con el formato dd/mm/aaaa.
-            match = re.search(r"\d{1,2}/\d{1,2}/\d{4}", date)
-            if match:
-                return match.group()
-
-            # Fecha coincide con el formato de fecha en español (ej: Jueves 09 Enero, 2025).
-            match = re.search(r"(\w+)\s(\d{1,2})\s(\w+),\s(\d{4})", date)
-            if match:
-                day = match.group(2)
-                month = MONTH_MAPPING.get(match.group(3), "01") # El valor predeterminado es "01" si el mes no es válido.
-                year = match.group(4)
-                return f"{day}/{month}/{year}"
-            
-            return None  # Retorna None si no se encuentra una fecha válida.
-        except Exception:
-            return None
-    
+    @_phase("close_ads")
     def _close_ads(self): # Método para cerrar un anuncio detectado en la página (solo lo necesita BioBioChile por ahora).       
         try:
             # Localiza y cambia al iframe (marco donde se encuentra el anuncio).
@@ -93,68 +431,250 @@ class WebScraper:
             print(f"No se pudo cerrar el anuncio o no había ninguno: {e}")
             self.driver.switch_to.default_content()
 
+    @_phase("extract")
+    def _extract_rows(self, site, offset=0, limit=None): # Método para extraer todas las noticias desde `offset` en una sola llamada al controlador.
+        selectors = SELECTORS[site]
+        fields = {name: value for name, value in selectors.items() if name != "rows"}
+        result = self.driver.execute_script(EXTRACT_ROWS_JS, selectors["rows"], fields, offset, limit)
+        return result["rows"], result["total"] # Noticias extraídas y cantidad total de noticias presentes en la página.
+
+    def _add_row(self, row): # Método para agregar una noticia a la lista de datos extraídos y al destino.
+        if self.keep_data:
+            self.data.append(row)
+        if self.sink is not None:
+            self.sink.write(row)
+        if self._site_rows is not None:
+            self._site_rows.append(row)
+        self.count += 1
+        if self.metrics is not None:
+            self.metrics.inc("articles_total", site=row["Website"])
+        if self.count % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
+            print(f"{self.count} noticias extraídas...")
+
+    def _collect(self, site, offset, limit): # Método para extraer y guardar las noticias nuevas de la página, retorna el nuevo offset, el total de la página y cuántas se agregaron.
+        rows, total = self._extract_rows(site, offset, limit)
+        return offset + len(rows), total, self._add_rows(site, rows)
+
+    def _start_site(self, site, query): # Método para reiniciar el estado de la búsqueda al comenzar a scrapear un sitio web, retorna la posición desde donde retomarlo (vacía si se empieza desde el principio).
+        self.site = site
+        self.query = query
+        self.caught_up = False
+        self._known_streak = 0
+        if self._position is not None and (self._position["site"], self._position["query"]) != (site, query): # La posición es de otro sitio web o búsqueda.
+            self._position = None
+        if self._position is None:
+            self._resuming = False
+        if self._position is None and self.checkpoints is not None:
+            self._position = self.checkpoints.load(query, site)
+            if self._position is not None:
+                self._resuming = True
+                print(f"Retomando {site} desde el punto de control ({self._position['rows']} noticias ya escritas).")
+                self._site_rows = None # Solo se tienen las noticias desde el punto de control, no se guardan en el caché como si fueran todas.
+        return dict(self._position or {})
+
+    def _checkpoint(self, **position): # Método para registrar la posición del sitio web que se está scrapeando y, si hay puntos de control, guardarla cada cierto tiempo.
+        self._position = {"site": self.site, "query": self.query, **position}
+        if self.checkpoints is not None:
+            self.checkpoints.save(self.query, self.site, self._position, flush=self._flush_outputs)
+
+    def _flush_outputs(self): # Método para guardar las noticias pendientes de la base de datos y del destino antes de escribir un punto de control.
+        if self.store is not None:
+            self.store.flush()
+        if self.sink is not None:
+            self.sink.flush()
+
+    def _add_rows(self, site, rows): # Método para guardar noticias extraídas (del navegador o por HTTP), retorna cuántas se agregaron. Fechas y títulos se guardan tal como vienen, los normalizan por bloques los destinos, la base de datos y to_dataframe (ver postprocess.py).
+        added = 0
+        for row in rows:
+            if not row["Title"] or not row["URL"]: # Elementos que no son noticias (por ejemplo, el botón de cargar más de DuckDuckGo).
+                continue
+            row = {"Title": row["Title"], "Date": row.get("Date"), "URL": row["URL"], "Website": site}
+            if self.store is not None and not self.store.add(self.query, site, row): # La noticia ya estaba guardada para esta búsqueda.
+                if self.store.seen_by(self.query, row["URL"]) != site: # La guardó otro sitio web, no dice nada de lo que sigue en este.
+                    continue
+                if self._resuming: # Al retomar, las primeras noticias ya guardadas son las que la ejecución anterior alcanzó a guardar después de su último punto de control, no las de una búsqueda anterior.
+                    continue
+                self._known_streak += 1
+                if self._known_streak >= KNOWN_STOP_STREAK: # Los resultados van de más nuevo a más antiguo, así que lo que sigue también está guardado.
+                    self.caught_up = True
+                    break
+                continue
+            self._known_streak = 0
+            self._resuming = False # Ya se pasó de donde llegó la ejecución anterior.
+            self._add_row(row) # Se agregan los datos de la noticia a la lista de datos extraídos.
+            added += 1
+        return added
+
+    def _scrape_http(self, site, query): # Método para scrapear un sitio web solo con HTTP, retorna False si se debe usar el navegador.
+        backend = HTTP_BACKENDS.get(site)
+        if self.fetcher is None or backend is None:
+            return False
+
+        print(f"= = = Entrando a {site} (HTTP) = = =") # Visualizador arbitrario para la consola, solo para saber si está funcionando.
+        start = self._start_site(site, query).get("rows", 0) # Con un punto de control se pide directo desde esa posición. Las noticias escritas nunca superan las revisadas, así no se salta ninguna.
+        try:
+            with self._span("http"):
+                rows = backend.fetch(self.fetcher, query, MAX_NEWS_PER_SITE - start, self.base_urls[site], start, stop=self._known_check(site))
+        except Exception as e: # Solo una respuesta que no se pudo obtener o leer pasa al navegador, una búsqueda sin resultados termina aquí.
+            print(f"No se pudo extraer datos de {site} por HTTP, se usará el navegador: {e}")
+            return False
+
+        self._add_rows(site, rows)
+        self._finish_site(site, query)
+        print(f"Búsqueda por {site} finalizada.")
+        return True
+
+    def _known_check(self, site): # Método para crear la condición con la que un backend HTTP deja de pedir páginas, la misma racha de noticias ya guardadas que usa _add_rows (sin guardar nada).
+        if self.store is None:
+            return None
+        streak, resuming = 0, self._resuming
+
+        def stop(rows): # Recibe las noticias de cada página, retorna True si lo que sigue ya está guardado.
+            nonlocal streak, resuming
+            for row in rows:
+                seen = self.store.seen_by(self.query, row["URL"]) if row.get("URL") else None
+                if seen is None:
+                    streak, resuming = 0, False
+                elif seen == site and not resuming:
+                    streak += 1
+                    if streak >= KNOWN_STOP_STREAK:
+                        return True
+            return False
+        return stop
+
+    def _finish_site(self, site, query): # Método para descartar la posición de un sitio web que terminó sin errores.
+        self._position = None
+        if self.checkpoints is not None:
+            self.checkpoints.clear(query, site)
+
+    def _scrape_browser(self, site, query): # Método para scrapear un sitio web con el navegador, si falla lo retoma desde su última posición (con un controlador nuevo si el anterior murió) hasta SITE_RETRIES veces. Retorna True si el sitio web terminó.
+        for attempt in range(SITE_RETRIES + 1):
+            self._error = None
+            raised = False
+            rows = (self._position or {}).get("rows", 0)
+            try:
+                getattr(self, SITES[site])(query)
+            except Exception as e: # Errores fuera del try de cada scraper (por ejemplo, al abrir el URL con un controlador muerto).
+                self._error, raised = e, True
+            if self._error is None:
+                self._finish_site(site, query)
+                return True
+
+            alive = self._driver_alive()
+            if attempt == SITE_RETRIES or (alive and (self._position or {}).get("rows", 0) == rows): # Sin avance y con el controlador funcionando, el mismo error se repetiría.
+                break
+            print(f"Retomando {site} desde la noticia {(self._position or {}).get('rows', 0)}{'' if alive else ' con un controlador nuevo'} (intento {attempt + 2} de {SITE_RETRIES + 1}).")
+            if not alive:
+                self._restart_driver()
+
+        if self.checkpoints is not None and self._position is not None: # Se guarda la última posición, así la siguiente ejecución retoma desde ahí.
+            self.checkpoints.save(query, site, self._position, force=True, flush=self._flush_outputs)
+        if raised:
+            raise self._error
+        return False
+
+    def _scrape_from_cache(self, site, query): # Método para agregar las noticias del caché, retorna False si no estaban. Si están desactualizadas se entregan igual y se actualizan en segundo plano.
+        if self.cache is None:
+            return False
+        cached = self.cache.get(query, site, MAX_NEWS_PER_SITE)
+        if cached is None:
+            return False
+
+        rows, fresh = cached
+        print(f"= = = {site} desde el caché ({len(rows)} noticias{'' if fresh else ', desactualizadas'}) = = =")
+        for row in rows:
+            self._add_row(row)
+        if not fresh:
+            self.cache.refresh(query, site, MAX_NEWS_PER_SITE, lambda: self._scrape_uncached(site, query))
+        return True
+
+    def _scrape_uncached(self, site, query): # Método para scrapear un sitio web sin caché ni destino, retorna las noticias (lo usa la actualización en segundo plano) o una lista vacía si no terminó.
+        refresher = WebScraper(self.driver_path, pool=self.pool, fetcher=self.fetcher, metrics=self.metrics, profile=self.profile)
+        refresher.base_urls = self.base_urls
+        try:
+            complete = refresher._scrape_site(site, query)
+        finally:
+            refresher.close()
+        return refresher.data if complete else [] # Unas pocas noticias de un sitio web que falló no reemplazan al resultado anterior.
+
+    def _scrape_site(self, site, query): # Método para scrapear un sitio web: primero desde el caché, después por HTTP si es posible y si no con el navegador. Retorna True si el sitio web terminó.
+        self.site = site
+        with self._span("total"), profile_site(site, self.profile_dir): # Tiempo total del sitio web y, si se pidió, su perfil de cProfile.
+            if self._scrape_from_cache(site, query):
+                return True
+            self._site_rows = [] if self.cache is not None else None
+            try:
+                complete = self._scrape_http(site, query)
+                if not complete:
+                    if self.pool is None:
+                        complete = self._scrape_browser(site, query)
+                    else: # Se usa un controlador prestado del pool solo mientras se scrapea el sitio web.
+                        self.driver = self.pool.acquire()
+                        try:
+                            complete = self._scrape_browser(site, query)
+                        finally:
+                            self.pool.release(self._driver) # Se devuelve el controlador real, no el envuelto para las métricas.
+                            self.driver = None
+                if complete and self._site_rows: # Solo se guardan en el caché los sitios web que terminaron y entregaron noticias, las de uno que falló a la mitad están incompletas.
+                    self.cache.put(query, site, MAX_NEWS_PER_SITE, self._site_rows)
+                return complete
+            finally: # Si el sitio web falló, sus noticias no pasan al siguiente.
+                self._site_rows = None
+
     def scrape_adnradio(self, query): # Método principal para scrapear el sitio web ADNRadio (adnradio.cl).
-        url = f"https://www.adnradio.cl/buscador/?q={query.strip().replace(r' ','%20')}"
+        resume = self._start_site("ADNRadio", query)
+        self._block_resources("ADNRadio")
+        url = f"{self.base_urls['ADNRadio']}/buscador/?q={query.strip().replace(r' ','%20')}"
         self.driver.get(url) # Abre el URL.
         print("= = = Entrando a ADNRadio = = =") # Visualizador arbitrario para la consola, solo para saber si está funcionando.
-        time.sleep(3)
+        waiter = self._waiter("ADNRadio")
+        articles_xpath = SELECTORS["ADNRadio"]["rows"] # XPath de todas las noticias presentes en el sitio.
+        waiter.until(lambda: waiter.present(articles_xpath), "resultados") # Espera a que aparezcan las primeras noticias.
         
-        count = 0 # Contador de noticias extraídas.
+        count = resume.get("rows", 0) # Contador de noticias extraídas.
+        offset = resume.get("offset", 0) # Cantidad de noticias de la página ya revisadas, solo se extraen las que aparecieron después. Al retomar se desplaza sin extraer hasta pasar esta posición.
         
         try:
             while count < MAX_NEWS_PER_SITE: # Loop para extraer noticias solo hasta el límite establecido.
-                articles = self.driver.find_elements(By.XPATH, "//*[@id='fusion-app']/main/section[2]/div/div/div") # Encuentra todas las noticias presentes en el sitio.
-                if not articles: # Si no encuentra más noticias, termina.
+                offset, total, added = self._collect("ADNRadio", offset, MAX_NEWS_PER_SITE - count) # Extrae todas las noticias nuevas de una vez.
+                count += added # Aumenta el contador de noticias extraídas.
+                self._checkpoint(offset=offset, rows=count)
+                if self.caught_up: # Las noticias que siguen ya se guardaron en una búsqueda anterior.
+                    print("Búsqueda por ADNRadio finalizada, no hay más noticias nuevas.")
+                    break
+                if total == 0: # Si no encuentra noticias, termina.
                     print("Búsqueda por ADNRadio finalizada.")
                     break
-
-                for article in articles: # Loop por cada noticia de todas las noticias encontradas.
-                    try:
-                        title = article.find_element(By.XPATH, ".//article/div/header/h3/a") # Extrae el elemento del título.
-                        date = article.find_element(By.XPATH, ".//article/div/div/p[2]") # Primer caso: Extrae el elemento de la fecha cuando la noticia SI tiene autor.
-                        if not date.text:
-                            date = article.find_element(By.XPATH, ".//article/div/div/p[1]") # Segundo caso: Extrae el elemento de la fecha cuando la noticia NO tiene autor.
-
-                        self.data.append({ # Se agregan los datos de arriba a la lista de datos extraídos.
-                            "Title": title.text,
-                            "Date": self._format_date(date.text),
-                            "URL": title.get_attribute("href"), # El URL está en el mismo elemento que el título, se extrae el atributo href.
-                            "Website": "ADNRadio"
-                        })
-                        count += 1 # Aumenta el contador de noticias extraídas.
-                        
-                        if len(self.data) % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
-                            print(f"{len(self.data)} noticias extraídas...")
-                    except Exception:
-                        continue
+                if offset < total: # Aún quedan noticias cargadas sin revisar.
+                    continue
 
                 # Desplaza la página hasta la parte inferior para cargar más resultados.
-                previous_height = self.driver.execute_script("return document.body.scrollHeight")
-                self._scroll_to_bottom()
+                self._scroll_to_bottom("ADNRadio")
                 
                 # Espera a que el sitio web cargue más noticias.
-                time.sleep(3)
-
-                # Comprueba si la altura del desplazamiento ha cambiado.
-                current_height = self.driver.execute_script("return document.body.scrollHeight")
-                if current_height == previous_height: # Cuando bajas al fondo cargan automáticamente más noticias, si no pasa es porque terminó. 
+                if not waiter.until(lambda: waiter.count_grew(articles_xpath, total), "más noticias"): # Cuando bajas al fondo cargan automáticamente más noticias, si no pasa es porque terminó.
                     print("Búsqueda por ADNRadio finalizada.")
                     break # No hay más noticias para cargar.
 
         except Exception as e:
             print(f"Se produjo un error al extraer datos de ADNRadio: {e}")
+            self._error = e
 
     def scrape_biobiochile(self, query): # Método principal para scrapear el sitio web BioBioChile (biobiochile.cl).
-        url = f"https://www.biobiochile.cl/buscador.shtml?s={query.strip().replace(r' ','+')}"
+        resume = self._start_site("BioBioChile", query)
+        blocked = self._block_resources("BioBioChile")
+        url = f"{self.base_urls['BioBioChile']}/buscador.shtml?s={query.strip().replace(r' ','+')}"
         self.driver.get(url) # Abre el URL.
         print("= = = Entrando a BioBioChile = = =") # Visualizador arbitrario para la consola, solo para saber si está funcionando.
-        time.sleep(3)
-        self._close_ads() # Cierra el anuncio que sale al inicio. De igual forma, si esperas 30 segundos el anuncio desaparece por si solo.
-        
-        current_count = 0 # Contador de noticias extraídas.
-        xpath_count = 1 # Índice para las noticias después de las primeras 20.
-        base_xpath = "/html/body/main/div[2]/section/div/div/div/div/" # Parte del XPath que comparten el título, fecha y url.
+        waiter = self._waiter("BioBioChile")
         count_xpath = "/html/body/main/div[1]/div/div/div[2]" # XPath del número de noticias en la página de resultados.
+        waiter.until(lambda: waiter.present(count_xpath), "resultados") # Espera a que aparezca el número de noticias encontradas.
+        if "ads" not in blocked: # Con los anuncios bloqueados no hay nada que cerrar.
+            self._close_ads() # Cierra el anuncio que sale al inicio. De igual forma, si esperas 30 segundos el anuncio desaparece por si solo.
+        
+        current_count = resume.get("rows", 0) # Contador de noticias extraídas.
+        offset = resume.get("offset", 0) # Cantidad de noticias de la página ya revisadas, solo se extraen las que aparecieron después. Al retomar se cargan más resultados sin extraer hasta pasar esta posición.
+        articles_xpath = SELECTORS["BioBioChile"]["rows"] # XPath de todas las noticias (las primeras 20 y el resto tienen un XPath distinto).
         button_xpath = "/html/body/main/div[2]/section/div/div/div/div/div/div[2]/button" # XPath del botón para cargar más resultados.
 
         try:
@@ -164,111 +684,71 @@ class WebScraper:
                 max_articles = MAX_NEWS_PER_SITE
             
             while current_count < max_articles:
-                if current_count < 20: 
-                    for i in range(1, 21): # Loop para las primeras 20 noticias. Estos tienen un XPath distinto a todo el resto.
-                        if current_count >= max_articles: # Si el contador de noticias sobrepasa el máximo este se detiene.
-                            break
-                        try:
-                            url = self.driver.find_element(By.XPATH, f"{base_xpath}a[{i}]") # Extrae el elemento del url.
-                            title = self.driver.find_element(By.XPATH, f"{base_xpath}a[{i}]/article/div[2]/h2") # Extrae el elemento del título.
-                            date = self.driver.find_element(By.XPATH, f"{base_xpath}a[{i}]/article/div[2]/div") # Extrae el elemento de la fecha.
-                            
-                            self.data.append({ # Se agregan los datos de arriba a la lista de datos extraídos.
-                                "Title": title.text,
-                                "Date": self._format_date(date.text),
-                                "URL": url.get_attribute("href"),
-                                "Website": "BioBioChile"
-                            })
-                            
-                            if len(self.data) % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
-                                print(f"{len(self.data)} noticias extraídas...")
-                            
-                            current_count += 1 # Aumenta el contador de noticias extraídas.
-                        except:
-                            break
-
-                for i in range(1, 21): # Loop para el resto de noticias.
-                    if current_count >= max_articles: # Si el contador de noticias sobrepasa el máximo este se detiene.
-                        break
-                    try:
-                        url = self.driver.find_element(By.XPATH, f"{base_xpath}div/div[1]/div[{xpath_count}]/a") # Extrae el elemento del url.
-                        title = self.driver.find_element(By.XPATH, f"{base_xpath}div/div[1]/div[{xpath_count}]/a/article/div[2]/h2") # Extrae el elemento del título.
-                        date = self.driver.find_element(By.XPATH, f"{base_xpath}div/div[1]/div[{xpath_count}]/a/article/div[2]/div") # Extrae el elemento de la fecha.
-
-                        self.data.append({ # Se agregan los datos de arriba a la lista de datos extraídos.
-                            "Title": title.text,
-                            "Date": self._format_date(date.text),
-                            "URL": url.get_attribute("href"),
-                            "Website": "BioBioChile"
-                        })
-                        
-                        if len(self.data) % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
-                            print(f"{len(self.data)} noticias extraídas...")
-                        
-                        xpath_count += 1 # Aumenta el índice para buscar la siguiente noticia.
-                        current_count += 1 # Aumenta el contador de noticias extraídas.
-                    except:
-                        break
-
-                self._scroll_to_bottom() # Para poder presionar el botón de cargar más resultados este tiene que estar cargado (que se pueda ver la gráfica del botón).
-                try: # Presiona el botón de cargar más resultados.
-                    load_more_button = self.driver.find_element(By.XPATH, button_xpath)
-                    load_more_button.click()
-                    time.sleep(2)
-                except: # Si no encuentra ningún botón, es porque terminó.
+                offset, total, added = self._collect("BioBioChile", offset, max_articles - current_count) # Extrae todas las noticias nuevas de una vez.
+                current_count += added # Aumenta el contador de noticias extraídas.
+                self._checkpoint(offset=offset, rows=current_count)
+                if self.caught_up: # Las noticias que siguen ya se guardaron en una búsqueda anterior.
+                    print("Búsqueda por BioBioChile finalizada, no hay más noticias nuevas.")
+                    break
+                if current_count >= max_articles: # Si el contador de noticias llega al máximo este se detiene.
+                    break
+                if offset < total: # Aún quedan noticias cargadas sin revisar.
+                    continue
+
+                load_more_button = waiter.until(lambda: waiter.present(button_xpath), "botón", timeout=SCROLL_WAIT_TIMEOUT) # Normalmente ya está, solo se espera si el sitio web lo está volviendo a dibujar.
+                if not load_more_button: # Si no encuentra ningún botón, es porque terminó.
+                    print("Búsqueda por BioBioChile finalizada.")
+                    break
+                # La página no crece hasta presionar el botón, así que en vez de desplazarse al fondo (y esperar a que deje de crecer) se lleva el botón a la vista y se presiona con JavaScript, igual que en Cooperativa.
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", load_more_button[0])
+                if not waiter.until(lambda: waiter.count_grew(articles_xpath, total), "cargar más"): # Espera a que aparezcan las nuevas noticias, si no aparecen es porque terminó.
                     print("Búsqueda por BioBioChile finalizada.")
                     break
         except Exception as e:
             print(f"Se produjo un error al extraer datos de BioBioChile: {e}")
+            self._error = e
 
     def scrape_cooperativa(self, query): # Método principal para scrapear el sitio web Cooperativa (cooperativa.cl)
-        url = "https://www.cooperativa.cl/"
+        resume = self._start_site("Cooperativa", query)
+        self._block_resources("Cooperativa")
+        if not resume.get("url"): # Sin el URL de la página de resultados no se puede saltar a ella, se empieza desde la primera página.
+            resume = {}
+        url = resume.get("url") or f"{self.base_urls['Cooperativa']}/" # Al retomar se abre directo la página de resultados donde quedó.
         self.driver.get(url) # Abre el URL.
         print("= = = Entrando a Cooperativa = = =") # Visualizador arbitrario para la consola, solo para saber si está funcionando.
-        time.sleep(15) # Tiene un tiempo más largo debido a que cuando estuve haciendo las pruebas finales el servidor del sitio web estaba bastante lento y le costaba cargar.
-        # A veces presenta un anuncio pero esperando el tiempo de espera anterior este desaparece.
+        waiter = self._waiter("Cooperativa") # Tiene un tiempo máximo más largo (ver WAIT_TIMEOUTS) porque el servidor del sitio web suele ser lento.
+        lupa_xpath = "//*[@id='buscador_media']/p/a" # XPath de la lupa que habilita la barra de búsqueda.
+        if not resume:
+            waiter.until(lambda: waiter.present(lupa_xpath), "lupa")
+            waiter.until(waiter.network_idle(), "red inactiva") # A veces presenta un anuncio, se espera a que la página termine de cargar.
         
-        count = 0 # Contador de noticias extraídas.
-        base_xpath = "//*[@id='contenedor-pagina']/section/div/section/article[" # Parte del XPath compartido por el título, fecha y url.
+        count = resume.get("rows", 0) # Contador de noticias extraídas.
+        offset = resume.get("offset", 0) # Cantidad de noticias de la página actual ya revisadas.
+        first_xpath = f"{SELECTORS['Cooperativa']['rows']}[1]" # XPath de la primera noticia de una página de resultados.
         page_xpath = "//*[@id='contenedor-pagina']/section/div/section/div[2]/a[" # Parte del XPath de los botones para cambiar de página de resultados.
         
         try:
-            # Encuentra y presiona el elemento de la lupa para habilitar la barra de búsqueda, si no es presionado no funciona.
-            lupa = self.driver.find_element(By.XPATH, "//*[@id='buscador_media']/p/a") 
-            lupa.click()
+            if not resume:
+                # Encuentra y presiona el elemento de la lupa para habilitar la barra de búsqueda, si no es presionado no funciona.
+                lupa = self.driver.find_element(By.XPATH, lupa_xpath) 
+                lupa.click()
 
-            # Encuentra e ingresa a la barra de búsqueda el término a buscar dentro del sitio web.
-            search_bar = self.driver.find_element(By.CSS_SELECTOR, "input.buscador-input") 
-            search_bar.send_keys(query)
-            search_bar.send_keys(Keys.RETURN)
-            time.sleep(2)
+                # Encuentra e ingresa a la barra de búsqueda el término a buscar dentro del sitio web.
+                search_bar = self.driver.find_element(By.CSS_SELECTOR, "input.buscador-input") 
+                search_bar.send_keys(query)
+                search_bar.send_keys(Keys.RETURN)
+            waiter.until(lambda: waiter.present(first_xpath), "resultados") # Espera a que aparezca la primera noticia.
 
-            page = 1 # Contador para moverse por el índice de las páginas.
+            page = resume.get("page", 1) # Contador para moverse por el índice de las páginas.
             while count < MAX_NEWS_PER_SITE: # Loop para extraer noticias solo hasta el límite establecido.
-                for i in range(1, 16):
-                    try:
-                        url_element = self.driver.find_element(By.XPATH, f"{base_xpath}{i}]/a") # Extrae el elemento del url.
-                        title = self.driver.find_element(By.XPATH, f"{base_xpath}{i}]/a/h3") # Extrae el elemento del título.
-                        date = self.driver.find_element(By.XPATH, f"{base_xpath}{i}]/a/div/div/time") # Extrae el elemento de la fecha.
-
-                        # Eliminar el número inicial y las comillas que encierra al título.
-                        title = re.sub(r'^\"?\d+\s+', '', title.text).strip('"')
-                        
-                        self.data.append({ # Se agregan los datos de arriba a la lista de datos extraídos.
-                            "Title": title,
-                            "Date": self._format_date(date.text),
-                            "URL": url_element.get_attribute("href"),
-                            "Website": "Cooperativa"
-                        })
-                        count += 1 # Aumenta el contador de noticias extraídas.
-                        
-                        if len(self.data) % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
-                            print(f"{len(self.data)} noticias extraídas...")
-                        
-                        if count >= MAX_NEWS_PER_SITE: # Si el contador de noticias sobrepasa el máximo este se detiene.
-                            break
-                    except:
-                        break
+                offset, _, added = self._collect("Cooperativa", offset, min(15, MAX_NEWS_PER_SITE - count)) # Extrae las (hasta) 15 noticias de la página de una vez.
+                count += added # Aumenta el contador de noticias extraídas.
+                self._checkpoint(page=page, url=self.driver.current_url, offset=offset, rows=count)
+                if self.caught_up: # Las noticias que siguen ya se guardaron en una búsqueda anterior.
+                    print("Búsqueda por Cooperativa finalizada, no hay más noticias nuevas.")
+                    break
+                if count >= MAX_NEWS_PER_SITE: # Si el contador de noticias llega al máximo este se detiene.
+                    break
                 
                 if page <= 5: # El XPath de las primeras 5 páginas mantienen un incremento en el índice, pero de la sexta para adelante es siempre el mismo.
                     next_page_xpath = f"{page_xpath}{page}]"
@@ -277,75 +757,103 @@ class WebScraper:
                 
                 try: # Encuentra y presiona el botón de la página siguiente.
                     next_page_button = self.driver.find_element(By.XPATH, next_page_xpath)
+                    first_article = self.driver.find_element(By.XPATH, first_xpath)
                     self.driver.execute_script("arguments[0].click();", next_page_button)
                     page += 1
-                    time.sleep(2)
+                    offset = 0
+                    waiter.until(lambda: waiter.stale(first_article), "página siguiente") # Espera a que se deje de ver la página anterior.
+                    waiter.until(lambda: waiter.present(first_xpath), "resultados")
                 except:
                     print("Búsqueda por Cooperativa finalizada.")
                     break
 
         except Exception as e:
             print(f"Se produjo un error al extraer datos de Cooperativa: {e}")
+            self._error = e
     
     def scrape_duckduckgo(self, query): # Método principal para scrapear el sitio web DuckDuckGo (duckduckgo.com)
-        url = f"https://duckduckgo.com/?q={query.strip().replace(r' ','+')}&kl=cl-es&iar=news&ia=news"
+        resume = self._start_site("DuckDuckGo", query)
+        self._block_resources("DuckDuckGo")
+        url = f"{self.base_urls['DuckDuckGo']}/?q={query.strip().replace(r' ','+')}&kl=cl-es&iar=news&ia=news"
         self.driver.get(url) # Abre el URL.
         print("= = = Entrando a DuckDuckGo = = =") # Visualizador arbitrario para la consola, solo para saber si está funcionando.
-        time.sleep(3)
+        waiter = self._waiter("DuckDuckGo")
+        results_xpath = SELECTORS["DuckDuckGo"]["rows"] # XPath de los resultados (noticias y botón de cargar más).
+        waiter.until(lambda: waiter.present(results_xpath), "resultados") # Espera a que aparezcan los primeros resultados.
         
-        count = 0 # Contador de noticias extraídas.
+        count = resume.get("rows", 0) # Contador de noticias extraídas.
+        offset = resume.get("offset", 0) # Cantidad de resultados ya revisados. El botón de cargar más ocupa un resultado, pero se descarta por no tener título. Al retomar se cargan más resultados sin extraer hasta pasar esta posición.
         load_button_class = "result--more__btn" # Clase del botón para cargar más resultados.
         
-        def get_article_data(index): # Método anidado para buscar noticias dentro de la página.
-            try:
-                title_element = self.driver.find_element(By.XPATH, f"//*[@id='vertical_wrapper']/div/div[3]/div/div[1]/div[3]/div[{index}]/div/h2/a[1]") # Extrae el elemento del título.
-                
-                return { # Se retornan los datos de arriba ya formateados.
-                    "Title": title_element.text,
-                    "Date": None, # DuckDuckGo no muestra fecha de las noticias.
-                    "URL": title_element.get_attribute("href"), # El URL está en el mismo elemento que el título, se extrae el atributo href. 
-                    "Website": "DuckDuckGo"
-                }
-            except Exception:
-                return None
-
-        def click_load_more(current_index): # Método anidado para presionar el botón de cargar más resultados. 
-            try: # Busca y presiona el botón de cargar más resultados.
-                load_more_button = self.driver.find_element(By.CLASS_NAME, load_button_class)
-                self.driver.execute_script("arguments[0].click();", load_more_button)
-                time.sleep(2)
-                return current_index + 1
-            except Exception:
-                return current_index
-        
-        index = 1 # Índice encargado de pasar noticia por noticia
         try:
             while count < MAX_NEWS_PER_SITE: # Loop para extraer noticias solo hasta el límite establecido.
-                article_data = get_article_data(index) # Extrae los datos ya formateados de una noticia por iteración.
-                if article_data:
-                    self.data.append(article_data) # Se agregan los datos de arriba a la lista de datos extraídos.
-                    
-                    if len(self.data) % (MAX_NEWS_PER_SITE/4) == 0: # Visualizador arbitrario de cuántas noticias lleva, solamente para saber si sigue funcionando.
-                        print(f"{len(self.data)} noticias extraídas...")
-                    
-                    count += 1 # Aumenta el contador de noticias extraídas.
-                    index += 1 # Aumenta el índice para buscar la próxima noticia
-                else:
-                    new_index = click_load_more(index) # El botón de cargar más resultados ocupa un índice de noticia por lo que debe sumar 1 más para buscar la siguiente noticia. 
-                    if new_index == index: # Si no logra cargar más resultados el índice no avanza por lo que termina.
-                        print("Búsqueda por DuckDuckGo finalizada.")
-                        break
-                    index = new_index
+                offset, total, added = self._collect("DuckDuckGo", offset, MAX_NEWS_PER_SITE - count) # Extrae todas las noticias nuevas de una vez.
+                count += added # Aumenta el contador de noticias extraídas.
+                self._checkpoint(offset=offset, rows=count)
+                if self.caught_up: # Las noticias que siguen ya se guardaron en una búsqueda anterior.
+                    print("Búsqueda por DuckDuckGo finalizada, no hay más noticias nuevas.")
+                    break
+                if count >= MAX_NEWS_PER_SITE or offset < total:
+                    continue
+
+                try: # Busca y presiona el botón de cargar más resultados.
+                    load_more_button = self.driver.find_element(By.CLASS_NAME, load_button_class)
+                    self.driver.execute_script("arguments[0].click();", load_more_button)
+                except Exception: # Si no encuentra el botón, es porque terminó.
+                    print("Búsqueda por DuckDuckGo finalizada.")
+                    break
+                if not waiter.until(lambda: waiter.count_grew(results_xpath, total), "cargar más"): # Espera a que aparezcan los nuevos resultados, si no aparecen es porque terminó.
+                    print("Búsqueda por DuckDuckGo finalizada.")
+                    break
         except Exception as e:
             print(f"Se produjo un error al extraer datos de DuckDuckGo: {e}")
+            self._error = e
+
+    def _spawn_worker(self): # Método para crear un scraper temporal con datos propios (así los hilos no comparten la lista) y la misma configuración.
+        worker = WebScraper(self.driver_path, pool=self.pool, fetcher=self.fetcher, sink=self.sink, keep_data=self.keep_data, store=self.store, cache=self.cache, metrics=self.metrics, profile_dir=self.profile_dir, checkpoints=self.checkpoints, profile=self.profile) # Con pool el scraper temporal no crea un controlador propio.
+        worker.base_urls = self.base_urls
+        return worker
+
+    def _scrape_site_with_pool(self, site, query): # Método para scrapear un sitio web en un scraper temporal, que toma un controlador del pool solo si no se pudo por caché o HTTP.
+        worker = self._spawn_worker()
+        try:
+            worker._scrape_site(site, query)
+        except Exception as e: # Aísla los errores de cada sitio web igual que los bloques try/except de cada scraper.
+            print(f"Se produjo un error al extraer datos de {site}: {e}")
+        return worker
+
+    def scrape_all(self, query, sites=None): # Método para scrapear todos los sitios web, en paralelo si se entregó un pool.
+        sites = list(sites or SITES)
+        if self.pool is None: # Sin pool se mantiene el comportamiento original: un sitio tras otro en el mismo controlador.
+            for site in sites:
+                try:
+                    self._scrape_site(site, query)
+                except Exception as e: # Aísla los errores de cada sitio web, igual que con pool (ver _scrape_site_with_pool).
+                    print(f"Se produjo un error al extraer datos de {site}: {e}")
+            return
+
+        with ThreadPoolExecutor(max_workers=len(sites)) as executor: # Los sitios web que necesitan navegador esperan a que el pool tenga un controlador libre.
+            futures = {site: executor.submit(self._scrape_site_with_pool, site, query) for site in sites}
+            for site in sites: # Se juntan en el orden de SITES para que el .csv no dependa de qué sitio terminó primero.
+                worker = futures[site].result()
+                with self._data_lock:
+                    self.data.extend(worker.data)
+                    self.count += worker.count
+                print(f"{site}: {worker.count} noticias extraídas.")
+
+    def to_dataframe(self, normalize=True): # Método para obtener los datos extraídos como DataFrame, normalizados de una vez (ver postprocess.py): fechas como datetime64, títulos y URLs canónicos.
+        df = pd.DataFrame(self.data, columns=["Title", "Date", "URL", "Website"])
+        return normalize_frame(df) if normalize else df
 
-    def save_to_csv(self, filename): # Método para guardar los datos extraídos a través de un DataFrame de pandas a un .csv
-        df = pd.DataFrame(self.data)
-        df.to_csv(filename, index=False)
+    def save_to_csv(self, filename): # Método para guardar los datos extraídos, normalizados, en un .csv (o .jsonl o .parquet según la extensión, ver sinks.py).
+        with open_sink(filename) as sink: # Mismo destino que store.export y batch.py: en .parquet las fechas quedan como timestamp.
+            for row in self.data:
+                sink.write(row)
         print(f"{len(self.data)} noticias guardadas en {filename}")
 
     def close(self): # Método para cerrar el controlador
-        self.driver.quit()
+        if self._owns_driver and self._driver is not None:
+            self._driver.quit()
 
 if __name__ == "__main__":
     DRIVER_PATH = "C:/Users/Equipo/Drivers/chromedriver.exe" # Ruta de acceso al controlador del browser (cambiar la ruta a una propia)
@@ -356,13 +864,18 @@ if __name__ == "__main__":
             break
         print(f"Término muy largo, máximo {MAX_QUERY_INPUT} caracteres.")
 
-    scraper = WebScraper(DRIVER_PATH) # Inicializador del Web Scraper
+    fetcher = HttpFetcher() # Cliente HTTP para los sitios web que no necesitan navegador.
+    pool = DriverPool(DRIVER_PATH, size=len(SITES) - len(HTTP_BACKENDS)) # Un controlador por sitio web que necesita navegador para scrapearlos todos al mismo tiempo.
+    store = ArticleStore() # Base de datos local con las noticias de búsquedas anteriores, así solo se extraen las noticias nuevas.
+    checkpoints = CheckpointStore() # Si una ejecución anterior se cortó a mitad de un sitio web, se retoma donde quedó (las noticias ya escritas están en la base de datos).
+    scraper = WebScraper(DRIVER_PATH, pool=pool, fetcher=fetcher, keep_data=False, store=store, checkpoints=checkpoints) # Inicializador del Web Scraper
 
     try:
-        scraper.scrape_adnradio(QUERY) # Inicia la búsqueda en ADNRadio
-        scraper.scrape_biobiochile(QUERY) # Inicia la búsqueda en BioBioChile
-        scraper.scrape_cooperativa(QUERY) # Inicia la búsqueda en Cooperativa
-        scraper.scrape_duckduckgo(QUERY) # Inicia la búsqueda en DuckDuckGo
+        scraper.scrape_all(QUERY) # Inicia la búsqueda en ADNRadio, BioBioChile, Cooperativa y DuckDuckGo en paralelo
     finally:
-        scraper.save_to_csv(f"noticias_{QUERY.strip().replace(r' ','_')}.csv") # Guarda los datos extraídos en un archivo .csv (se puede visualizar desde un DataFrame o por SQL)
-        scraper.close() # Cierra el controlador y termina el proceso completo
+        filename = f"noticias_{QUERY.strip().replace(r' ','_')}.csv"
+        print(f"{scraper.count} noticias nuevas, {store.export(QUERY, filename)} noticias guardadas en {filename}") # Exporta todas las noticias de la búsqueda (sin duplicados) a un .csv (se puede visualizar desde un DataFrame o por SQL)
+        store.close()
+        scraper.close() # Cierra el controlador
+        pool.close() # Cierra los controladores del pool
+        fetcher.close() # Cierra las conexiones HTTP y termina el proceso completo